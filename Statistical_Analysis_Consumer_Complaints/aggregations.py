@@ -0,0 +1,273 @@
+"""
+Motor de agregação em passada única para as análises de reclamações
+
+Todas as métricas usadas pelas funções analyze_* (contagens por empresa,
+status, nota e mês, satisfação por status, momentos para a correlação
+nota x status e frequência de palavras) são acumuladas de uma vez por bloco
+de linhas. As funções de análise apenas leem o resultado compartilhado, e
+blocos podem ser mesclados para processar arquivos maiores que a memória.
+"""
+import numpy as np
+import pandas as pd
+
+from text_analysis import WordCounter
+
+
+def _factorize(series):
+    """Códigos (-1 para ausentes) e rótulos na ordem de aparição."""
+    codes, uniques = pd.factorize(series, sort=False)
+    return codes, list(uniques)
+
+
+def _add_counts(target, labels, counts):
+    for label, count in zip(labels, counts):
+        target[label] = target.get(label, 0) + int(count)
+
+
+def _as_python_number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class ComplaintAggregates:
+    """Acumuladores mescláveis com todas as métricas das análises."""
+
+    def __init__(self, word_top_k=None, processes=None):
+        self.n_rows = 0
+        self.columns = set()
+        self.empresa_counts = {}
+        self.status_counts = {}
+        self.nota_counts = {}
+        self.month_counts = {}
+        # status -> [quantidade de notas, soma das notas, soma dos quadrados]
+        self.status_nota = {}
+        self.date_min = None
+        self.date_max = None
+        self.words = WordCounter(top_k=word_top_k, processes=processes)
+
+    def update(self, df):
+        """Acumula as métricas de um bloco de linhas."""
+        self.n_rows += len(df)
+        self.columns.update(df.columns)
+
+        if 'empresa' in df.columns:
+            codes, labels = _factorize(df['empresa'])
+            _add_counts(self.empresa_counts, labels,
+                        np.bincount(codes[codes >= 0], minlength=len(labels)))
+
+        nota = None
+        if 'nota' in df.columns:
+            nota = df['nota'].to_numpy(dtype=np.float64, na_value=np.nan)
+            valid_nota = ~np.isnan(nota)
+            values, counts = np.unique(nota[valid_nota], return_counts=True)
+            _add_counts(self.nota_counts, [_as_python_number(v) for v in values], counts)
+
+        if 'status' in df.columns:
+            codes, labels = _factorize(df['status'])
+            _add_counts(self.status_counts, labels,
+                        np.bincount(codes[codes >= 0], minlength=len(labels)))
+
+            if nota is not None:
+                mask = (codes >= 0) & valid_nota
+                status_codes, values = codes[mask], nota[mask]
+                n = np.bincount(status_codes, minlength=len(labels))
+                total = np.bincount(status_codes, weights=values, minlength=len(labels))
+                total_sq = np.bincount(status_codes, weights=values * values, minlength=len(labels))
+                for i, label in enumerate(labels):
+                    acc = self.status_nota.setdefault(label, [0, 0.0, 0.0])
+                    acc[0] += int(n[i])
+                    acc[1] += total[i]
+                    acc[2] += total_sq[i]
+
+        if 'data' in df.columns:
+            dates = df['data'].to_numpy(dtype='datetime64[ns]')
+            dates = dates[~np.isnat(dates)]
+            if dates.size:
+                self._update_dates(dates.min(), dates.max())
+                months = dates.astype('datetime64[M]').astype(np.int64)
+                first = months.min()
+                counts = np.bincount(months - first)
+                present = np.flatnonzero(counts)
+                _add_counts(self.month_counts, (present + first).tolist(), counts[present])
+
+        if 'comentario' in df.columns:
+            self.words.update(df['comentario'])
+
+        return self
+
+    def _update_dates(self, date_min, date_max):
+        date_min, date_max = pd.Timestamp(date_min), pd.Timestamp(date_max)
+        if self.date_min is None or date_min < self.date_min:
+            self.date_min = date_min
+        if self.date_max is None or date_max > self.date_max:
+            self.date_max = date_max
+
+    def merge(self, other):
+        """Incorpora os acumuladores de outra instância (ex.: outro bloco)."""
+        self.n_rows += other.n_rows
+        self.columns.update(other.columns)
+        for name in ('empresa_counts', 'status_counts', 'nota_counts', 'month_counts'):
+            target = getattr(self, name)
+            source = getattr(other, name)
+            _add_counts(target, source.keys(), source.values())
+        for label, (n, total, total_sq) in other.status_nota.items():
+            acc = self.status_nota.setdefault(label, [0, 0.0, 0.0])
+            acc[0] += n
+            acc[1] += total
+            acc[2] += total_sq
+        if other.date_min is not None:
+            self._update_dates(other.date_min, other.date_max)
+        self.words.merge(other.words)
+        return self
+
+    def to_dict(self):
+        """Estado serializável em JSON, para continuar a agregação depois."""
+        return {
+            'n_rows': self.n_rows,
+            'columns': sorted(self.columns),
+            # Pares [chave, contagem]: preserva a ordem e chaves não textuais
+            'empresa_counts': list(map(list, self.empresa_counts.items())),
+            'status_counts': list(map(list, self.status_counts.items())),
+            'nota_counts': list(map(list, self.nota_counts.items())),
+            'month_counts': list(map(list, self.month_counts.items())),
+            'status_nota': list(map(list, self.status_nota.items())),
+            'date_min': None if self.date_min is None else self.date_min.isoformat(),
+            'date_max': None if self.date_max is None else self.date_max.isoformat(),
+            'words': self.words.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state, processes=None):
+        aggregates = cls(processes=processes)
+        aggregates.n_rows = state['n_rows']
+        aggregates.columns = set(state['columns'])
+        for name in ('empresa_counts', 'status_counts', 'nota_counts', 'month_counts'):
+            setattr(aggregates, name, {key: count for key, count in state[name]})
+        aggregates.status_nota = {label: list(acc) for label, acc in state['status_nota']}
+        if state['date_min'] is not None:
+            aggregates.date_min = pd.Timestamp(state['date_min'])
+            aggregates.date_max = pd.Timestamp(state['date_max'])
+        aggregates.words = WordCounter.from_dict(state['words'], processes=processes)
+        return aggregates
+
+    # Métricas derivadas
+
+    def top_empresas(self, n=None):
+        """Equivalente a df['empresa'].value_counts().head(n)."""
+        counts = pd.Series(self.empresa_counts, dtype='int64', name='count')
+        counts = counts.sort_values(ascending=False, kind='stable')
+        counts.index.name = 'empresa'
+        return counts if n is None else counts.head(n)
+
+    def status_distribution(self):
+        """Equivalente a df['status'].value_counts()."""
+        counts = pd.Series(self.status_counts, dtype='int64', name='count')
+        counts = counts.sort_values(ascending=False, kind='stable')
+        counts.index.name = 'status'
+        return counts
+
+    def frequent_words(self, n=20):
+        """Palavras mais frequentes nos comentários."""
+        return dict(self.words.most_common(n))
+
+    def nota_histogram(self):
+        """Frequência de cada nota, ordenada pelo valor."""
+        return pd.Series(self.nota_counts, dtype='int64', name='count').sort_index()
+
+    def nota_quantile(self, q):
+        """Quantil das notas com interpolação linear (mesma regra do pandas)."""
+        hist = self.nota_histogram()
+        n = hist.sum()
+        if n == 0:
+            return np.nan
+        cumulative = hist.to_numpy().cumsum()
+        position = (n - 1) * q
+        lower = hist.index[np.searchsorted(cumulative, np.floor(position), side='right')]
+        upper = hist.index[np.searchsorted(cumulative, np.ceil(position), side='right')]
+        return lower + (upper - lower) * (position - np.floor(position))
+
+    def nota_summary(self):
+        """Média, mediana e moda das notas."""
+        hist = self.nota_histogram()
+        n = hist.sum()
+        if n == 0:
+            return {'media': np.nan, 'mediana': np.nan, 'moda': None}
+        return {
+            'media': float((hist.index.to_numpy(dtype=np.float64) * hist.to_numpy()).sum() / n),
+            'mediana': float(self.nota_quantile(0.5)),
+            'moda': _as_python_number(hist.idxmax())
+        }
+
+    def nota_describe(self):
+        """Equivalente a df['nota'].describe()."""
+        hist = self.nota_histogram()
+        values = hist.index.to_numpy(dtype=np.float64)
+        counts = hist.to_numpy()
+        n = counts.sum()
+        mean = (values * counts).sum() / n if n else np.nan
+        var = (counts * (values - mean) ** 2).sum() / (n - 1) if n > 1 else np.nan
+        return pd.Series({
+            'count': float(n),
+            'mean': mean,
+            'std': np.sqrt(var),
+            'min': values.min() if n else np.nan,
+            '25%': self.nota_quantile(0.25),
+            '50%': self.nota_quantile(0.5),
+            '75%': self.nota_quantile(0.75),
+            'max': values.max() if n else np.nan,
+        }, name='nota')
+
+    def monthly_counts(self):
+        """Reclamações por mês (PeriodIndex mensal, ordenado)."""
+        months = sorted(self.month_counts)
+        index = pd.PeriodIndex(
+            np.array(months, dtype='int64').astype('datetime64[M]'), freq='M', name='data'
+        )
+        return pd.Series([self.month_counts[m] for m in months], index=index, dtype='int64')
+
+    def satisfaction_by_status(self):
+        """Equivalente a df.groupby('status')['nota'].agg(['mean', 'count'])."""
+        rows = {
+            label: {'mean': total / n if n else np.nan, 'count': n}
+            for label, (n, total, _) in self.status_nota.items()
+        }
+        table = pd.DataFrame.from_dict(rows, orient='index', columns=['mean', 'count'])
+        return table.sort_values('count', ascending=False, kind='stable')
+
+    def nota_status_correlation(self):
+        """
+        Correlação de Pearson entre nota e o status codificado pela ordem de
+        aparição, calculada a partir dos momentos por status.
+        """
+        order = {label: i for i, label in enumerate(self.status_counts)}
+        stats = np.array([
+            (order[label], n, total, total_sq)
+            for label, (n, total, total_sq) in self.status_nota.items()
+        ], dtype=np.float64).reshape(-1, 4)
+        code, n, total, total_sq = stats.T
+        count = n.sum()
+        if count < 2:
+            return np.nan
+        sum_x, sum_xx = total.sum(), total_sq.sum()
+        sum_y, sum_yy = (n * code).sum(), (n * code * code).sum()
+        sum_xy = (code * total).sum()
+        cov = sum_xy - sum_x * sum_y / count
+        var_x = sum_xx - sum_x * sum_x / count
+        var_y = sum_yy - sum_y * sum_y / count
+        if var_x <= 0 or var_y <= 0:
+            return np.nan
+        return float(cov / np.sqrt(var_x * var_y))
+
+
+def compute_aggregates(df, chunk_size=None, **options):
+    """
+    Calcula todas as métricas das análises em uma passada sobre o DataFrame
+    (ou uma passada por bloco de `chunk_size` linhas). As opções são repassadas
+    a ComplaintAggregates.
+    """
+    aggregates = ComplaintAggregates(**options)
+    if chunk_size is None or chunk_size >= len(df):
+        return aggregates.update(df)
+    for start in range(0, len(df), chunk_size):
+        aggregates.update(df.iloc[start:start + chunk_size])
+    return aggregates
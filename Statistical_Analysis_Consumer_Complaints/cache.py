@@ -0,0 +1,143 @@
+"""
+Cache binário colunar (Feather) do dataset de reclamações
+
+O DataFrame já convertido é salvo em Feather sem compressão e relido com
+memory mapping. Cada entrada guarda a impressão digital do JSON de origem
+(tamanho, mtime e hash do conteúdo) e só é reconstruída quando ele muda.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Incrementar quando o formato do DataFrame gerado pelo loader mudar
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = Path('data/.cache')
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def file_fingerprint(path, with_hash=True):
+    """Retorna tamanho, mtime e (opcionalmente) hash blake2b do arquivo."""
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        fingerprint['hash'] = content_hash(path)
+    return fingerprint
+
+
+def content_hash(path):
+    """Calcula o hash blake2b do conteúdo do arquivo lendo em blocos."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _normalize_columns(columns):
+    return None if columns is None else list(columns)
+
+
+def _columns_key(columns):
+    if columns is None:
+        return 'all'
+    return hashlib.blake2b(','.join(columns).encode('utf-8'), digest_size=6).hexdigest()
+
+
+class FrameCache:
+    """Cache em disco de DataFrames derivados de um arquivo de origem."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _paths(self, source, columns):
+        name = f"{Path(source).stem}.{_columns_key(columns)}"
+        return self.cache_dir / f"{name}.feather", self.cache_dir / f"{name}.json"
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = meta_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=4)
+        os.replace(tmp_path, meta_path)
+
+    def is_valid(self, source, columns=None):
+        """Verifica se existe entrada válida para o arquivo de origem."""
+        columns = _normalize_columns(columns)
+        data_path, meta_path = self._paths(source, columns)
+        meta = self._read_meta(meta_path)
+        if meta is None or not data_path.exists():
+            return False
+        if meta.get('version') != CACHE_VERSION or meta.get('columns') != columns:
+            return False
+
+        current = file_fingerprint(source, with_hash=False)
+        if current['size'] != meta['size']:
+            return False
+        if current['mtime_ns'] == meta['mtime_ns']:
+            return True
+
+        # mtime mudou mas o tamanho não: só o hash decide
+        if content_hash(source) != meta['hash']:
+            return False
+        meta['mtime_ns'] = current['mtime_ns']
+        self._write_meta(meta_path, meta)
+        return True
+
+    def load(self, source, columns=None):
+        """Retorna o DataFrame em cache ou None se ausente/desatualizado."""
+        columns = _normalize_columns(columns)
+        if not self.is_valid(source, columns):
+            return None
+        from pyarrow import feather
+
+        data_path, _ = self._paths(source, columns)
+        table = feather.read_table(data_path, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def store(self, source, df, fingerprint, columns=None):
+        """Grava o DataFrame junto com a impressão digital da origem."""
+        columns = _normalize_columns(columns)
+        data_path, meta_path = self._paths(source, columns)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        meta = dict(fingerprint)
+        meta.update({'version': CACHE_VERSION, 'source': str(source), 'columns': columns})
+
+        tmp_path = data_path.with_suffix('.feather.tmp')
+        df.to_feather(tmp_path, compression='uncompressed')
+        os.replace(tmp_path, data_path)
+        self._write_meta(meta_path, meta)
+
+
+def cached_load(source, loader, columns=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Carrega `source` pelo cache; em caso de falta chama `loader(source, columns)`
+    e grava o resultado. Sem pyarrow instalado o cache é ignorado.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow não instalado; cache desativado.")
+        return loader(source, columns)
+
+    cache = FrameCache(cache_dir)
+    df = cache.load(source, columns)
+    if df is not None:
+        print(f"Dados carregados do cache ({len(df)} registros).")
+        return df
+
+    # Impressão digital tirada antes da leitura: se a origem mudar durante o
+    # carregamento, a entrada gravada já nasce desatualizada
+    fingerprint = file_fingerprint(source)
+    df = loader(source, columns)
+    cache.store(source, df, fingerprint, columns)
+    return df
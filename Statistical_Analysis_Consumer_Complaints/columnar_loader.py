@@ -0,0 +1,211 @@
+"""
+Carregamento colunar do arquivo dados2025.json
+
+Os registros lidos pelo ijson são agrupados em blocos e cada coluna do bloco
+é convertida de uma vez para buffers tipados (códigos de categoria, int8,
+datetime64). O DataFrame é montado uma única vez no final, sem DataFrames
+intermediários nem pd.concat.
+"""
+import numpy as np
+import pandas as pd
+import ijson
+
+# Tipos das colunas conhecidas do dataset; demais colunas ficam como object
+DEFAULT_SCHEMA = {
+    'empresa': 'category',
+    'status': 'category',
+    'nota': 'int8',
+    'data': 'datetime',
+}
+
+# Quantidade de registros acumulados antes da conversão vetorizada de cada bloco
+BLOCK_SIZE = 8192
+
+
+class CategoryBuffer:
+    """Códigos int32 com dicionário de categorias (ordem de aparição)."""
+
+    def __init__(self):
+        self.blocks = []
+        self.lookup = {}
+        self.categories = []
+
+    def extend(self, values):
+        local_codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        # A última posição traduz o código -1 (ausente) do factorize
+        mapping = np.full(len(uniques) + 1, -1, dtype=np.int32)
+        for i, value in enumerate(uniques):
+            code = self.lookup.get(value)
+            if code is None:
+                code = len(self.categories)
+                self.lookup[value] = code
+                self.categories.append(value)
+            mapping[i] = code
+        self.blocks.append(mapping[local_codes])
+
+    def finish(self):
+        codes = np.concatenate(self.blocks) if self.blocks else np.empty(0, dtype=np.int32)
+        return pd.Categorical.from_codes(codes, categories=self.categories)
+
+
+class Int8Buffer:
+    """Valores int8 com máscara de ausentes (resulta em dtype Int8)."""
+
+    def __init__(self):
+        self.blocks = []
+        self.masks = []
+
+    def extend(self, values):
+        numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(
+            dtype=np.float64, na_value=np.nan)
+        mask = np.isnan(numbers)
+        numbers[mask] = 0
+        info = np.iinfo(np.int8)
+        if numbers.size and (numbers.min() < info.min or numbers.max() > info.max):
+            raise ValueError("Valor fora do intervalo de int8")
+        self.blocks.append(numbers.astype(np.int8))
+        self.masks.append(mask)
+
+    def finish(self):
+        if not self.blocks:
+            return pd.array([], dtype='Int8')
+        return pd.arrays.IntegerArray(np.concatenate(self.blocks), np.concatenate(self.masks))
+
+
+class DatetimeBuffer:
+    """Valores datetime64[ns]; cada bloco de strings é convertido de uma vez."""
+
+    def __init__(self):
+        self.blocks = []
+
+    def extend(self, values):
+        dates = pd.DatetimeIndex(pd.to_datetime(values))
+        if dates.tz is not None:
+            dates = dates.tz_convert(None)
+        self.blocks.append(dates.as_unit('ns').to_numpy())
+
+    def finish(self):
+        if not self.blocks:
+            return np.empty(0, dtype='datetime64[ns]')
+        return np.concatenate(self.blocks)
+
+
+class ObjectBuffer:
+    """Coluna genérica sem tipo definido (ex.: comentario)."""
+
+    def __init__(self):
+        self.values = []
+
+    def extend(self, values):
+        self.values.extend(values)
+
+    def finish(self):
+        return self.values
+
+
+BUFFER_TYPES = {
+    'category': CategoryBuffer,
+    'int8': Int8Buffer,
+    'datetime': DatetimeBuffer,
+    'object': ObjectBuffer,
+}
+
+
+class ColumnarBuilder:
+    """Monta um DataFrame a partir de registros (dicts) usando buffers por coluna."""
+
+    def __init__(self, columns=None, schema=None, block_size=BLOCK_SIZE):
+        self.columns = list(columns) if columns is not None else None
+        self.schema = dict(DEFAULT_SCHEMA, **(schema or {}))
+        self.block_size = block_size
+        self.reset()
+
+    def reset(self):
+        """Descarta os dados acumulados e recomeça do zero."""
+        self.n_rows = 0
+        self._buffers = {}
+        self._block = []
+        if self.columns is not None:
+            for name in self.columns:
+                self._add_column(name)
+
+    def _add_column(self, name):
+        kind = self.schema.get(name, 'object')
+        if kind not in BUFFER_TYPES:
+            raise ValueError(f"Tipo de coluna desconhecido para '{name}': {kind}")
+        buffer = BUFFER_TYPES[kind]()
+        # Coluna nova: completa com ausentes as linhas de blocos anteriores
+        flushed = self.n_rows - len(self._block)
+        if flushed:
+            buffer.extend([None] * flushed)
+        self._buffers[name] = buffer
+
+    def append(self, record):
+        """Anexa um registro do JSON ao bloco atual."""
+        self._block.append(record)
+        self.n_rows += 1
+        if len(self._block) >= self.block_size:
+            self._flush()
+
+    def _flush(self):
+        block = self._block
+        if not block:
+            return
+        if self.columns is None and not set().union(*block).issubset(self._buffers):
+            # Colunas novas entram na ordem em que aparecem nos registros
+            for name in dict.fromkeys(key for record in block for key in record):
+                if name not in self._buffers:
+                    self._add_column(name)
+        # Extrai cada coluna do bloco de uma vez; campos ausentes viram None
+        for name, buffer in self._buffers.items():
+            buffer.extend([record.get(name) for record in block])
+        self._block = []
+
+    def to_columns(self):
+        """Retorna (número de linhas, arrays finais por coluna) e reinicia o builder."""
+        self._flush()
+        n_rows = self.n_rows
+        data = {name: buffer.finish() for name, buffer in self._buffers.items()}
+        self.reset()
+        return n_rows, data
+
+    def to_frame(self):
+        """Constrói o DataFrame final e reinicia o builder."""
+        n_rows, data = self.to_columns()
+        return pd.DataFrame(data, index=pd.RangeIndex(n_rows))
+
+
+def load_columnar(data_path, columns=None, schema=None, progress_every=10000):
+    """
+    Carrega o JSON (lista de registros) em um único DataFrame tipado.
+
+    columns: lista de colunas a manter (None mantém todas as encontradas).
+    schema: tipos extras por coluna ('category', 'int8', 'datetime', 'object').
+    """
+    builder = ColumnarBuilder(columns=columns, schema=schema)
+
+    with open(data_path, 'rb') as f:
+        for i, record in enumerate(ijson.items(f, 'item')):
+            builder.append(record)
+
+            if progress_every and i % progress_every == 0:
+                print(f"Processados {i} registros...")
+
+    return builder.to_frame()
+
+
+def iter_columnar_chunks(data_path, chunk_size=100000, columns=None, schema=None):
+    """
+    Lê o JSON em streaming e produz DataFrames tipados de até `chunk_size`
+    registros, sem nunca manter o arquivo inteiro em memória.
+    """
+    builder = ColumnarBuilder(columns=columns, schema=schema)
+
+    with open(data_path, 'rb') as f:
+        for record in ijson.items(f, 'item'):
+            builder.append(record)
+            if builder.n_rows >= chunk_size:
+                yield builder.to_frame()
+
+    if builder.n_rows:
+        yield builder.to_frame()
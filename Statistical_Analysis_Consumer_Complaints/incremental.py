@@ -0,0 +1,143 @@
+"""
+Atualização incremental das métricas de reclamações
+
+O estado da agregação (ComplaintAggregates: contagens por mês, somas e
+contagens de satisfação por status, momentos da correlação e contador de
+palavras) é salvo em JSON junto com uma marca d'água: o dia da maior `data`
+já processada e a contagem dos registros desse dia por hash de conteúdo.
+Cada execução agrega os registros com `data` a partir desse dia; os do
+próprio dia que já foram processados (mesmo hash) são descartados, de modo
+que reclamações do mesmo dia que chegam em um export posterior entram uma
+única vez. O custo depende do tamanho do novo export e não do histórico.
+
+O modo exige a coluna `data`. Registros sem `data` só são contados na
+primeira execução, e registros de dias anteriores à marca são ignorados.
+"""
+import hashlib
+import json
+import os
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aggregations import ComplaintAggregates
+from columnar_loader import iter_columnar_chunks
+
+DEFAULT_STATE_PATH = Path('data/.state/complaints_state.json')
+
+# Incrementar quando o formato do estado mudar
+STATE_VERSION = 2
+
+
+def load_state(state_path=DEFAULT_STATE_PATH, processes=None):
+    """
+    Retorna (agregados, dia da marca d'água, contagem por hash dos registros
+    desse dia) salvos ou (None, None, Counter()) se não houver estado.
+    """
+    state_path = Path(state_path)
+    if not state_path.exists():
+        return None, None, Counter()
+    with open(state_path, encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        print("Estado incremental em formato antigo; recalculando do zero.")
+        return None, None, Counter()
+    aggregates = ComplaintAggregates.from_dict(state['aggregates'], processes=processes)
+    return aggregates, pd.Timestamp(state['watermark']), Counter(state['records'])
+
+
+def save_state(aggregates, watermark, records, state_path=DEFAULT_STATE_PATH):
+    """Grava o estado de forma atômica (arquivo temporário + rename)."""
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state = {
+        'version': STATE_VERSION,
+        'watermark': watermark.isoformat(),
+        'records': dict(records),
+        'aggregates': aggregates.to_dict(),
+    }
+    tmp_path = state_path.with_suffix(state_path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, state_path)
+
+
+def _is_missing(value):
+    return value is None or (np.ndim(value) == 0 and pd.isna(value))
+
+
+def record_keys(rows):
+    """Hash do conteúdo de cada linha (campos ausentes ignorados, ordem das chaves irrelevante)."""
+    keys = []
+    for record in rows.to_dict('records'):
+        fields = {name: value for name, value in record.items() if not _is_missing(value)}
+        text = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+        keys.append(hashlib.blake2b(text.encode('utf-8'), digest_size=10).hexdigest())
+    return keys
+
+
+def _days(chunk):
+    if 'data' not in chunk.columns:
+        raise ValueError("O modo incremental exige a coluna 'data' nos registros; "
+                         "rode sem --incremental")
+    return pd.DatetimeIndex(chunk['data']).normalize()
+
+
+def new_records(chunk, watermark, seen):
+    """
+    Linhas do bloco a partir do dia `watermark`, sem as do próprio dia já
+    contadas em `seen` (hash -> ocorrências, consumido à medida que casa).
+    """
+    days = _days(chunk)
+    if watermark is None:
+        return chunk
+    keep = np.asarray(days > watermark)
+    same_day = np.flatnonzero(days == watermark)
+    for position, key in zip(same_day, record_keys(chunk.iloc[same_day])):
+        if seen[key] > 0:
+            seen[key] -= 1
+        else:
+            keep[position] = True
+    return chunk[keep]
+
+
+def _track_watermark(chunk, watermark, records):
+    """Avança a marca d'água com um bloco de linhas novas e conta as do dia da marca."""
+    days = _days(chunk)
+    if days.notna().any() and (watermark is None or days.max() > watermark):
+        watermark, records = days.max(), Counter()
+    if watermark is not None:
+        records.update(record_keys(chunk[np.asarray(days == watermark)]))
+    return watermark, records
+
+
+def incremental_update(data_path, state_path=DEFAULT_STATE_PATH, chunk_size=100000,
+                       sketches=None, word_top_k=None, processes=None):
+    """
+    Agrega apenas os registros novos de `data_path` sobre o estado salvo,
+    grava o estado atualizado e retorna os agregados acumulados. Se
+    `sketches` for informado, recebe somente os registros novos.
+    """
+    aggregates, watermark, seen = load_state(state_path, processes=processes)
+    if aggregates is None:
+        aggregates = ComplaintAggregates(word_top_k=word_top_k, processes=processes)
+    else:
+        print(f"Estado carregado: {aggregates.n_rows} registros até {aggregates.date_max}.")
+
+    n_before = aggregates.n_rows
+    new_watermark, records = watermark, Counter(seen)
+    for chunk in iter_columnar_chunks(data_path, chunk_size=chunk_size):
+        chunk = new_records(chunk, watermark, seen)
+        if len(chunk):
+            aggregates.update(chunk)
+            if sketches is not None:
+                sketches.update(chunk)
+            new_watermark, records = _track_watermark(chunk, new_watermark, records)
+    print(f"Registros novos agregados: {aggregates.n_rows - n_before}")
+
+    if new_watermark is None:
+        raise ValueError("Nenhum registro com 'data' válida; o estado incremental não foi salvo")
+    save_state(aggregates, new_watermark, records, state_path)
+    return aggregates
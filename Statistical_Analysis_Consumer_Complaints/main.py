@@ -5,95 +5,108 @@ import seaborn as sns
 from datetime import datetime
 import json
 from pathlib import Path
-import ijson  # Para processar JSON grandes
+import argparse
+import sys
+from functools import partial
+from columnar_loader import load_columnar, iter_columnar_chunks
+from sharded_loader import load_columnar_parallel
+from cache import cached_load
+from aggregations import ComplaintAggregates, compute_aggregates
+from sketches import ComplaintSketches
+from incremental import DEFAULT_STATE_PATH, incremental_update
 
-def load_and_process_data():
+# Módulos compartilhados na raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.dtype_optimizer import optimize_dtypes
+from common.report_renderer import ReportRenderer
+
+DATA_PATH = Path('data/dados2025.json')
+REPORTS_DIR = Path('reports')
+
+# Registros por bloco no modo streaming
+STREAM_CHUNK_SIZE = 100000
+
+def _load_optimized(data_path, columns, loader):
+    """Carrega com o loader informado e reduz os tipos das demais colunas."""
+    return optimize_dtypes(loader(data_path, columns), verbose=True)
+
+def load_and_process_data(columns=None, use_cache=True, workers=None, data_path=DATA_PATH):
     """
     Carrega e processa os dados do arquivo JSON grande
+
+    Os registros são lidos em streaming e anexados direto a buffers colunares
+    tipados; use `columns` para manter apenas as colunas necessárias. Com
+    `use_cache`, o resultado é reaproveitado de data/.cache enquanto o JSON
+    não mudar. Com `workers` > 1 o arquivo é lido em shards paralelos.
     """
-    # Carregar dados do JSON em chunks
-    data_path = Path('data/dados2025.json')
-    
-    # Lista para armazenar os chunks de dados
-    data_chunks = []
-    chunk_size = 1000
-    current_chunk = []
+    loader = load_columnar
+    if workers and workers > 1:
+        loader = partial(load_columnar_parallel, workers=workers)
+    loader = partial(_load_optimized, loader=loader)
     
     try:
-        with open(data_path, 'rb') as f:
-            parser = ijson.items(f, 'item')
-            
-            for i, record in enumerate(parser):
-                current_chunk.append(record)
-                
-                if len(current_chunk) >= chunk_size:
-                    data_chunks.append(pd.DataFrame(current_chunk))
-                    current_chunk = []
-                    
-                if i % 10000 == 0:
-                    print(f"Processados {i} registros...")
-            
-            # Adicionar o último chunk se houver dados restantes
-            if current_chunk:
-                data_chunks.append(pd.DataFrame(current_chunk))
-        
-        # Concatenar todos os chunks
-        df = pd.concat(data_chunks, ignore_index=True)
-        
-        # Converter data para datetime se existir
-        if 'data' in df.columns:
-            df['data'] = pd.to_datetime(df['data'])
-        
-        return df
+        if use_cache:
+            return cached_load(data_path, loader, columns=columns)
+        return loader(data_path, columns)
     
     except Exception as e:
         print(f"Erro ao carregar dados: {str(e)}")
         return None
 
-def analyze_basic_stats(df):
+def stream_and_aggregate(chunk_size=STREAM_CHUNK_SIZE, columns=None, sketches=None,
+                         data_path=DATA_PATH, **options):
+    """
+    Modo out-of-core: agrega os registros bloco a bloco à medida que saem do
+    parser, sem montar o DataFrame completo. A memória depende apenas do
+    número de grupos distintos (empresas, status, meses, palavras).
+    Se `sketches` for informado, os sketches aproximados também são atualizados.
+    """
+    aggregates = ComplaintAggregates(**options)
+    
+    for chunk in iter_columnar_chunks(data_path, chunk_size=chunk_size, columns=columns):
+        aggregates.update(chunk)
+        if sketches is not None:
+            sketches.update(chunk)
+        print(f"Processados {aggregates.n_rows} registros...")
+    
+    return aggregates
+
+def analyze_basic_stats(df, aggregates=None):
     """
     Realiza análise estatística básica dos dados
     """
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    
     print("\n=== Análise Básica dos Dados ===")
-    print(f"Número total de reclamações: {len(df)}")
-    print("\nInformações do Dataset:")
-    print(df.info())
+    print(f"Número total de reclamações: {aggregates.n_rows}")
+    if df is not None:
+        print("\nInformações do Dataset:")
+        print(df.info())
     
     print("\nEstatísticas Descritivas:")
-    print(df.describe())
+    if 'nota' in aggregates.columns:
+        print(aggregates.nota_describe().to_frame())
+    if aggregates.date_min is not None:
+        print(f"Período: {aggregates.date_min} a {aggregates.date_max}")
     
     # Contagem de reclamações por empresa (top 10)
-    if 'empresa' in df.columns:
+    if 'empresa' in aggregates.columns:
         print("\nTop 10 Empresas com Mais Reclamações:")
-        print(df['empresa'].value_counts().head(10))
+        print(aggregates.top_empresas(10))
 
-def analyze_satisfaction(df):
-    """
-    Analisa as notas de satisfação
-    """
-    if 'nota' not in df.columns:
-        print("Coluna 'nota' não encontrada no dataset")
-        return
-    
+def plot_satisfaction(notas, path):
+    """Histograma das notas a partir das frequências já agregadas."""
     plt.figure(figsize=(10, 6))
-    sns.histplot(data=df, x='nota', bins=5)
+    sns.histplot(x=notas.index.to_numpy(dtype=float), weights=notas.to_numpy(), bins=5)
     plt.title('Distribuição das Notas de Satisfação')
     plt.xlabel('Nota')
     plt.ylabel('Frequência')
-    plt.savefig('reports/distribuicao_notas.png')
+    plt.savefig(path)
     plt.close()
 
-def analyze_temporal_patterns(df):
-    """
-    Analisa padrões temporais nas reclamações
-    """
-    if 'data' not in df.columns:
-        print("Coluna 'data' não encontrada no dataset")
-        return
-    
-    # Análise temporal
-    reclamacoes_por_mes = df.groupby(df['data'].dt.to_period('M')).size()
-    
+def plot_temporal_patterns(reclamacoes_por_mes, path):
+    """Evolução mensal do número de reclamações."""
     plt.figure(figsize=(12, 6))
     reclamacoes_por_mes.plot(kind='line')
     plt.title('Evolução do Número de Reclamações ao Longo do Tempo')
@@ -101,156 +114,247 @@ def analyze_temporal_patterns(df):
     plt.ylabel('Número de Reclamações')
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.savefig('reports/evolucao_temporal.png')
+    plt.savefig(path)
     plt.close()
 
-def analyze_status_distribution(df):
-    """
-    Analisa a distribuição dos status das reclamações
-    """
-    if 'status' not in df.columns:
-        print("Coluna 'status' não encontrada no dataset")
-        return
-    
+def plot_status_distribution(status, path):
+    """Quantidade de reclamações por status."""
     plt.figure(figsize=(10, 6))
-    df['status'].value_counts().plot(kind='bar')
+    status.plot(kind='bar')
     plt.title('Distribuição dos Status das Reclamações')
     plt.xlabel('Status')
     plt.ylabel('Quantidade')
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.savefig('reports/distribuicao_status.png')
+    plt.savefig(path)
     plt.close()
 
-def analyze_insights(df):
+def analyze_satisfaction(df, aggregates=None, renderer=None):
+    """
+    Analisa as notas de satisfação
+    """
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    
+    if 'nota' not in aggregates.columns:
+        print("Coluna 'nota' não encontrada no dataset")
+        return
+    
+    renderer = renderer or ReportRenderer(REPORTS_DIR)
+    renderer.add('distribuicao_notas.png', plot_satisfaction, aggregates.nota_histogram())
+
+def analyze_temporal_patterns(df, aggregates=None, renderer=None):
+    """
+    Analisa padrões temporais nas reclamações
+    """
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    
+    if 'data' not in aggregates.columns:
+        print("Coluna 'data' não encontrada no dataset")
+        return
+    
+    renderer = renderer or ReportRenderer(REPORTS_DIR)
+    renderer.add('evolucao_temporal.png', plot_temporal_patterns, aggregates.monthly_counts())
+
+def analyze_status_distribution(df, aggregates=None, renderer=None):
+    """
+    Analisa a distribuição dos status das reclamações
+    """
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    
+    if 'status' not in aggregates.columns:
+        print("Coluna 'status' não encontrada no dataset")
+        return
+    
+    renderer = renderer or ReportRenderer(REPORTS_DIR)
+    renderer.add('distribuicao_status.png', plot_status_distribution,
+                 aggregates.status_distribution())
+
+def analyze_insights(df, aggregates=None, sketches=None):
     """
     Extrai insights importantes dos dados
+
+    Com `sketches`, total, top empresas, satisfação, empresas distintas e
+    palavras frequentes vêm dos sketches de memória limitada (aproximados,
+    possivelmente acumulando execuções anteriores).
     """
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    
     insights = {
-        'total_reclamacoes': len(df),
+        'total_reclamacoes': aggregates.n_rows if sketches is None else sketches.n_rows,
         'periodo': {
-            'inicio': df['data'].min(),
-            'fim': df['data'].max()
+            'inicio': aggregates.date_min,
+            'fim': aggregates.date_max
         }
     }
     
     # Análise por empresa
-    if 'empresa' in df.columns:
-        empresas_mais_reclamadas = df['empresa'].value_counts().head(5)
-        insights['top_empresas'] = empresas_mais_reclamadas.to_dict()
+    if 'empresa' in aggregates.columns:
+        if sketches is None:
+            insights['top_empresas'] = aggregates.top_empresas(5).to_dict()
+        else:
+            insights['top_empresas'] = sketches.empresa_top(5).to_dict()
+            insights['empresas_distintas'] = round(sketches.empresas_distintas.estimate())
     
     # Análise de satisfação
-    if 'nota' in df.columns:
-        insights['satisfacao'] = {
-            'media': df['nota'].mean(),
-            'mediana': df['nota'].median(),
-            'moda': df['nota'].mode().iloc[0] if not df['nota'].mode().empty else None
-        }
+    if 'nota' in aggregates.columns:
+        if sketches is None:
+            insights['satisfacao'] = aggregates.nota_summary()
+        else:
+            insights['satisfacao'] = sketches.nota_summary()
+    
+    if sketches is not None and 'comentario' in aggregates.columns:
+        insights['palavras_frequentes'] = sketches.palavras.top(20)['count'].to_dict()
     
     # Análise temporal
-    if 'data' in df.columns:
-        df['mes_ano'] = df['data'].dt.to_period('M')
-        reclamacoes_mes = df.groupby('mes_ano').size()
+    if 'data' in aggregates.columns:
+        reclamacoes_mes = aggregates.monthly_counts()
         insights['temporal'] = {
             'mes_mais_reclamacoes': str(reclamacoes_mes.idxmax()),
             'quantidade_max': int(reclamacoes_mes.max())
         }
     
     # Análise de status
-    if 'status' in df.columns:
-        status_counts = df['status'].value_counts()
-        insights['status'] = status_counts.to_dict()
+    if 'status' in aggregates.columns:
+        insights['status'] = aggregates.status_distribution().to_dict()
     
     return insights
 
-def analyze_detailed_insights(df):
+def analyze_detailed_insights(df, aggregates=None):
     """
     Realiza uma análise mais detalhada dos dados para extrair insights específicos
     """
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    
     insights = {}
     
     # Análise de Satisfação por Status
-    if 'nota' in df.columns and 'status' in df.columns:
-        satisfacao_por_status = df.groupby('status')['nota'].agg(['mean', 'count']).round(2)
-        satisfacao_por_status = satisfacao_por_status.sort_values('count', ascending=False)
+    if 'nota' in aggregates.columns and 'status' in aggregates.columns:
+        satisfacao_por_status = aggregates.satisfaction_by_status().round(2)
         insights['satisfacao_por_status'] = satisfacao_por_status.to_dict('index')
     
     # Análise Temporal Detalhada
-    if 'data' in df.columns:
-        df['mes'] = df['data'].dt.month
-        df['ano'] = df['data'].dt.year
-        reclamacoes_por_mes = df.groupby(['ano', 'mes']).size()
+    if 'data' in aggregates.columns:
+        reclamacoes_por_mes = aggregates.monthly_counts()
         insights['tendencia_temporal'] = {
-            f"{ano}-{mes:02d}": int(count)
-            for (ano, mes), count in reclamacoes_por_mes.items()
+            f"{periodo.year}-{periodo.month:02d}": int(count)
+            for periodo, count in reclamacoes_por_mes.items()
         }
     
     # Análise de Palavras Comuns nos Comentários
-    if 'comentario' in df.columns:
-        from collections import Counter
-        import re
-        
-        def clean_text(text):
-            if isinstance(text, str):
-                # Remove caracteres especiais e converte para minúsculas
-                text = re.sub(r'[^\w\s]', '', text.lower())
-                # Remove palavras comuns (stopwords)
-                stopwords = {'de', 'a', 'o', 'que', 'e', 'do', 'da', 'em', 'um', 'para', 'com', 'não', 'uma', 'os', 'no', 'se', 'na', 'por', 'mais', 'as', 'dos', 'como', 'mas'}
-                return ' '.join(word for word in text.split() if word not in stopwords and len(word) > 3)
-            return ''
-        
-        # Processa os comentários
-        all_words = ' '.join(df['comentario'].apply(clean_text).dropna())
-        word_counts = Counter(all_words.split())
-        insights['palavras_frequentes'] = dict(word_counts.most_common(20))
+    if 'comentario' in aggregates.columns:
+        insights['palavras_frequentes'] = aggregates.frequent_words(20)
     
     # Análise de Correlações
-    if 'nota' in df.columns and 'status' in df.columns:
-        # Converter status para numérico para análise de correlação
-        status_map = {status: i for i, status in enumerate(df['status'].unique())}
-        df['status_num'] = df['status'].map(status_map)
-        
-        correlacoes = {}
-        for col in ['status_num']:
-            if col in df.columns:
-                corr = df['nota'].corr(df[col])
-                correlacoes[f'nota_vs_{col}'] = round(corr, 3)
+    if 'nota' in aggregates.columns and 'status' in aggregates.columns:
+        # Status codificado pela ordem de aparição (status_num)
+        correlacoes = {
+            'nota_vs_status_num': round(aggregates.nota_status_correlation(), 3)
+        }
         
         insights['correlacoes'] = correlacoes
     
     return insights
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Análise das reclamações do Consumidor.gov.br")
+    parser.add_argument('--input', type=Path, default=DATA_PATH,
+                        help="arquivo JSON de reclamações (padrão: data/dados2025.json)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="agrega apenas os registros posteriores ao último processamento "
+                             "e atualiza o estado salvo")
+    parser.add_argument('--state', type=Path, default=DEFAULT_STATE_PATH,
+                        help="arquivo do estado do modo incremental")
+    parser.add_argument('--streaming', action='store_true',
+                        help="agrega os dados em blocos, sem carregar o arquivo inteiro")
+    parser.add_argument('--chunk-size', type=int, default=STREAM_CHUNK_SIZE,
+                        help="registros por bloco no modo streaming")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processos usados na leitura do JSON em shards paralelos")
+    parser.add_argument('--top-k-words', type=int, default=None,
+                        help="limita a contagem de palavras às K mais frequentes (memória limitada)")
+    parser.add_argument('--processes', type=int, default=None,
+                        help="processos usados na contagem de palavras de colunas grandes")
+    parser.add_argument('--plot-processes', type=int, default=None,
+                        help="processos usados para desenhar as figuras dos relatórios")
+    parser.add_argument('--approximate', action='store_true',
+                        help="calcula os insights com sketches de memória limitada")
+    parser.add_argument('--sketch-state', type=Path, default=None,
+                        help="arquivo JSON com os sketches acumulados de execuções anteriores "
+                             "(é atualizado ao final; exige --incremental e implica --approximate)")
+    args = parser.parse_args(argv)
+    if args.sketch_state is not None and not args.incremental:
+        # Sem --incremental os sketches cobrem o arquivo inteiro e seriam somados de novo
+        parser.error("--sketch-state exige --incremental")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    
     # Configurações básicas de visualização
     sns.set()
     
     # Criar diretório de reports se não existir
-    Path('reports').mkdir(exist_ok=True)
+    REPORTS_DIR.mkdir(exist_ok=True)
+    
+    # Figuras desenhadas juntas ao final, em paralelo e só quando os dados mudam
+    renderer = ReportRenderer(REPORTS_DIR, processes=args.plot_processes, defer=True)
     
     try:
         # Carregar e processar dados
         print("Carregando dados...")
-        df = load_and_process_data()
+        options = {'word_top_k': args.top_k_words, 'processes': args.processes}
+        approximate = args.approximate or args.sketch_state is not None
+        sketches = ComplaintSketches() if approximate else None
+        if args.incremental:
+            df = None
+            aggregates = incremental_update(args.input, args.state, args.chunk_size,
+                                            sketches=sketches, **options)
+        elif args.streaming:
+            df = None
+            aggregates = stream_and_aggregate(args.chunk_size, sketches=sketches,
+                                              data_path=args.input, **options)
+        else:
+            df = load_and_process_data(workers=args.workers, data_path=args.input)
+            # Todas as métricas em uma única passada sobre os dados
+            aggregates = compute_aggregates(df, **options) if df is not None else None
+            if sketches is not None and df is not None:
+                sketches.update(df)
         
-        if df is not None:
+        if aggregates is not None:
             # Realizar análises básicas
-            analyze_basic_stats(df)
-            analyze_satisfaction(df)
-            analyze_temporal_patterns(df)
-            analyze_status_distribution(df)
+            analyze_basic_stats(df, aggregates)
+            analyze_satisfaction(df, aggregates, renderer)
+            analyze_temporal_patterns(df, aggregates, renderer)
+            analyze_status_distribution(df, aggregates, renderer)
+            renderer.render()
             
             # Realizar análise detalhada
             print("\nRealizando análise detalhada...")
-            detailed_insights = analyze_detailed_insights(df)
+            detailed_insights = analyze_detailed_insights(df, aggregates)
             
             # Salvar insights em um arquivo JSON
-            with open('reports/detailed_insights.json', 'w', encoding='utf-8') as f:
+            with open(REPORTS_DIR / 'detailed_insights.json', 'w', encoding='utf-8') as f:
                 json.dump(detailed_insights, f, ensure_ascii=False, indent=4, default=str)
             
+            if sketches is not None:
+                # Soma os sketches dos registros novos aos das execuções anteriores
+                if args.sketch_state is not None:
+                    if args.sketch_state.exists():
+                        sketches = ComplaintSketches.load(args.sketch_state).merge(sketches)
+                    sketches.save(args.sketch_state)
+                insights = analyze_insights(df, aggregates, sketches)
+                with open(REPORTS_DIR / 'approximate_insights.json', 'w', encoding='utf-8') as f:
+                    json.dump(insights, f, ensure_ascii=False, indent=4, default=str)
+            
             print("\nAnálise concluída! Os resultados foram salvos na pasta 'reports'.")
         
     except FileNotFoundError:
-        print("Erro: Arquivo de dados não encontrado em 'data/dados2025.json'")
+        print(f"Erro: Arquivo de dados não encontrado em '{args.input}'")
     except Exception as e:
         print(f"Erro durante a análise: {str(e)}")
 
@@ -0,0 +1,281 @@
+"""
+Ingestão paralela do dados2025.json em shards por faixa de bytes
+
+O array JSON é dividido em faixas de bytes que terminam em fronteiras de
+registros (vírgulas no nível superior do array). Cada faixa é lida por um
+processo com o mesmo ColumnarBuilder do caminho serial, e as colunas são
+unidas na ordem original, com resultado idêntico ao serial.
+
+As fronteiras são primeiro estimadas procurando `}, {` perto de cada corte
+(custo constante). Um corte estimado dentro de uma string ou de um objeto
+aninhado sempre deixa o shard anterior com JSON incompleto; nesse caso a
+divisão é refeita pela varredura estrutural exata de find_shards.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+import ijson
+from pandas.api.types import union_categoricals
+
+from columnar_loader import BUFFER_TYPES, DEFAULT_SCHEMA, ColumnarBuilder, load_columnar
+
+# Bytes analisados por vez na busca das fronteiras
+SCAN_BLOCK_SIZE = 64 * 1024 * 1024
+
+# Shards por processo, para equilibrar a carga entre os workers
+SHARDS_PER_WORKER = 4
+
+# Fronteira provável entre dois registros e janela de busca a partir do corte
+BOUNDARY_PATTERN = re.compile(rb'\}\s*,\s*\{')
+SEARCH_WINDOW = 1024 * 1024
+
+# Classes de byte relevantes para a varredura estrutural do JSON
+QUOTE, BACKSLASH, COMMA, OPENER, CLOSER = 1, 2, 3, 4, 5
+BYTE_CLASS = np.zeros(256, dtype=np.uint8)
+BYTE_CLASS[ord('"')] = QUOTE
+BYTE_CLASS[ord('\\')] = BACKSLASH
+BYTE_CLASS[ord(',')] = COMMA
+BYTE_CLASS[[ord('{'), ord('[')]] = OPENER
+BYTE_CLASS[[ord('}'), ord(']')]] = CLOSER
+
+
+def _backslash_run(data, end):
+    """Tamanho da sequência de barras invertidas que termina em `end`."""
+    run = 0
+    while end - run >= 0 and data[end - run] == ord('\\'):
+        run += 1
+    return run
+
+
+def _escaped_quotes(data, quotes, backslashes, block_start):
+    """Máscara das aspas precedidas por um número ímpar de barras invertidas."""
+    escaped = np.zeros(quotes.size, dtype=bool)
+    if not quotes.size:
+        return escaped
+
+    if backslashes.size:
+        # Sequências contíguas de barras invertidas: fim e tamanho de cada uma
+        new_run = np.ones(backslashes.size, dtype=bool)
+        new_run[1:] = np.diff(backslashes) != 1
+        run_index = np.flatnonzero(new_run)
+        starts = backslashes[run_index]
+        ends = np.append(backslashes[run_index[1:] - 1], backslashes[-1])
+        lengths = ends - starts + 1
+        if starts[0] == block_start and block_start > 0:
+            # Sequência que começou no bloco anterior
+            lengths[0] += _backslash_run(data, block_start - 1)
+        idx = np.minimum(np.searchsorted(ends, quotes - 1), ends.size - 1)
+        escaped = (ends[idx] == quotes - 1) & (lengths[idx] % 2 == 1)
+
+    if quotes[0] == block_start and block_start > 0:
+        escaped[0] = _backslash_run(data, block_start - 1) % 2 == 1
+    return escaped
+
+
+def find_shards(data_path, n_shards):
+    """
+    Divide o array JSON em até `n_shards` faixas [início, fim) de bytes,
+    cada uma contendo apenas registros completos (sem os colchetes externos).
+    """
+    size = os.path.getsize(data_path)
+    if size == 0:
+        return []
+    data = np.memmap(data_path, dtype=np.uint8, mode='r')
+    targets = [size * i // n_shards for i in range(1, n_shards)]
+
+    array_start = array_end = None
+    cuts = []
+    in_string = 0
+    depth = 0
+    for block_start in range(0, size, SCAN_BLOCK_SIZE):
+        classes = BYTE_CLASS[data[block_start:block_start + SCAN_BLOCK_SIZE]]
+        positions = np.flatnonzero(classes)
+        kinds = classes[positions]
+        positions += block_start
+
+        quote_index = np.flatnonzero(kinds == QUOTE)
+        escaped = _escaped_quotes(data, positions[quote_index],
+                                  positions[kinds == BACKSLASH], block_start)
+        kinds[quote_index[escaped]] = 0
+
+        # Dentro de string: número ímpar de aspas reais antes da posição
+        is_quote = kinds == QUOTE
+        quotes_before = np.cumsum(is_quote) - is_quote + in_string
+        outside = (quotes_before % 2 == 0) & (kinds >= COMMA)
+        positions, kinds = positions[outside], kinds[outside]
+
+        delta = (kinds == OPENER).astype(np.int64) - (kinds == CLOSER)
+        depth_before = depth + np.cumsum(delta) - delta
+
+        if array_start is None:
+            top = positions[(depth_before == 0) & (delta == 1)]
+            if top.size:
+                array_start = int(top[0]) + 1
+        closing = positions[(depth_before == 1) & (delta == -1)]
+        if closing.size:
+            array_end = int(closing[-1])
+
+        commas = positions[(depth_before == 1) & (kinds == COMMA)]
+        while targets and commas.size and commas[-1] >= targets[0]:
+            cut = int(commas[np.searchsorted(commas, targets[0])])
+            if not cuts or cut > cuts[-1]:
+                cuts.append(cut)
+            targets.pop(0)
+
+        in_string = (in_string + int(is_quote.sum())) % 2
+        depth += int(delta.sum())
+
+    if array_start is None or array_end is None:
+        raise ValueError("O arquivo não contém um array JSON válido")
+
+    bounds = [array_start] + [c + 1 for c in cuts]
+    ends = cuts + [array_end]
+    return list(zip(bounds, ends))
+
+
+def guess_shards(data_path, n_shards):
+    """
+    Estima as faixas de bytes lendo apenas uma janela perto de cada corte.
+    Retorna None se o arquivo não começar com '[' e terminar com ']'.
+    """
+    size = os.path.getsize(data_path)
+    with open(data_path, 'rb') as f:
+        head = f.read(SEARCH_WINDOW)
+        stripped = head.lstrip()
+        f.seek(max(size - SEARCH_WINDOW, 0))
+        tail = f.read().rstrip()
+        if not stripped.startswith(b'[') or not tail.endswith(b']'):
+            return None
+        array_start = len(head) - len(stripped) + 1
+        array_end = max(size - SEARCH_WINDOW, 0) + len(tail) - 1
+
+        cuts = []
+        for target in (size * i // n_shards for i in range(1, n_shards)):
+            f.seek(target)
+            window = f.read(SEARCH_WINDOW)
+            match = BOUNDARY_PATTERN.search(window)
+            if match is None:
+                continue
+            cut = target + window.index(b',', match.start())
+            if array_start <= cut < array_end and (not cuts or cut > cuts[-1]):
+                cuts.append(cut)
+
+    bounds = [array_start] + [c + 1 for c in cuts]
+    ends = cuts + [array_end]
+    return list(zip(bounds, ends))
+
+
+class _ShardReader:
+    """Arquivo somente leitura que expõe uma faixa de bytes como array JSON."""
+
+    def __init__(self, data_path, start, end):
+        self.f = open(data_path, 'rb')
+        self.f.seek(start)
+        self.remaining = end - start
+        self.prefix = b'['
+        self.suffix = b']'
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.remaining + 2
+        out = self.prefix[:size]
+        self.prefix = self.prefix[len(out):]
+        size -= len(out)
+        if size > 0 and self.remaining:
+            chunk = self.f.read(min(size, self.remaining))
+            self.remaining -= len(chunk)
+            out += chunk
+            size -= len(chunk)
+        if size > 0 and not self.remaining:
+            tail = self.suffix[:size]
+            self.suffix = self.suffix[len(tail):]
+            out += tail
+        return out
+
+    def close(self):
+        self.f.close()
+
+
+def _parse_shard(task):
+    data_path, start, end, columns, schema = task
+    builder = ColumnarBuilder(columns=columns, schema=schema)
+    reader = _ShardReader(data_path, start, end)
+    try:
+        for record in ijson.items(reader, 'item'):
+            builder.append(record)
+    finally:
+        reader.close()
+    return builder.to_columns()
+
+
+def _concat(kind, arrays):
+    if kind == 'category':
+        return union_categoricals(arrays, sort_categories=False)
+    if kind == 'int8':
+        return pd.concat([pd.Series(a) for a in arrays], ignore_index=True).array
+    if kind == 'datetime':
+        return np.concatenate(arrays)
+    return list(chain.from_iterable(arrays))
+
+
+def merge_shards(parts, columns=None, schema=None):
+    """Une as colunas dos shards na ordem original, como no caminho serial."""
+    schema = dict(DEFAULT_SCHEMA, **(schema or {}))
+    if columns is None:
+        names = list(dict.fromkeys(name for _, data in parts for name in data))
+    else:
+        names = list(columns)
+
+    merged = {}
+    for name in names:
+        kind = schema.get(name, 'object')
+        arrays = []
+        for n_rows, data in parts:
+            if name in data:
+                arrays.append(data[name])
+            else:
+                # Coluna ausente no shard: completa com ausentes do mesmo tipo
+                buffer = BUFFER_TYPES[kind]()
+                buffer.extend([None] * n_rows)
+                arrays.append(buffer.finish())
+        merged[name] = _concat(kind, arrays)
+
+    n_total = sum(n_rows for n_rows, _ in parts)
+    return pd.DataFrame(merged, index=pd.RangeIndex(n_total))
+
+
+def load_columnar_parallel(data_path, columns=None, schema=None, workers=None):
+    """
+    Carrega o JSON em paralelo; o resultado é idêntico ao de load_columnar.
+    Com um único worker usa diretamente o caminho serial.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return load_columnar(data_path, columns=columns, schema=schema)
+
+    n_shards = workers * SHARDS_PER_WORKER
+    shards = guess_shards(data_path, n_shards)
+    parts = None
+    if shards is not None:
+        try:
+            parts = _parse_shards(data_path, shards, columns, schema, workers)
+        except ijson.JSONError:
+            print("Fronteiras estimadas inválidas; refazendo a divisão pela varredura completa...")
+    if parts is None:
+        shards = find_shards(data_path, n_shards)
+        parts = _parse_shards(data_path, shards, columns, schema, workers)
+
+    if not parts:
+        return load_columnar(data_path, columns=columns, schema=schema)
+    return merge_shards(parts, columns=columns, schema=schema)
+
+
+def _parse_shards(data_path, shards, columns, schema, workers):
+    print(f"Processando {len(shards)} shards com {workers} processos...")
+    tasks = [(str(data_path), start, end, columns, schema) for start, end in shards]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_shard, tasks))
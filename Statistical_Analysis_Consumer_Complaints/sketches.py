@@ -0,0 +1,401 @@
+"""
+Sketches de memória limitada para estatísticas aproximadas das reclamações
+
+Todos os sketches são mescláveis (entre blocos e entre execuções) e podem ser
+salvos em JSON, o que permite manter acumulados diários sem reprocessar o
+histórico.
+
+Limites de erro (N = total de itens inseridos):
+- KLLSketch: erro de rank ~ 1,65% com k=200 (99% de confiança), cerca de
+  1/k ao dobrar k; memória O(k).
+- HyperLogLog: erro relativo padrão 1,04/sqrt(2**p) (0,81% com p=14);
+  memória 2**p bytes.
+- SpaceSaving: f <= estimativa <= f + N/capacity para todo item monitorado;
+  todo item com frequência > N/capacity está no resumo.
+- CountMinSketch: f <= estimativa <= f + e*N/width com probabilidade
+  1 - exp(-depth).
+"""
+import base64
+import json
+import os
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from text_analysis import BATCH_SIZE, count_batch
+
+
+def _hash_values(values, hash_key=None):
+    """Hash uint64 estável entre execuções (mesmo valor para object e category)."""
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    series = series.dropna()
+    if hash_key is None:
+        return pd.util.hash_pandas_object(series, index=False).to_numpy()
+    return pd.util.hash_pandas_object(series, index=False, hash_key=hash_key).to_numpy()
+
+
+def _encode_array(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+
+def _decode_array(text, dtype):
+    return np.frombuffer(base64.b64decode(text), dtype=dtype).copy()
+
+
+class KLLSketch:
+    """Sketch de quantis KLL (Karnin, Lang e Liberty)."""
+
+    def __init__(self, k=200, c=2 / 3, seed=0):
+        self.k = k
+        self.c = c
+        self.seed = seed
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng([seed, 0])
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * self.c ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Número ímpar: o último item fica no nível atual
+                keep = items[len(items) - len(items) % 2:]
+                items = items[:len(items) - len(items) % 2]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        """Insere um lote de valores (ausentes são ignorados)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.n += values.size
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level), 2 ** h, dtype=np.float64) for h, level in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Valor aproximado do quantil q (0 a 1)."""
+        if self.n == 0:
+            return np.nan
+        items, cumulative = self._weighted()
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(items[min(index, len(items) - 1)])
+
+    def rank(self, value):
+        """Fração aproximada de itens menores ou iguais a `value`."""
+        if self.n == 0:
+            return np.nan
+        items, cumulative = self._weighted()
+        index = np.searchsorted(items, value, side='right')
+        return float(cumulative[index - 1] / cumulative[-1]) if index else 0.0
+
+    def to_dict(self):
+        return {'k': self.k, 'c': self.c, 'seed': self.seed, 'n': self.n,
+                'levels': [_encode_array(level.astype(np.float64)) for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(k=state['k'], c=state['c'], seed=state['seed'])
+        sketch.n = state['n']
+        sketch.levels = [_decode_array(level, np.float64) for level in state['levels']]
+        sketch._rng = np.random.default_rng([state['seed'], state['n']])
+        return sketch
+
+
+class HyperLogLog:
+    """Contagem aproximada de valores distintos."""
+
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype=np.uint8)
+
+    def update(self, values):
+        hashes = _hash_values(values)
+        if not hashes.size:
+            return self
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes << np.uint64(self.p)
+        # Posição do primeiro bit 1 nos 64 - p bits restantes, sem perda de
+        # precisão (cada metade de 32 bits é exata em float64)
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        with np.errstate(divide='ignore'):
+            bit_length = np.where(
+                high > 0, 33 + np.floor(np.log2(high)),
+                np.where(low > 0, 1 + np.floor(np.log2(low)), 0)
+            )
+        rho = np.minimum(64 - bit_length + 1, 64 - self.p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rho)
+        return self
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("HyperLogLog com precisões diferentes não podem ser mesclados")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = float(self.registers.size)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Correção para cardinalidades pequenas (linear counting)
+            return float(m * np.log(m / zeros))
+        return float(raw)
+
+    def to_dict(self):
+        return {'p': self.p, 'registers': _encode_array(self.registers)}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(p=state['p'])
+        sketch.registers = _decode_array(state['registers'], np.uint8)
+        return sketch
+
+
+class SpaceSaving:
+    """
+    Resumo Space-Saving para itens mais frequentes, com atualização em lote
+    pela regra de mescla de resumos (Cafaro et al.): lotes já agregados são
+    tratados como resumos exatos.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.n = 0
+        self.counts = pd.Series(dtype='int64')
+        self.errors = pd.Series(dtype='int64')
+
+    def _minimum(self):
+        # Enquanto o resumo não está cheio, itens ausentes têm contagem zero
+        return int(self.counts.min()) if len(self.counts) >= self.capacity else 0
+
+    def _combine(self, counts, errors, minimum, n):
+        own_minimum = self._minimum()
+        index = self.counts.index.union(counts.index, sort=False)
+        combined = (self.counts.reindex(index, fill_value=own_minimum)
+                    + counts.reindex(index, fill_value=minimum))
+        combined_errors = (self.errors.reindex(index, fill_value=own_minimum)
+                           + errors.reindex(index, fill_value=minimum))
+        top = combined.sort_values(ascending=False, kind='stable').head(self.capacity)
+        self.counts = top
+        self.errors = combined_errors.reindex(top.index)
+        self.n += n
+
+    def update_counts(self, counts):
+        """Incorpora contagens exatas de um lote (Series item -> contagem)."""
+        counts = counts[counts > 0].astype('int64')
+        counts.index = counts.index.astype(object)
+        if len(counts):
+            self._combine(counts, pd.Series(0, index=counts.index, dtype='int64'), 0,
+                          int(counts.sum()))
+        return self
+
+    def update(self, values):
+        """Incorpora um lote de itens brutos."""
+        return self.update_counts(pd.Series(values, dtype=object).value_counts(sort=False))
+
+    def merge(self, other):
+        self._combine(other.counts, other.errors, other._minimum(), other.n)
+        return self
+
+    def top(self, n=None):
+        """Itens mais frequentes com estimativa (limite superior) e erro máximo."""
+        table = pd.DataFrame({'count': self.counts, 'error': self.errors})
+        return table if n is None else table.head(n)
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'n': self.n,
+                'items': [[item, int(count), int(self.errors[item])]
+                          for item, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(capacity=state['capacity'])
+        sketch.n = state['n']
+        items = [row[0] for row in state['items']]
+        sketch.counts = pd.Series([row[1] for row in state['items']], index=items, dtype='int64')
+        sketch.errors = pd.Series([row[2] for row in state['items']], index=items, dtype='int64')
+        return sketch
+
+
+class CountMinSketch:
+    """Estimativa da frequência de qualquer item em memória fixa."""
+
+    def __init__(self, width=2 ** 12, depth=5):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, values, row):
+        hashes = _hash_values(values, hash_key=f"countmin{row:08d}")
+        return (hashes % np.uint64(self.width)).astype(np.int64)
+
+    def update(self, values, weights=None):
+        for row in range(self.depth):
+            columns = self._columns(values, row)
+            self.table[row] += np.bincount(columns, weights=weights,
+                                           minlength=self.width).astype(np.int64)
+        return self
+
+    def update_counts(self, counts):
+        """Incorpora contagens já agregadas (Series item -> contagem)."""
+        return self.update(pd.Series(counts.index, dtype=object), weights=counts.to_numpy())
+
+    def merge(self, other):
+        if other.table.shape != self.table.shape:
+            raise ValueError("CountMinSketch com dimensões diferentes não podem ser mesclados")
+        self.table += other.table
+        return self
+
+    def estimate(self, items):
+        """Frequência estimada (limite superior) de cada item."""
+        estimates = [self.table[row][self._columns(items, row)] for row in range(self.depth)]
+        return pd.Series(np.min(estimates, axis=0), index=list(items), dtype='int64')
+
+    def to_dict(self):
+        return {'width': self.width, 'depth': self.depth, 'table': _encode_array(self.table)}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(width=state['width'], depth=state['depth'])
+        sketch.table = _decode_array(state['table'], np.int64).reshape(sketch.depth, sketch.width)
+        return sketch
+
+
+class ComplaintSketches:
+    """Conjunto de sketches das análises aproximadas de reclamações."""
+
+    def __init__(self, top_capacity=100):
+        self.n_rows = 0
+        self.nota = KLLSketch()
+        self.nota_soma = 0.0
+        self.nota_frequencias = SpaceSaving(capacity=top_capacity)
+        self.empresas_distintas = HyperLogLog()
+        self.top_empresas = SpaceSaving(capacity=top_capacity)
+        self.empresa_frequencias = CountMinSketch()
+        self.palavras = SpaceSaving(capacity=top_capacity * 10)
+
+    def update(self, df):
+        """Atualiza os sketches com um bloco de linhas."""
+        self.n_rows += len(df)
+        if 'nota' in df.columns:
+            nota = df['nota'].to_numpy(dtype=np.float64, na_value=np.nan)
+            nota = nota[~np.isnan(nota)]
+            self.nota.update(nota)
+            self.nota_soma += float(nota.sum())
+            self.nota_frequencias.update_counts(pd.Series(nota).value_counts(sort=False))
+        if 'empresa' in df.columns:
+            counts = df['empresa'].value_counts(sort=False)
+            counts = counts[counts > 0]
+            self.empresas_distintas.update(pd.Series(counts.index, dtype=object))
+            self.top_empresas.update_counts(counts)
+            self.empresa_frequencias.update_counts(counts)
+        if 'comentario' in df.columns:
+            # Lotes de BATCH_SIZE comentários: o texto da coluna nunca é unido de uma vez
+            comments = df['comentario'].to_numpy(dtype=object)
+            words = Counter()
+            for start in range(0, len(comments), BATCH_SIZE):
+                words.update(count_batch(comments[start:start + BATCH_SIZE]))
+            self.palavras.update_counts(pd.Series(words, dtype='int64'))
+        return self
+
+    def merge(self, other):
+        self.n_rows += other.n_rows
+        self.nota_soma += other.nota_soma
+        for name in SKETCH_FIELDS:
+            getattr(self, name).merge(getattr(other, name))
+        return self
+
+    def empresa_top(self, n=5):
+        """
+        Empresas mais frequentes (Space-Saving) com a contagem estimada pelo
+        menor dos dois limites superiores: Space-Saving e Count-Min.
+        """
+        counts = self.top_empresas.top(n)['count']
+        if not len(counts):
+            return counts
+        estimates = self.empresa_frequencias.estimate(counts.index)
+        return pd.Series(np.minimum(counts.to_numpy(), estimates.to_numpy()),
+                         index=counts.index, dtype='int64')
+
+    def nota_summary(self):
+        """Média (exata), mediana (KLL) e moda das notas."""
+        if self.nota.n == 0:
+            return {'media': np.nan, 'mediana': np.nan, 'moda': None}
+        moda = self.nota_frequencias.top(1).index[0]
+        return {
+            'media': self.nota_soma / self.nota.n,
+            'mediana': self.nota.quantile(0.5),
+            'moda': int(moda) if float(moda).is_integer() else moda
+        }
+
+    def to_dict(self):
+        state = {'n_rows': self.n_rows, 'nota_soma': self.nota_soma}
+        for name in SKETCH_FIELDS:
+            state[name] = getattr(self, name).to_dict()
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        sketches = cls()
+        sketches.n_rows = state['n_rows']
+        sketches.nota_soma = state['nota_soma']
+        for name, sketch_type in SKETCH_FIELDS.items():
+            setattr(sketches, name, sketch_type.from_dict(state[name]))
+        return sketches
+
+    def save(self, path):
+        """Grava o estado em JSON (escrita atômica)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+# Sketches de ComplaintSketches e suas classes (usado na mescla e no JSON)
+SKETCH_FIELDS = {
+    'nota': KLLSketch,
+    'nota_frequencias': SpaceSaving,
+    'empresas_distintas': HyperLogLog,
+    'top_empresas': SpaceSaving,
+    'empresa_frequencias': CountMinSketch,
+    'palavras': SpaceSaving,
+}
@@ -0,0 +1,46 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Módulos do projeto e compartilhados na raiz do repositório
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR.parent))
+sys.path.insert(0, str(PROJECT_DIR))
+
+STATUS = ['Resolvida', 'Não Resolvida', 'Em análise']
+COMENTARIOS = [
+    'Produto chegou quebrado, "atendimento" péssimo!',
+    'Cobrança indevida {duas vezes}, [sem resposta]',
+    'Entrega atrasada\\ e sem previsão',
+    None,
+]
+
+
+def complaint_records(n, seed=0):
+    """Registros sintéticos no formato do dados2025.json (com campos ausentes)."""
+    records = []
+    for i in range(n):
+        record = {
+            'empresa': f'Empresa {(i * 7 + seed) % 13}',
+            'status': STATUS[(i + seed) % 3],
+            'nota': (i * 3 + seed) % 5 + 1,
+            'data': f'2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T10:00:00',
+            'comentario': COMENTARIOS[i % 4],
+        }
+        if i % 11 == 0:
+            del record['nota']
+        if i % 17 == 0:
+            record['canal'] = 'site'
+        records.append(record)
+    return records
+
+
+@pytest.fixture
+def complaints_file(tmp_path):
+    """Arquivo JSON com 500 reclamações sintéticas."""
+    path = tmp_path / 'dados2025.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(complaint_records(500), f, ensure_ascii=False, indent=1)
+    return path
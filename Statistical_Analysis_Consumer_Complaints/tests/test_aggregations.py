@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregations import ComplaintAggregates, compute_aggregates
+from columnar_loader import load_columnar
+
+
+@pytest.fixture
+def complaints(complaints_file):
+    return load_columnar(complaints_file, progress_every=0)
+
+
+def _state(aggregates):
+    return json.loads(json.dumps(aggregates.to_dict()))
+
+
+def test_matches_pandas(complaints):
+    aggregates = compute_aggregates(complaints)
+
+    pd.testing.assert_series_equal(
+        aggregates.top_empresas(), complaints['empresa'].astype(object).value_counts(),
+        check_index_type=False)
+    assert aggregates.status_distribution().to_dict() == complaints['status'].value_counts().to_dict()
+
+    nota = complaints['nota'].astype('float64')
+    expected = nota.describe()
+    pd.testing.assert_series_equal(aggregates.nota_describe(), expected)
+
+    table = aggregates.satisfaction_by_status()
+    expected = (complaints.assign(nota=nota, status=complaints['status'].astype(object))
+                .groupby('status')['nota'].agg(['mean', 'count']).reindex(table.index))
+    np.testing.assert_allclose(table['mean'], expected['mean'])
+    assert table['count'].tolist() == expected['count'].tolist()
+
+    monthly = complaints['data'].dt.to_period('M').value_counts().sort_index()
+    assert aggregates.monthly_counts().tolist() == monthly.tolist()
+
+
+def test_chunks_and_merge_equal_single_pass(complaints):
+    single = _state(compute_aggregates(complaints))
+    assert _state(compute_aggregates(complaints, chunk_size=37)) == single
+
+    merged = ComplaintAggregates().update(complaints.iloc[:200])
+    merged.merge(ComplaintAggregates().update(complaints.iloc[200:]))
+    assert _state(merged) == single
+
+
+def test_state_round_trip(complaints):
+    aggregates = compute_aggregates(complaints.iloc[:300], word_top_k=5)
+    restored = ComplaintAggregates.from_dict(_state(aggregates))
+    assert _state(restored) == _state(aggregates)
+
+    # Continuar a partir do estado salvo equivale a agregar tudo de uma vez
+    restored.update(complaints.iloc[300:])
+    aggregates.update(complaints.iloc[300:])
+    assert _state(restored) == _state(aggregates)
+    assert restored.nota_status_correlation() == pytest.approx(aggregates.nota_status_correlation())
+    assert restored.date_max == complaints['data'].max()
@@ -0,0 +1,31 @@
+import json
+
+import pandas as pd
+
+from columnar_loader import iter_columnar_chunks, load_columnar
+
+
+def test_matches_pandas_reference(complaints_file):
+    with open(complaints_file, encoding='utf-8') as f:
+        expected = pd.DataFrame(json.load(f))
+    df = load_columnar(complaints_file, progress_every=0)
+
+    assert list(df.columns) == list(expected.columns)
+    assert isinstance(df['empresa'].dtype, pd.CategoricalDtype)
+    assert df['nota'].dtype == 'Int8'
+    pd.testing.assert_series_equal(df['empresa'].astype(object), expected['empresa'])
+    pd.testing.assert_series_equal(df['nota'].astype('float64'), expected['nota'].astype('float64'))
+    pd.testing.assert_series_equal(df['data'], pd.to_datetime(expected['data']))
+    assert df['comentario'].tolist() == expected['comentario'].tolist()
+    assert df['canal'].notna().sum() == expected['canal'].notna().sum()
+
+
+def test_chunks_and_column_selection(complaints_file):
+    full = load_columnar(complaints_file, progress_every=0)
+    chunks = list(iter_columnar_chunks(complaints_file, chunk_size=64))
+    assert [len(chunk) for chunk in chunks[:-1]] == [64] * (len(chunks) - 1)
+    assert sum(map(len, chunks)) == len(full)
+
+    selected = load_columnar(complaints_file, columns=['status', 'nota'], progress_every=0)
+    assert list(selected.columns) == ['status', 'nota']
+    pd.testing.assert_frame_equal(selected, full[['status', 'nota']])
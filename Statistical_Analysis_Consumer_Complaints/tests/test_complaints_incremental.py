@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from aggregations import ComplaintAggregates
+from columnar_loader import load_columnar
+from incremental import incremental_update
+
+
+def _records(n, start_day=1):
+    status = ['Resolvida', 'Não Resolvida', 'Em análise']
+    return [{
+        'empresa': f'Empresa {i % 7}',
+        'status': status[i % 3],
+        'nota': i % 5 + 1,
+        'data': f'2025-01-{start_day + i // 10:02d}T{i % 24:02d}:00:00',
+        'comentario': f'produto {i % 4} atraso entrega',
+    } for i in range(n)]
+
+
+def _write(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f)
+    return path
+
+
+def _full(records, tmp_path):
+    aggregates = ComplaintAggregates()
+    aggregates.update(load_columnar(_write(tmp_path / 'full.json', records)))
+    return aggregates.to_dict()
+
+
+def test_incremental_equals_full_with_same_day_late_records(tmp_path):
+    records = _records(60)
+    state = tmp_path / 'state.json'
+    # Primeiro export termina no meio do último dia; o segundo repete o dia inteiro
+    first, second = records[:45], records[40:]
+    incremental_update(_write(tmp_path / 'a.json', first), state, chunk_size=7)
+    aggregates = incremental_update(_write(tmp_path / 'b.json', second), state, chunk_size=7)
+    assert aggregates.to_dict() == _full(records, tmp_path)
+
+
+def test_rerunning_same_export_does_not_double_count(tmp_path):
+    records = _records(30)
+    state = tmp_path / 'state.json'
+    path = _write(tmp_path / 'a.json', records)
+    incremental_update(path, state)
+    aggregates = incremental_update(path, state)
+    assert aggregates.n_rows == 30
+    assert aggregates.to_dict() == _full(records, tmp_path)
+
+
+def test_duplicate_records_on_boundary_day_are_kept(tmp_path):
+    record = _records(1)[0]
+    state = tmp_path / 'state.json'
+    incremental_update(_write(tmp_path / 'a.json', [record, record]), state)
+    # Terceira ocorrência idêntica no mesmo dia é uma reclamação nova
+    aggregates = incremental_update(_write(tmp_path / 'b.json', [record] * 3), state)
+    assert aggregates.n_rows == 3
+
+
+def test_missing_data_column_is_refused(tmp_path):
+    records = [{key: value for key, value in record.items() if key != 'data'}
+               for record in _records(10)]
+    state = tmp_path / 'state.json'
+    with pytest.raises(ValueError, match="'data'"):
+        incremental_update(_write(tmp_path / 'a.json', records), state)
+    assert not state.exists()
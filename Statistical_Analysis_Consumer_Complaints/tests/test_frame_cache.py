@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+
+from cache import FrameCache, cached_load
+from columnar_loader import load_columnar
+
+
+def _loader(calls):
+    def loader(source, columns):
+        calls.append(columns)
+        return load_columnar(source, columns=columns, progress_every=0)
+    return loader
+
+
+def test_round_trip_and_hit(complaints_file, tmp_path):
+    calls = []
+    cache_dir = tmp_path / 'cache'
+    first = cached_load(complaints_file, _loader(calls), cache_dir=cache_dir)
+    second = cached_load(complaints_file, _loader(calls), cache_dir=cache_dir)
+
+    assert calls == [None]
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_entries_per_column_selection(complaints_file, tmp_path):
+    calls = []
+    cache_dir = tmp_path / 'cache'
+    cached_load(complaints_file, _loader(calls), cache_dir=cache_dir)
+    subset = cached_load(complaints_file, _loader(calls), columns=['status'], cache_dir=cache_dir)
+
+    assert calls == [None, ['status']]
+    assert list(subset.columns) == ['status']
+
+
+def test_invalidation(complaints_file, tmp_path):
+    cache = FrameCache(tmp_path / 'cache')
+    cached_load(complaints_file, _loader([]), cache_dir=cache.cache_dir)
+
+    # Só o mtime muda: o hash confirma que a entrada continua válida
+    stat = os.stat(complaints_file)
+    os.utime(complaints_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.is_valid(complaints_file)
+
+    # Mesmo tamanho, conteúdo diferente
+    content = complaints_file.read_bytes()
+    complaints_file.write_bytes(content.replace(b'Empresa 1', b'Empresa X', 1))
+    assert cache.load(complaints_file) is None
@@ -0,0 +1,47 @@
+import json
+
+import pandas as pd
+import pytest
+
+from columnar_loader import load_columnar
+from conftest import complaint_records
+from sharded_loader import find_shards, load_columnar_parallel
+
+
+@pytest.fixture
+def tricky_file(tmp_path):
+    """Strings com '}, {', vírgulas, colchetes e aspas escapadas; JSON compacto."""
+    records = complaint_records(300, seed=3)
+    for i, record in enumerate(records):
+        if i % 5 == 0:
+            record['comentario'] = 'fim}, {"empresa": "falsa"}, [x], \\"' * (i % 3 + 1)
+        if i % 7 == 0:
+            record['detalhes'] = {'itens': [1, {'a': '}, {'}], 'obs': None}
+    path = tmp_path / 'tricky.json'
+    path.write_text(json.dumps(records, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+    return path, records
+
+
+def test_find_shards_split_at_record_boundaries(tricky_file):
+    path, records = tricky_file
+    data = path.read_bytes()
+    for n_shards in (1, 4, 13):
+        shards = find_shards(path, n_shards)
+        assert 1 <= len(shards) <= n_shards
+        parsed = []
+        for start, end in shards:
+            parsed.extend(json.loads(b'[' + data[start:end] + b']'))
+        assert parsed == records
+
+
+@pytest.mark.parametrize('fixture', ['complaints_file', 'tricky_file'])
+def test_parallel_equals_serial(fixture, request):
+    path = request.getfixturevalue(fixture)
+    if isinstance(path, tuple):
+        path = path[0]
+    expected = load_columnar(path, progress_every=0)
+
+    pd.testing.assert_frame_equal(load_columnar_parallel(path, workers=3), expected)
+    columns = ['status', 'nota', 'data']
+    pd.testing.assert_frame_equal(load_columnar_parallel(path, columns=columns, workers=2),
+                                  expected[columns])
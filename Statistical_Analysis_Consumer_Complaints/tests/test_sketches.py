@@ -0,0 +1,99 @@
+import json
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+import sketches as sketches_module
+from sketches import ComplaintSketches
+from text_analysis import count_batch
+
+
+def _frame(n, seed):
+    rng = np.random.default_rng(seed)
+    empresas = [f'Empresa {i}' for i in range(40)]
+    weights = 1 / np.arange(1, 41)
+    return pd.DataFrame({
+        'empresa': rng.choice(empresas, size=n, p=weights / weights.sum()),
+        'nota': pd.array(rng.integers(1, 6, size=n), dtype='Int8'),
+        'comentario': [f'produto {i % 9} entrega atrasada cobrança' for i in range(n)],
+    })
+
+
+def _state(sketches):
+    return ComplaintSketches.from_dict(sketches.to_dict()).to_dict()
+
+
+def test_merge_matches_single_pass_for_exact_sketches():
+    first, second = _frame(3000, 1), _frame(2000, 2)
+    merged = ComplaintSketches().update(first).merge(ComplaintSketches().update(second))
+    single = ComplaintSketches().update(pd.concat([first, second], ignore_index=True))
+
+    assert merged.n_rows == single.n_rows == 5000
+    assert merged.nota.n == 5000
+    assert merged.nota_soma == single.nota_soma
+    np.testing.assert_array_equal(merged.empresas_distintas.registers,
+                                  single.empresas_distintas.registers)
+    np.testing.assert_array_equal(merged.empresa_frequencias.table,
+                                  single.empresa_frequencias.table)
+    # Menos itens distintos que a capacidade: contagens exatas
+    assert merged.top_empresas.top()['count'].to_dict() == single.top_empresas.top()['count'].to_dict()
+    assert merged.palavras.top()['count'].to_dict() == single.palavras.top()['count'].to_dict()
+
+
+def test_round_trip_preserves_state(tmp_path):
+    sketches = ComplaintSketches().update(_frame(1500, 3))
+    assert _state(sketches) == sketches.to_dict()
+    path = tmp_path / 'sketches.json'
+    sketches.save(path)
+    assert ComplaintSketches.load(path).to_dict() == sketches.to_dict()
+
+
+def test_empresa_top_is_bounded_by_true_counts():
+    df = _frame(5000, 4)
+    sketches = ComplaintSketches(top_capacity=10).update(df)
+    true_counts = df['empresa'].value_counts()
+    top = sketches.empresa_top(5)
+    assert len(top) == 5
+    for empresa, estimate in top.items():
+        assert true_counts[empresa] <= estimate <= sketches.top_empresas.top()['count'][empresa]
+
+
+def test_words_are_counted_in_batches(monkeypatch):
+    df = _frame(1000, 5)
+    calls = []
+
+    def counting(texts):
+        calls.append(len(texts))
+        return count_batch(texts)
+
+    monkeypatch.setattr(sketches_module, 'count_batch', counting)
+    monkeypatch.setattr(sketches_module, 'BATCH_SIZE', 300)
+    sketches = ComplaintSketches().update(df)
+    assert calls == [300, 300, 300, 100]
+    expected = count_batch(df['comentario'].tolist())
+    assert sketches.palavras.top()['count'].to_dict() == dict(Counter(expected))
+
+
+def test_sketch_state_requires_incremental(capsys):
+    with pytest.raises(SystemExit):
+        main.parse_args(['--sketch-state', 'sketches.json'])
+    assert '--incremental' in capsys.readouterr().err
+    assert main.parse_args(['--incremental', '--sketch-state', 'sketches.json']).incremental
+
+
+def test_sketch_state_counts_each_record_once(complaints_file, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, 'REPORTS_DIR', tmp_path / 'reports')
+    argv = ['--input', str(complaints_file), '--incremental', '--state', 'state.json',
+            '--sketch-state', 'sketches.json']
+    main.main(argv)
+    main.main(argv)
+
+    saved = ComplaintSketches.load(tmp_path / 'sketches.json')
+    assert saved.n_rows == 500
+    with open(tmp_path / 'reports' / 'approximate_insights.json', encoding='utf-8') as f:
+        insights = json.load(f)
+    assert insights['total_reclamacoes'] == 500
@@ -0,0 +1,19 @@
+from aggregations import compute_aggregates
+from columnar_loader import load_columnar
+from main import stream_and_aggregate
+
+
+def test_streaming_equals_in_memory(complaints_file):
+    expected = compute_aggregates(load_columnar(complaints_file, progress_every=0))
+    streamed = stream_and_aggregate(chunk_size=64, data_path=complaints_file)
+
+    assert streamed.to_dict() == expected.to_dict()
+
+
+def test_streaming_column_selection(complaints_file):
+    streamed = stream_and_aggregate(chunk_size=100, columns=['empresa', 'nota'],
+                                    data_path=complaints_file)
+
+    assert streamed.columns == {'empresa', 'nota'}
+    assert streamed.n_rows == 500
+    assert not streamed.status_counts and not streamed.month_counts
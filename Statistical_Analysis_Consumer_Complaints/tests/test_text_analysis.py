@@ -0,0 +1,49 @@
+import re
+from collections import Counter
+
+from conftest import complaint_records
+from text_analysis import STOPWORDS, WordCounter, count_batch
+
+
+def _reference(comments):
+    """Contagem palavra a palavra, como na implementação original."""
+    counts = Counter()
+    for comment in comments:
+        if isinstance(comment, str):
+            for word in re.sub(r'[^\w\s]', '', comment.lower()).split():
+                if len(word) > 3 and word not in STOPWORDS:
+                    counts[word] += 1
+    return counts
+
+
+def _comments(n=300):
+    return [record['comentario'] for record in complaint_records(n)] + [
+        'Não recebi o PRODUTO; produto com defeito', 'ok', float('nan'),
+    ]
+
+
+def test_batches_equal_reference():
+    comments = _comments()
+    expected = _reference(comments)
+
+    assert count_batch(comments) == expected
+    assert WordCounter(batch_size=7).update(comments).counts == expected
+
+
+def test_merge_equals_single_counter():
+    comments = _comments()
+    merged = WordCounter().update(comments[:100])
+    merged.merge(WordCounter().update(comments[100:]))
+
+    assert merged.counts == WordCounter().update(comments).counts
+
+
+def test_top_k_and_round_trip():
+    comments = _comments()
+    counter = WordCounter(top_k=2, capacity_factor=2, batch_size=50).update(comments)
+
+    assert len(counter.counts) <= 4
+    assert counter.most_common() == _reference(comments).most_common(2)
+    restored = WordCounter.from_dict(counter.to_dict())
+    assert restored.counts == counter.counts
+    assert restored.most_common(10) == counter.most_common(10)
@@ -0,0 +1,112 @@
+"""
+Tokenização em lote e contagem de palavras dos comentários
+
+Os comentários são processados em lotes: cada lote passa uma única vez pela
+regex pré-compilada e pelo split, a contagem é feita pelo Counter em C e as
+stopwords/palavras curtas são removidas depois, sobre o vocabulário (muito
+menor que o número de tokens). O texto de todos os comentários nunca é
+concatenado em uma única string.
+"""
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+STOPWORDS = frozenset({
+    'de', 'a', 'o', 'que', 'e', 'do', 'da', 'em', 'um', 'para', 'com', 'não',
+    'uma', 'os', 'no', 'se', 'na', 'por', 'mais', 'as', 'dos', 'como', 'mas'
+})
+
+# Caracteres especiais removidos antes da separação em palavras
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+
+# Palavras com até este tamanho são descartadas
+MIN_WORD_LENGTH = 3
+
+BATCH_SIZE = 20000
+
+# Abaixo deste número de comentários o modo multiprocesso não compensa
+PARALLEL_THRESHOLD = 200000
+
+
+def _is_relevant(word):
+    return len(word) > MIN_WORD_LENGTH and word not in STOPWORDS
+
+
+def count_batch(texts):
+    """Frequência das palavras relevantes de um lote de comentários."""
+    text = '\n'.join([t for t in texts if isinstance(t, str)]).lower()
+    counts = Counter(NON_WORD_PATTERN.sub('', text).split())
+    for word in [w for w in counts if not _is_relevant(w)]:
+        del counts[word]
+    return counts
+
+
+def _batches(comments, batch_size):
+    values = np.asarray(comments, dtype=object)
+    for start in range(0, len(values), batch_size):
+        yield values[start:start + batch_size]
+
+
+class WordCounter:
+    """
+    Contador incremental de palavras.
+
+    Com `top_k`, mantém no máximo `top_k * capacity_factor` palavras: após
+    cada lote as de menor frequência são descartadas. A memória fica limitada,
+    e as contagens das palavras que sobram são limites inferiores das reais
+    (exatas quando a palavra nunca foi descartada).
+    """
+
+    def __init__(self, top_k=None, capacity_factor=10, processes=None,
+                 batch_size=BATCH_SIZE):
+        self.top_k = top_k
+        self.capacity = top_k * capacity_factor if top_k else None
+        self.processes = processes
+        self.batch_size = batch_size
+        self.counts = Counter()
+
+    def update(self, comments):
+        """Acumula as palavras de uma coluna (ou lista) de comentários."""
+        batches = _batches(comments, self.batch_size)
+        if self.processes and self.processes > 1 and len(comments) >= PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=self.processes) as executor:
+                # map preserva a ordem dos lotes (desempate igual ao serial)
+                for counts in executor.map(count_batch, batches):
+                    self._add(counts)
+        else:
+            for batch in batches:
+                self._add(count_batch(batch))
+        return self
+
+    def merge(self, other):
+        """Incorpora as contagens de outro contador."""
+        self._add(other.counts)
+        return self
+
+    def _add(self, counts):
+        self.counts.update(counts)
+        if self.capacity and len(self.counts) > self.capacity:
+            self.counts = Counter(dict(self.counts.most_common(self.capacity)))
+
+    def most_common(self, n=None):
+        if self.top_k and (n is None or n > self.top_k):
+            n = self.top_k
+        return self.counts.most_common(n)
+
+    def to_dict(self):
+        """Estado serializável em JSON (a ordem das palavras é preservada)."""
+        return {'top_k': self.top_k, 'capacity': self.capacity, 'counts': dict(self.counts)}
+
+    @classmethod
+    def from_dict(cls, state, processes=None, batch_size=BATCH_SIZE):
+        counter = cls(top_k=state['top_k'], processes=processes, batch_size=batch_size)
+        counter.capacity = state['capacity']
+        counter.counts = Counter(state['counts'])
+        return counter
+
+
+def count_words(comments, top_k=None, processes=None):
+    """Frequência das palavras relevantes de uma coluna de comentários."""
+    return WordCounter(top_k=top_k, processes=processes).update(comments)
@@ -7,17 +7,30 @@ from sklearn.metrics import mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 import seaborn as sns
 import statsmodels.api as sm
+import sys
+from pathlib import Path
+
+# Módulos compartilhados na raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.correlation import correlation_matrix
+from common.dtype_optimizer import optimize_dtypes
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'src'))
+from pipeline import PISAFeaturePipeline
 
 class PISAAnalysis:
     def __init__(self, data_path):
         """Inicializa a análise com o caminho do arquivo de dados."""
         self.data_path = data_path
         self.data = None
+        self.pipeline = None
         
     def load_data(self):
         """Carrega e realiza o pré-processamento inicial dos dados."""
         try:
-            self.data = pd.read_csv(self.data_path)
+            raw = optimize_dtypes(pd.read_csv(self.data_path))
+            # Colunas normalizadas e features derivadas do pipeline compartilhado
+            self.pipeline = PISAFeaturePipeline().fit(raw)
+            self.data = self.pipeline.transform(raw)
             print(f"Dados carregados com sucesso. Shape: {self.data.shape}")
         except Exception as e:
             print(f"Erro ao carregar dados: {e}")
@@ -32,13 +45,13 @@ class PISAAnalysis:
         """Analisa correlações entre variáveis selecionadas."""
         if self.data is None:
             return "Dados não carregados"
-        return self.data[variables].corr()
+        return correlation_matrix(self.data[variables])
     
     def t_test_analysis(self, variable, group_var):
         """Realiza teste t para comparar grupos."""
         if self.data is None:
             return "Dados não carregados"
-        groups = [group for _, group in self.data.groupby(group_var)[variable]]
+        groups = [group for _, group in self.data.groupby(group_var, observed=True)[variable]]
         return stats.ttest_ind(*groups)
     
     def regression_model(self, target, features):
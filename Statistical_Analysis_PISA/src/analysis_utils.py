@@ -3,59 +3,148 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy import stats
-from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
+import hashlib
+import os
+import pickle
+import sys
+from functools import cached_property
+from pathlib import Path
+
+# Módulos compartilhados na raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.correlation import correlation_matrix
+from common.dtype_optimizer import optimize_dtypes
+from grouped_regression import grouped_ols
+from model_evaluation import comparison_report, evaluate_models
+from pipeline import MODEL_FEATURES, PISAFeaturePipeline
+from resampling import coefficient_inference, correlation_inference
+
+# Incrementar quando o formato dos dados preparados mudar
+CACHE_VERSION = 2
+
+SOCIOECONOMIC_COLUMNS = [
+    'gini_index',
+    'gdp_per_capita_ppp',
+    'unemployment',
+    'urban_population_pct_total'
+]
+
+# Features dos modelos por grupo quando o grupo tem poucas observações
+GROUPED_FEATURES = {
+    'country': ['expenditure_on_education_pct_gdp', 'gdp_per_capita_ppp']
+}
+
+
+def _json_records(table):
+    """Linhas da tabela como dicts, com None no lugar de NaN (JSON válido)."""
+    return table.astype(object).where(table.notna(), None).to_dict('index')
+
+
+def file_fingerprint(path):
+    """Hash blake2b do conteúdo do arquivo de dados."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
 
 class PISAAnalysis:
-    def __init__(self, data_path):
+    """
+    Análise do dataset do PISA com dados derivados calculados sob demanda.
+
+    Dados preparados, faixas de gasto em educação, correlações com a nota e
+    matriz do modelo são calculados no primeiro acesso, guardados na instância
+    e em disco (`cache_dir`, por padrão data/.cache ao lado do CSV), com chave
+    pelo hash do arquivo de dados.
+    """
+    
+    def __init__(self, data_path, cache_dir=None, use_cache=True):
         """Inicializa a análise com o dataset do PISA."""
-        self.data = pd.read_csv(data_path)
-        self.prepare_data()
-        
-    def prepare_data(self):
-        """Prepara os dados para análise."""
-        # Renomeia colunas para remover espaços extras
-        self.data.columns = [col.strip().replace(' ', '_') for col in self.data.columns]
-        
-        # Cria features agregadas
-        self.data['education_gdp_ratio'] = (
-            self.data['expenditure_on_education_pct_gdp'] / 
-            self.data['gdp_per_capita_ppp']
-        )
-        
-        # Categoriza países por nível de desenvolvimento
-        gdp_median = self.data['gdp_per_capita_ppp'].median()
-        self.data['development_level'] = np.where(
-            self.data['gdp_per_capita_ppp'] > gdp_median,
-            'High_Income',
-            'Low_Income'
-        )
+        self.data_path = Path(data_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.data_path.parent / '.cache'
+        self.use_cache = use_cache
+    
+    @cached_property
+    def fingerprint(self):
+        return file_fingerprint(self.data_path)
+    
+    def _cached(self, name, compute):
+        """Resultado de `compute()` salvo em disco para este arquivo de dados."""
+        if not self.use_cache:
+            return compute()
+        path = self.cache_dir / f"pisa_{name}_v{CACHE_VERSION}_{self.fingerprint}.pkl"
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+        result = compute()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=4)
+        os.replace(tmp_path, path)
+        return result
+    
+    @cached_property
+    def _prepared(self):
+        def compute():
+            raw = optimize_dtypes(pd.read_csv(self.data_path))
+            pipeline = PISAFeaturePipeline().fit(raw)
+            return pipeline, pipeline.transform(raw)
+        return self._cached('data', compute)
+    
+    @property
+    def pipeline(self):
+        """PISAFeaturePipeline ajustado a este arquivo de dados."""
+        return self._prepared[0]
+    
+    @property
+    def data(self):
+        """Dataset carregado e preparado pelo pipeline."""
+        return self._prepared[1]
+    
+    @cached_property
+    def spending_groups(self):
+        """Quartis de gasto em educação de cada linha."""
+        return self._cached('spending_groups', lambda: pd.qcut(
+            self.data['expenditure_on_education_pct_gdp'],
+            q=4,
+            labels=['Low', 'Medium-Low', 'Medium-High', 'High']
+        ))
+    
+    @cached_property
+    def rating_correlations(self):
+        """Correlação de cada coluna numérica com a nota."""
+        return self._cached('rating_correlations',
+                            lambda: correlation_matrix(self.data)['rating'])
+    
+    @cached_property
+    def model_matrix(self):
+        """Features padronizadas e nota das linhas completas para o modelo."""
+        return self._cached('model_matrix', lambda: self.pipeline.model_matrix(self.data))
     
     def get_basic_stats(self):
         """Retorna estatísticas básicas do dataset."""
         return {
-            'total_countries': self.data['country'].nunique(),
-            'year_range': (self.data['time'].min(), self.data['time'].max()),
-            'avg_rating': self.data['rating'].mean(),
-            'rating_std': self.data['rating'].std()
+            'total_countries': int(self.data['country'].nunique()),
+            'year_range': (int(self.data['time'].min()), int(self.data['time'].max())),
+            'avg_rating': float(self.data['rating'].mean()),
+            'rating_std': float(self.data['rating'].std())
         }
     
     def analyze_education_spending(self):
         """Analisa relação entre gastos em educação e desempenho."""
-        correlation = self.data['expenditure_on_education_pct_gdp'].corr(
-            self.data['rating']
-        )
+        correlation = self.rating_correlations['expenditure_on_education_pct_gdp']
         
         # Agrupa por nível de gasto em educação
-        spending_groups = pd.qcut(
-            self.data['expenditure_on_education_pct_gdp'],
-            q=4,
-            labels=['Low', 'Medium-Low', 'Medium-High', 'High']
-        )
-        
-        performance_by_spending = self.data.groupby(spending_groups)['rating'].mean()
+        performance_by_spending = self.data.groupby(
+            self.spending_groups, observed=True
+        )['rating'].mean()
         
         return {
             'correlation': correlation,
@@ -64,40 +153,11 @@ class PISAAnalysis:
     
     def analyze_socioeconomic_factors(self):
         """Analisa fatores socioeconômicos e sua relação com desempenho."""
-        socioeconomic_cols = [
-            'gini_index',
-            'gdp_per_capita_ppp',
-            'unemployment',
-            'urban_population_pct_total'
-        ]
-        
-        correlations = {
-            col: self.data[col].corr(self.data['rating'])
-            for col in socioeconomic_cols
-        }
-        
-        return correlations
+        return {col: self.rating_correlations[col] for col in SOCIOECONOMIC_COLUMNS}
     
     def create_regression_model(self):
         """Cria modelo de regressão para prever notas."""
-        features = [
-            'expenditure_on_education_pct_gdp',
-            'gdp_per_capita_ppp',
-            'gini_index',
-            'unemployment',
-            'urban_population_pct_total'
-        ]
-        
-        # Remove linhas com valores ausentes
-        model_data = self.data.dropna(subset=features + ['rating'])
-        
-        # Prepara features e target
-        X = model_data[features]
-        y = model_data['rating']
-        
-        # Normaliza features
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
+        X_scaled, y = self.model_matrix
         
         # Split dados
         X_train, X_test, y_train, y_test = train_test_split(
@@ -114,7 +174,7 @@ class PISAAnalysis:
         mse = mean_squared_error(y_test, y_pred)
         
         # Prepara coeficientes
-        feature_importance = dict(zip(features, model.coef_))
+        feature_importance = dict(zip(MODEL_FEATURES, model.coef_))
         
         return {
             'r2_score': r2,
@@ -122,6 +182,57 @@ class PISAAnalysis:
             'feature_importance': feature_importance
         }
     
+    def compare_models(self, n_jobs=None):
+        """
+        Validação cruzada (k-fold e por país) de OLS, Ridge, Lasso e gradient
+        boosting sobre a matriz do modelo, ordenada pelo RMSE médio.
+        """
+        X_scaled, y = self.model_matrix
+        groups = self.data.loc[y.index, 'country'].to_numpy()
+        return evaluate_models(X_scaled, y, groups=groups, n_jobs=n_jobs or os.cpu_count())
+    
+    def grouped_regression(self, by='country', features=None, standard_errors=True):
+        """
+        Um modelo de regressão (escala original) para cada valor de `by`,
+        ex.: 'country', 'time' ou 'sex'.
+
+        As linhas TOT, BOY e GIRL de um país e ano têm as mesmas features;
+        fora do agrupamento por sexo só as linhas TOT são usadas, para não
+        contar a mesma observação três vezes. Por país há no máximo um ponto
+        por ano (cerca de 6), então o padrão são só as features de
+        GROUPED_FEATURES; os demais agrupamentos usam as do modelo global.
+        """
+        if features is None:
+            features = GROUPED_FEATURES.get(by, MODEL_FEATURES)
+        data = self.data if by == 'sex' else self.data[self.data['sex'] == 'TOT']
+        return grouped_ols(data, features, 'rating', by, standard_errors=standard_errors)
+    
+    def resampling_analysis(self, n_resamples=10000, seed=42, processes=None, cluster='country'):
+        """
+        Intervalos de confiança bootstrap e p-valores de permutação das
+        correlações com a nota e dos coeficientes do modelo (todas as linhas).
+
+        As linhas TOT, BOY e GIRL de um país e ano têm as mesmas features, e
+        os anos de um país não são independentes: a reamostragem sorteia e
+        permuta grupos inteiros de `cluster` (None reamostra linhas).
+        """
+        columns = ['expenditure_on_education_pct_gdp'] + SOCIOECONOMIC_COLUMNS
+        options = {'n_resamples': n_resamples, 'seed': seed,
+                   'processes': processes or os.cpu_count()}
+        groups = self.data[cluster].to_numpy() if cluster else None
+        correlations = correlation_inference(self.data, columns, groups=groups, **options)
+        X_scaled, y = self.model_matrix
+        if cluster:
+            groups = self.data.loc[y.index, cluster].to_numpy()
+        coefficients = coefficient_inference(X_scaled, y, MODEL_FEATURES, groups=groups, **options)
+        return {
+            'n_resamples': n_resamples,
+            'seed': seed,
+            'cluster': cluster,
+            'correlations': _json_records(correlations),
+            'coefficients': _json_records(coefficients)
+        }
+    
     def plot_performance_trends(self, save_path=None):
         """Plota tendências de desempenho ao longo do tempo."""
         plt.figure(figsize=(12, 6))
@@ -141,8 +252,12 @@ class PISAAnalysis:
         else:
             plt.show()
     
-    def generate_summary_report(self):
-        """Gera relatório resumido da análise."""
+    def generate_summary_report(self, resampling=False, model_comparison=False):
+        """
+        Gera relatório resumido da análise. Reamostragem (`resampling`) e
+        comparação de modelos por validação cruzada (`model_comparison`) são
+        mais demoradas e só entram no relatório quando pedidas.
+        """
         basic_stats = self.get_basic_stats()
         education_analysis = self.analyze_education_spending()
         socioeconomic = self.analyze_socioeconomic_factors()
@@ -154,5 +269,9 @@ class PISAAnalysis:
             'socioeconomic_factors': socioeconomic,
             'regression_model': model_results
         }
+        if resampling:
+            report['resampling'] = self.resampling_analysis()
+        if model_comparison:
+            report['model_comparison'] = comparison_report(self.compare_models())
         
         return report
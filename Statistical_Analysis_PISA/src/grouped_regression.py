@@ -0,0 +1,87 @@
+"""
+Regressão linear por grupo (país, ano, sexo...) em um único cálculo em lote
+
+As linhas são ordenadas uma vez pelo grupo; X'X, X'y e y'y de todos os grupos
+saem de np.add.reduceat sobre os produtos por linha, e os sistemas normais
+(pequenos, k x k) são resolvidos juntos com np.linalg.solve em lote. As
+features são padronizadas com média e desvio globais antes do cálculo (melhor
+condicionamento) e os coeficientes voltam para a escala original.
+
+Grupos sem graus de liberdade (linhas <= parâmetros: ajuste exato, R²
+sem sentido) ou com sistema mal condicionado (feature constante ou linhas
+repetidas no grupo, por exemplo) ficam com coeficientes NaN.
+"""
+import numpy as np
+import pandas as pd
+
+# Número de condição acima do qual o sistema do grupo é considerado singular
+MAX_CONDITION = 1e10
+
+
+def grouped_ols(data, features, target, by, standard_errors=False):
+    """
+    Ajusta `target ~ intercepto + features` separadamente para cada valor de
+    `by`. Retorna uma tabela com uma linha por grupo: n, r2, rmse,
+    intercepto e coeficientes (e, com `standard_errors`, erros padrão).
+    """
+    data = data.dropna(subset=list(features) + [target, by])
+    codes, groups = pd.factorize(data[by], sort=True)
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+
+    X = data[features].to_numpy(dtype=np.float64)[order]
+    y = data[target].to_numpy(dtype=np.float64)[order]
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    std[std == 0] = 1.0
+    X = np.column_stack([np.ones(len(X)), (X - mean) / std])
+    n_rows, k = X.shape
+
+    # Início de cada grupo nas linhas ordenadas
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    counts = np.diff(np.r_[starts, n_rows])
+    gram = np.add.reduceat((X[:, :, None] * X[:, None, :]).reshape(n_rows, k * k),
+                           starts, axis=0).reshape(-1, k, k)
+    moment = np.add.reduceat(X * y[:, None], starts, axis=0)
+    sum_y = np.add.reduceat(y, starts)
+    sum_yy = np.add.reduceat(y * y, starts)
+
+    valid = counts > k
+    beta = np.full((len(starts), k), np.nan)
+    if valid.any():
+        valid[valid] = np.linalg.cond(gram[valid]) < MAX_CONDITION
+        beta[valid] = np.linalg.solve(gram[valid], moment[valid][..., None])[..., 0]
+
+    # Somas de quadrados a partir dos agregados (sem revisitar as linhas)
+    sse = sum_yy - 2 * np.einsum('gk,gk->g', beta, moment) + np.einsum('gi,gij,gj->g', beta, gram, beta)
+    sse = np.maximum(sse, 0)
+    sst = sum_yy - sum_y ** 2 / counts
+    dof = counts - k
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r2 = 1 - sse / sst
+        rmse = np.sqrt(sse / counts)
+
+    # Coeficientes na escala original das features
+    coefficients = beta[:, 1:] / std
+    intercept = beta[:, 0] - coefficients @ mean
+    table = pd.DataFrame(coefficients, columns=list(features))
+    table.insert(0, 'intercept', intercept)
+    table.insert(0, 'rmse', rmse)
+    table.insert(0, 'r2', r2)
+    table.insert(0, 'n', counts)
+
+    if standard_errors:
+        inverse = np.full_like(gram, np.nan)
+        if valid.any():
+            inverse[valid] = np.linalg.inv(gram[valid])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sigma2 = np.where(dof > 0, sse / dof, np.nan)
+            se = np.sqrt(sigma2[:, None] * np.diagonal(inverse, axis1=1, axis2=2))
+        # Variância do intercepto original: a' Var(beta) a, a = (1, -mean/std)
+        a = np.r_[1.0, -mean / std]
+        se_intercept = np.sqrt(sigma2 * np.einsum('i,gij,j->g', a, inverse, a))
+        table['se_intercept'] = se_intercept
+        for j, feature in enumerate(features):
+            table[f'se_{feature}'] = se[:, j + 1] / std[j]
+
+    table.index = pd.Index(groups, name=by)
+    return table
@@ -0,0 +1,92 @@
+"""
+Comparação de modelos de regressão por validação cruzada paralela
+
+Cada (esquema de validação, modelo, fold) é uma tarefa do joblib; matrizes
+grandes chegam aos workers como memmap somente leitura (`max_nbytes` do
+Parallel), sem cópia por tarefa. Esquemas:
+
+- `kfold`: KFold embaralhado;
+- `group_kfold`: GroupKFold por país (países inteiros fora do treino).
+
+A padronização faz parte de cada modelo (Pipeline ajustado só no treino do
+fold), de modo que as estatísticas do fold de teste não vazam para o ajuste.
+"""
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import GroupKFold, KFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+N_SPLITS = 5
+
+
+def default_models(seed=42):
+    """
+    OLS, caminhos de Ridge e Lasso e gradient boosting; os modelos lineares
+    padronizam as features dentro do próprio Pipeline.
+    """
+    models = {'ols': make_pipeline(StandardScaler(), LinearRegression())}
+    for alpha in [0.1, 1.0, 10.0, 100.0]:
+        models[f'ridge_alpha_{alpha:g}'] = make_pipeline(StandardScaler(), Ridge(alpha=alpha))
+    for alpha in [0.01, 0.1, 1.0]:
+        models[f'lasso_alpha_{alpha:g}'] = make_pipeline(
+            StandardScaler(), Lasso(alpha=alpha, max_iter=10000))
+    models['gradient_boosting'] = GradientBoostingRegressor(random_state=seed)
+    return models
+
+
+def _score_fold(model, X, y, train, test):
+    model = clone(model).fit(X[train], y[train])
+    predicted = model.predict(X[test])
+    return {
+        'r2': r2_score(y[test], predicted),
+        'rmse': float(np.sqrt(mean_squared_error(y[test], predicted))),
+        'mae': mean_absolute_error(y[test], predicted),
+    }
+
+
+def evaluate_models(X, y, groups=None, models=None, n_splits=N_SPLITS, n_jobs=None, seed=42):
+    """
+    Validação cruzada de todos os modelos. Retorna uma linha por (esquema,
+    modelo) com média e desvio das métricas nos folds e a posição do modelo
+    no esquema (1 = menor RMSE médio).
+    """
+    models = default_models(seed) if models is None else models
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    splits = {'kfold': list(KFold(n_splits, shuffle=True, random_state=seed).split(X))}
+    if groups is not None:
+        splits['group_kfold'] = list(GroupKFold(n_splits).split(X, y, groups))
+
+    tasks = [
+        (scheme, name, fold, train, test)
+        for scheme, folds in splits.items()
+        for name in models
+        for fold, (train, test) in enumerate(folds)
+    ]
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_score_fold)(models[name], X, y, train, test)
+        for _, name, _, train, test in tasks
+    )
+
+    folds = pd.DataFrame(scores)
+    folds[['esquema', 'modelo', 'fold']] = [task[:3] for task in tasks]
+    table = folds.groupby(['esquema', 'modelo'])[['r2', 'rmse', 'mae']].agg(['mean', 'std'])
+    table.columns = [f'{metric}_{stat}' for metric, stat in table.columns]
+    table = table.reset_index()
+    table['posicao'] = table.groupby('esquema')['rmse_mean'].rank(method='min').astype(int)
+    return table.sort_values(['esquema', 'posicao'], ignore_index=True)
+
+
+def comparison_report(table):
+    """Tabela de comparação no formato do analysis_report.json."""
+    return {
+        scheme: rows.drop(columns='esquema').to_dict('records')
+        for scheme, rows in table.groupby('esquema')
+    }
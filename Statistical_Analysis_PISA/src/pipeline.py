@@ -0,0 +1,127 @@
+"""
+Pipeline único de preparação dos dados do PISA
+
+Declara em um só lugar a normalização dos nomes de colunas, as features
+derivadas (`education_gdp_ratio`, `development_level`), a padronização das
+features do modelo e a montagem da matriz do modelo. Os parâmetros aprendidos
+no fit (mediana do PIB, médias e desvios) são serializáveis em JSON, de modo
+que o mesmo pipeline ajustado pode transformar novos arquivos (batch scoring).
+"""
+import json
+import re
+
+import numpy as np
+
+PIPELINE_VERSION = 1
+
+TARGET = 'rating'
+
+MODEL_FEATURES = [
+    'expenditure_on_education_pct_gdp',
+    'gdp_per_capita_ppp',
+    'gini_index',
+    'unemployment',
+    'urban_population_pct_total'
+]
+
+
+def normalize_column(name):
+    """Espaços viram "_", sem "_" repetidos ("expenditure_on _education" -> "expenditure_on_education")."""
+    return re.sub(r'[\s_]+', '_', name.strip())
+
+
+class PISAFeaturePipeline:
+    """Normalização, features derivadas, padronização e matriz do modelo."""
+
+    def __init__(self, features=MODEL_FEATURES, target=TARGET):
+        self.features = list(features)
+        self.target = target
+        self.gdp_median = None
+        self.mean = None
+        self.scale = None
+
+    @property
+    def fitted(self):
+        return self.mean is not None
+
+    def _normalize(self, data):
+        data = data.copy()
+        data.columns = [normalize_column(col) for col in data.columns]
+        return data
+
+    def _complete_rows(self, data, require_target=True):
+        columns = self.features + ([self.target] if require_target else [])
+        return data.dropna(subset=columns)
+
+    def fit(self, data):
+        """Aprende a mediana do PIB e a média/desvio das features (linhas completas)."""
+        data = self._normalize(data)
+        self.gdp_median = float(data['gdp_per_capita_ppp'].median())
+        X = self._complete_rows(data)[self.features].to_numpy(dtype=np.float64)
+        self.mean = X.mean(axis=0)
+        # Desvio populacional, como o StandardScaler; colunas constantes ficam com 1
+        scale = X.std(axis=0)
+        self.scale = np.where(scale > 0, scale, 1.0)
+        return self
+
+    def transform(self, data):
+        """Dados com colunas normalizadas e features derivadas."""
+        if not self.fitted:
+            raise ValueError("Pipeline não ajustado: chame fit() antes de transform()")
+        data = self._normalize(data)
+
+        # Cria features agregadas
+        data['education_gdp_ratio'] = (
+            data['expenditure_on_education_pct_gdp'] /
+            data['gdp_per_capita_ppp']
+        )
+
+        # Categoriza países por nível de desenvolvimento
+        data['development_level'] = np.where(
+            data['gdp_per_capita_ppp'] > self.gdp_median,
+            'High_Income',
+            'Low_Income'
+        )
+        return data
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+    def model_matrix(self, prepared, require_target=True):
+        """
+        Features padronizadas das linhas completas de dados já transformados
+        e a nota (Series, ou None com `require_target=False`).
+        """
+        rows = self._complete_rows(prepared, require_target)
+        X_scaled = (rows[self.features].to_numpy(dtype=np.float64) - self.mean) / self.scale
+        return X_scaled, rows[self.target] if require_target else None
+
+    def to_dict(self):
+        return {
+            'version': PIPELINE_VERSION,
+            'features': self.features,
+            'target': self.target,
+            'gdp_median': self.gdp_median,
+            'mean': None if self.mean is None else self.mean.tolist(),
+            'scale': None if self.scale is None else self.scale.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        if state.get('version') != PIPELINE_VERSION:
+            raise ValueError(f"Versão do pipeline não suportada: {state.get('version')}")
+        pipeline = cls(state['features'], state['target'])
+        pipeline.gdp_median = state['gdp_median']
+        if state['mean'] is not None:
+            pipeline.mean = np.array(state['mean'])
+            pipeline.scale = np.array(state['scale'])
+        return pipeline
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -1,92 +1,48 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
+import argparse
 import os
 import json
 
-def analyze_pisa_data(data_path):
-    """Realiza análise completa dos dados do PISA."""
-    # Carrega dados
-    df = pd.read_csv(data_path)
+from analysis_utils import PISAAnalysis
+from model_evaluation import comparison_report
+
+def analyze_pisa_data(data_path, resampling=False, model_comparison=False):
+    """
+    Realiza análise completa dos dados do PISA. Reamostragem e comparação de
+    modelos por validação cruzada só são calculadas quando pedidas.
+    """
+    # Dados, features derivadas e matriz do modelo vêm do PISAFeaturePipeline
+    analysis = PISAAnalysis(data_path)
     
     # Análise básica
-    basic_stats = {
-        'total_countries': df['country'].nunique(),
-        'year_range': (int(df['time'].min()), int(df['time'].max())),
-        'avg_rating': float(df['rating'].mean()),
-        'rating_std': float(df['rating'].std())
-    }
+    basic_stats = analysis.get_basic_stats()
     
     # Análise de gastos em educação
+    spending = analysis.analyze_education_spending()
     education_spending = {
-        'correlation': float(df['expenditure_on _education_pct_gdp'].corr(df['rating'])),
-        'avg_by_spending_level': df.groupby(pd.qcut(
-            df['expenditure_on _education_pct_gdp'], 
-            q=4, 
-            labels=['Low', 'Medium-Low', 'Medium-High', 'High']
-        ))['rating'].mean().to_dict()
+        'correlation': float(spending['correlation']),
+        'avg_by_spending_level': spending['performance_by_spending']
     }
     
     # Análise socioeconômica
     socioeconomic_factors = {
-        col: float(df[col].corr(df['rating']))
-        for col in ['gini_index', 'gdp_per_capita_ppp', 'unemployment', 'urban_population_pct_total']
+        col: float(corr) for col, corr in analysis.analyze_socioeconomic_factors().items()
     }
     
     # Modelo de regressão
-    features = [
-        'expenditure_on _education_pct_gdp',
-        'gdp_per_capita_ppp',
-        'gini_index',
-        'unemployment',
-        'urban_population_pct_total'
-    ]
-    
-    model_data = df.dropna(subset=features + ['rating'])
-    X = model_data[features]
-    y = model_data['rating']
-    
-    # Normaliza features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    # Split e treino
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_scaled, y, test_size=0.2, random_state=42
-    )
-    
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-    
-    y_pred = model.predict(X_test)
-    
+    model = analysis.create_regression_model()
     model_results = {
-        'r2_score': float(r2_score(y_test, y_pred)),
-        'mse': float(mean_squared_error(y_test, y_pred)),
-        'feature_importance': dict(zip(features, map(float, model.coef_)))
+        'r2_score': float(model['r2_score']),
+        'mse': float(model['mse']),
+        'feature_importance': {
+            feature: float(coef) for feature, coef in model['feature_importance'].items()
+        }
     }
     
-    # Gera gráfico de tendências
-    plt.figure(figsize=(12, 6))
-    yearly_avg = df.groupby('time')['rating'].mean()
-    plt.plot(yearly_avg.index, yearly_avg.values, marker='o')
-    plt.title('Tendência de Desempenho no PISA ao Longo do Tempo')
-    plt.xlabel('Ano')
-    plt.ylabel('Pontuação Média')
-    plt.grid(True)
-    
     # Cria diretório reports se não existir
     os.makedirs('../reports', exist_ok=True)
     
-    # Salva gráfico
-    plt.savefig('../reports/performance_trends.png')
-    plt.close()
+    # Gera gráfico de tendências
+    analysis.plot_performance_trends('../reports/performance_trends.png')
     
     # Prepara relatório final
     report = {
@@ -96,15 +52,33 @@ def analyze_pisa_data(data_path):
         'regression_model': model_results
     }
     
+    # Intervalos bootstrap e p-valores de permutação (todas as linhas)
+    if resampling:
+        report['resampling'] = analysis.resampling_analysis()
+    
+    # Validação cruzada (k-fold e por país) de vários modelos
+    if model_comparison:
+        report['model_comparison'] = comparison_report(analysis.compare_models())
+    
     # Salva relatório
     with open('../reports/analysis_report.json', 'w', encoding='utf-8') as f:
         json.dump(report, f, indent=4, ensure_ascii=False)
     
     return report
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Análise dos dados do PISA")
+    parser.add_argument('--resampling', action='store_true',
+                        help="inclui intervalos bootstrap e p-valores de permutação (demorado)")
+    parser.add_argument('--compare-models', action='store_true',
+                        help="inclui a comparação de modelos por validação cruzada (demorado)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
     data_path = '../data/economics_and_education_dataset_CSV.csv'
-    results = analyze_pisa_data(data_path)
+    results = analyze_pisa_data(data_path, resampling=args.resampling,
+                                model_comparison=args.compare_models)
     print("Análise completa! Resultados salvos em reports/")
     
     # Mostra alguns resultados principais
@@ -0,0 +1,252 @@
+"""
+Intervalos de confiança por bootstrap e p-valores por permutação
+
+As reamostragens são processadas em blocos como operações matriciais:
+
+- bootstrap: cada reamostragem é um vetor de pesos multinomiais (quantas vezes
+  cada linha foi sorteada); somas ponderadas de todas as reamostragens do bloco
+  saem de um único produto matricial, e os coeficientes da regressão de um
+  sistema normal em lote (np.linalg.solve);
+- permutação: as notas permutadas formam uma matriz (reamostragens x linhas)
+  multiplicada pelas features padronizadas (correlações); nos coeficientes,
+  o teste de cada feature é o de Freedman–Lane: os resíduos do modelo sem a
+  feature são permutados e somados aos seus valores ajustados, e a
+  estatística t da feature no modelo completo sai da pseudo-inversa aplicada
+  à matriz de respostas permutadas.
+
+Com `groups`, as linhas de um mesmo grupo (ex.: país) não são tratadas como
+independentes: o bootstrap sorteia grupos inteiros (todas as linhas de um
+grupo recebem o peso do grupo) e a permutação move grupos inteiros, trocando
+cada grupo apenas com outros do mesmo tamanho e mantendo a ordem das linhas
+dentro dele.
+
+Os blocos têm sementes derivadas de um único SeedSequence e são distribuídos
+em um pool de processos; o resultado depende só da semente, não do número de
+processos.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Reamostragens por bloco (cada bloco é uma tarefa do pool)
+CHUNK_SIZE = 500
+
+
+def _map_chunks(function, arrays, n_resamples, seed_sequence, processes, chunk_size):
+    sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    jobs = [(arrays, child, size) for child, size in zip(seed_sequence.spawn(len(sizes)), sizes)]
+    if processes and processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(jobs))) as executor:
+            results = list(executor.map(function, jobs))
+    else:
+        results = [function(job) for job in jobs]
+    return np.concatenate(results)
+
+
+def _group_codes(groups, n):
+    """Código inteiro do grupo de cada linha (sem grupos, cada linha é um grupo)."""
+    if groups is None:
+        return np.arange(n)
+    codes, _ = pd.factorize(np.asarray(groups))
+    if len(codes) != n:
+        raise ValueError(f"groups tem {len(codes)} valores para {n} linhas")
+    if (codes < 0).any():
+        raise ValueError("groups não pode ter valores ausentes")
+    return codes
+
+
+def _bootstrap_weights(rng, codes, size):
+    """Pesos multinomiais (reamostragens x linhas) sorteando grupos inteiros."""
+    n_groups = codes.max() + 1
+    draws = rng.multinomial(n_groups, np.full(n_groups, 1 / n_groups), size=size)
+    return draws[:, codes].astype(np.float64)
+
+
+def _block_permutations(rng, codes, size):
+    """
+    Permutações (reamostragens x linhas) das posições que movem grupos
+    inteiros: um grupo só troca de lugar com outro do mesmo tamanho, e a
+    ordem das linhas dentro dele é mantida.
+    """
+    order = np.argsort(codes, kind='stable')
+    _, starts, counts = np.unique(codes[order], return_index=True, return_counts=True)
+    result = np.empty((size, len(codes)), dtype=np.intp)
+    for length in np.unique(counts):
+        first = starts[counts == length]
+        # rows[i] = posições das linhas do i-ésimo grupo deste tamanho
+        rows = order[first[:, None] + np.arange(length)]
+        shuffled = rng.random((size, len(first))).argsort(axis=1)
+        result[:, rows.ravel()] = rows[shuffled].reshape(size, -1)
+    return result
+
+
+def _correlation_arrays(x, y, codes):
+    """Features centradas com zeros nos ausentes, máscara, nota centrada e grupos."""
+    mask = ~np.isnan(x)
+    centered = np.where(mask, x - np.nanmean(x, axis=0), 0.0)
+    return centered, mask.astype(np.float64), y - y.mean(), codes
+
+
+def _weighted_correlations(weights, x, mask, y):
+    """Correlação de cada coluna com y para cada vetor de pesos (linhas)."""
+    count = weights @ mask
+    sum_x = weights @ x
+    sum_y = weights @ (mask * y[:, None])
+    sum_xx = weights @ (x * x)
+    sum_yy = weights @ (mask * (y * y)[:, None])
+    sum_xy = weights @ (x * y[:, None])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sum_xy - sum_x * sum_y / count
+        var_x = sum_xx - sum_x * sum_x / count
+        var_y = sum_yy - sum_y * sum_y / count
+        return cov / np.sqrt(var_x * var_y)
+
+
+def _bootstrap_correlation_chunk(job):
+    (x, mask, y, codes), seed, size = job
+    rng = np.random.default_rng(seed)
+    return _weighted_correlations(_bootstrap_weights(rng, codes, size), x, mask, y)
+
+
+def _permutation_correlation_chunk(job):
+    (x, mask, y, codes), seed, size = job
+    rng = np.random.default_rng(seed)
+    result = np.empty((size, x.shape[1]))
+    for j in range(x.shape[1]):
+        valid = mask[:, j] > 0
+        xs = x[valid, j] - x[valid, j].mean()
+        ys = y[valid] - y[valid].mean()
+        xs /= np.linalg.norm(xs)
+        ys /= np.linalg.norm(ys)
+        # Cada linha de `permutations` é uma permutação das posições válidas
+        permutations = _block_permutations(rng, codes[valid], size)
+        result[:, j] = ys[permutations] @ xs
+    return result
+
+
+def _solve_batched(gram, moment):
+    try:
+        return np.linalg.solve(gram, moment[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return (np.linalg.pinv(gram) @ moment[..., None])[..., 0]
+
+
+def _bootstrap_coefficient_chunk(job):
+    (X, y, codes), seed, size = job
+    rng = np.random.default_rng(seed)
+    n, k = X.shape
+    weights = _bootstrap_weights(rng, codes, size)
+    # X'WX e X'Wy de todas as reamostragens em dois produtos matriciais
+    gram = (weights @ (X[:, :, None] * X[:, None, :]).reshape(n, k * k)).reshape(size, k, k)
+    moment = weights @ (X * y[:, None])
+    return _solve_batched(gram, moment)
+
+
+def _t_statistics(responses, X, pseudo_inverse, inverse_diagonal):
+    """Estatística t de cada coeficiente para cada resposta (linhas)."""
+    coefficients = responses @ pseudo_inverse.T
+    residuals = responses - coefficients @ X.T
+    sigma2 = (residuals ** 2).sum(axis=1, keepdims=True) / (X.shape[0] - X.shape[1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return coefficients / np.sqrt(sigma2 * inverse_diagonal)
+
+
+def _reduced_fits(X, y):
+    """Valores ajustados e resíduos do modelo sem cada feature (colunas)."""
+    n, k = X.shape
+    fitted = np.full((n, k), np.nan)
+    residuals = np.full((n, k), np.nan)
+    for j in range(1, k):
+        reduced = np.delete(X, j, axis=1)
+        fitted[:, j] = reduced @ (np.linalg.pinv(reduced) @ y)
+        residuals[:, j] = y - fitted[:, j]
+    return fitted, residuals
+
+
+def _permutation_coefficient_chunk(job):
+    (X, pseudo_inverse, inverse_diagonal, codes, fitted, residuals), seed, size = job
+    rng = np.random.default_rng(seed)
+    n, k = X.shape
+    result = np.full((size, k), np.nan)
+    for j in range(1, k):
+        # Freedman–Lane: resposta sob H0 (coeficiente j nulo) com resíduos permutados
+        permutations = _block_permutations(rng, codes, size)
+        responses = fitted[:, j] + residuals[permutations, j]
+        result[:, j] = _t_statistics(responses, X, pseudo_inverse, inverse_diagonal)[:, j]
+    return result
+
+
+def _percentile_interval(samples, confidence):
+    alpha = (1 - confidence) / 2
+    return np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+
+
+def _permutation_pvalue(samples, observed):
+    extreme = (np.abs(samples) >= np.abs(observed) - 1e-12).sum(axis=0)
+    return (extreme + 1) / (len(samples) + 1)
+
+
+def correlation_inference(data, columns, target='rating', groups=None, n_resamples=10000,
+                          confidence=0.95, seed=42, processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Correlação de cada coluna com `target` (linhas completas por par), com
+    intervalo de confiança bootstrap (percentil) e p-valor de permutação.
+    `groups` (um rótulo por linha de `data`) faz a reamostragem por grupos.
+    """
+    codes = _group_codes(groups, len(data))
+    keep = data[target].notna().to_numpy()
+    data = data[keep]
+    x = data[columns].to_numpy(dtype=np.float64)
+    y = data[target].to_numpy(dtype=np.float64)
+    arrays = _correlation_arrays(x, y, codes[keep])
+    observed = _weighted_correlations(np.ones((1, len(y))), *arrays[:3])[0]
+
+    bootstrap_seed, permutation_seed = np.random.SeedSequence(seed).spawn(2)
+    bootstrap = _map_chunks(_bootstrap_correlation_chunk, arrays, n_resamples,
+                            bootstrap_seed, processes, chunk_size)
+    permutation = _map_chunks(_permutation_correlation_chunk, arrays, n_resamples,
+                              permutation_seed, processes, chunk_size)
+    lower, upper = _percentile_interval(bootstrap, confidence)
+    return pd.DataFrame({
+        'correlacao': observed,
+        'ic_inferior': lower,
+        'ic_superior': upper,
+        'erro_padrao': np.nanstd(bootstrap, axis=0, ddof=1),
+        'p_valor_permutacao': _permutation_pvalue(permutation, observed),
+    }, index=pd.Index(columns, name='variavel'))
+
+
+def coefficient_inference(X, y, features, groups=None, n_resamples=10000, confidence=0.95,
+                          seed=42, processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Coeficientes de mínimos quadrados (com intercepto) em todas as linhas, com
+    intervalo bootstrap por pares (linhas, ou grupos com `groups`,
+    reamostrados) e p-valor de permutação de Freedman–Lane de cada
+    coeficiente (H0: coeficiente nulo, demais features no modelo).
+    """
+    X = np.column_stack([np.ones(len(X)), np.asarray(X, dtype=np.float64)])
+    y = np.asarray(y, dtype=np.float64)
+    codes = _group_codes(groups, len(y))
+    pseudo_inverse = np.linalg.pinv(X)
+    observed = pseudo_inverse @ y
+    inverse_diagonal = np.diag(np.linalg.pinv(X.T @ X))
+    observed_t = _t_statistics(y[None, :], X, pseudo_inverse, inverse_diagonal)[0]
+
+    bootstrap_seed, permutation_seed = np.random.SeedSequence(seed).spawn(2)
+    bootstrap = _map_chunks(_bootstrap_coefficient_chunk, (X, y, codes), n_resamples,
+                            bootstrap_seed, processes, chunk_size)
+    permutation = _map_chunks(_permutation_coefficient_chunk,
+                              (X, pseudo_inverse, inverse_diagonal, codes) + _reduced_fits(X, y),
+                              n_resamples, permutation_seed, processes, chunk_size)
+    lower, upper = _percentile_interval(bootstrap, confidence)
+    p_values = _permutation_pvalue(permutation, observed_t)
+    # O intercepto não é testado
+    p_values[0] = np.nan
+    return pd.DataFrame({
+        'coeficiente': observed,
+        'ic_inferior': lower,
+        'ic_superior': upper,
+        'erro_padrao': np.std(bootstrap, axis=0, ddof=1),
+        'p_valor_permutacao': p_values,
+    }, index=pd.Index(['intercept'] + list(features), name='variavel'))
@@ -1,8 +1,11 @@
 from analysis_utils import PISAAnalysis
+from pisa_analysis import parse_args
 import json
 import os
 
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+    
     # Inicializa análise
     data_path = '../data/economics_and_education_dataset_CSV.csv'
     analysis = PISAAnalysis(data_path)
@@ -11,12 +14,20 @@ def main():
     os.makedirs('../reports', exist_ok=True)
     
     # Gera relatório
-    report = analysis.generate_summary_report()
+    report = analysis.generate_summary_report(resampling=args.resampling,
+                                              model_comparison=args.compare_models)
     
     # Salva relatório em JSON
     with open('../reports/analysis_report.json', 'w') as f:
         json.dump(report, f, indent=4)
     
+    # Parâmetros ajustados do pipeline (para transformar novos arquivos)
+    analysis.pipeline.save('../reports/feature_pipeline.json')
+    
+    # Modelos por país, ano e sexo
+    for by in ['country', 'time', 'sex']:
+        analysis.grouped_regression(by).to_csv(f'../reports/grouped_regression_{by}.csv')
+    
     # Gera gráfico de tendências
     analysis.plot_performance_trends('../reports/performance_trends.png')
     
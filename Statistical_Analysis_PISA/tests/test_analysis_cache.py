@@ -0,0 +1,51 @@
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import analysis_utils
+from analysis_utils import PISAAnalysis
+
+DATA_PATH = Path(__file__).resolve().parent.parent / 'data' / 'economics_and_education_dataset_CSV.csv'
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    return Path(shutil.copy(DATA_PATH, tmp_path / 'pisa.csv'))
+
+
+def _no_read_csv(*args, **kwargs):
+    raise AssertionError("CSV relido apesar do cache")
+
+
+def test_disk_cache_round_trip(data_path, tmp_path, monkeypatch):
+    first = PISAAnalysis(data_path, cache_dir=tmp_path / 'cache')
+    expected = (first.data, first.spending_groups, first.rating_correlations, first.model_matrix)
+    assert len(list((tmp_path / 'cache').glob('pisa_*.pkl'))) == 4
+
+    # Nova instância: tudo sai do disco, sem reler o CSV
+    monkeypatch.setattr(analysis_utils.pd, 'read_csv', _no_read_csv)
+    second = PISAAnalysis(data_path, cache_dir=tmp_path / 'cache')
+    pd.testing.assert_frame_equal(second.data, expected[0])
+    pd.testing.assert_series_equal(second.spending_groups, expected[1])
+    pd.testing.assert_series_equal(second.rating_correlations, expected[2])
+    pd.testing.assert_frame_equal(pd.DataFrame(second.model_matrix[0]), pd.DataFrame(expected[3][0]))
+    assert second.pipeline.to_dict() == first.pipeline.to_dict()
+
+
+def test_cache_keyed_by_content(data_path, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    before = PISAAnalysis(data_path, cache_dir=cache_dir).data
+
+    lines = data_path.read_text().splitlines(keepends=True)
+    data_path.write_text(''.join(lines[:-100]))
+    after = PISAAnalysis(data_path, cache_dir=cache_dir)
+    assert len(after.data) == len(before) - 100
+    assert after.data.equals(PISAAnalysis(data_path, use_cache=False).data)
+
+
+def test_use_cache_false_writes_nothing(data_path, tmp_path):
+    analysis = PISAAnalysis(data_path, cache_dir=tmp_path / 'cache', use_cache=False)
+    analysis.rating_correlations
+    assert not (tmp_path / 'cache').exists()
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+from analysis_utils import PISAAnalysis
+from grouped_regression import grouped_ols
+
+DATA_PATH = Path(__file__).resolve().parent.parent / 'data' / 'economics_and_education_dataset_CSV.csv'
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    groups = np.repeat(['a', 'b', 'c', 'd'], [40, 25, 3, 10])
+    df = pd.DataFrame({'grupo': groups, 'x1': rng.normal(size=len(groups)),
+                       'x2': rng.normal(size=len(groups)) * 100})
+    df['y'] = 2 * df['x1'] - 0.03 * df['x2'] + rng.normal(size=len(df))
+    df.loc[df['grupo'] == 'd', 'x2'] = 5.0
+    return df
+
+
+def test_matches_statsmodels_per_group():
+    df = _data()
+    table = grouped_ols(df, ['x1', 'x2'], 'y', 'grupo', standard_errors=True)
+    for group in ['a', 'b']:
+        rows = df[df['grupo'] == group]
+        fit = sm.OLS(rows['y'], sm.add_constant(rows[['x1', 'x2']])).fit()
+        np.testing.assert_allclose(table.loc[group, ['intercept', 'x1', 'x2']], fit.params,
+                                   rtol=1e-10)
+        np.testing.assert_allclose(table.loc[group, ['se_intercept', 'se_x1', 'se_x2']], fit.bse,
+                                   rtol=1e-8)
+        assert np.isclose(table.loc[group, 'r2'], fit.rsquared)
+
+
+def test_underdetermined_and_singular_groups_are_nan():
+    table = grouped_ols(_data(), ['x1', 'x2'], 'y', 'grupo')
+    # 'c': 3 linhas para 3 parâmetros (ajuste exato); 'd': x2 constante
+    assert table.loc[['c', 'd'], ['intercept', 'x1', 'x2', 'r2']].isna().all().all()
+    assert table.loc[['a', 'b'], 'r2'].notna().all()
+
+
+def test_country_and_year_models_use_one_row_per_country_and_year():
+    analysis = PISAAnalysis(DATA_PATH, use_cache=False)
+    tot = analysis.data[analysis.data['sex'] == 'TOT']
+    by_country = analysis.grouped_regression('country')
+    assert (by_country['n'] <= tot.groupby('country', observed=True).size()).all()
+    assert by_country['r2'].notna().sum() > len(by_country) / 2
+    by_year = analysis.grouped_regression('time')
+    assert by_year['n'].sum() <= len(tot)
+    assert by_year['r2'].notna().all()
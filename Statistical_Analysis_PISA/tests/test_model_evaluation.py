@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from model_evaluation import comparison_report, evaluate_models
+
+
+def _data(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 3)) * [1.0, 50.0, 0.01]
+    y = X @ [2.0, 0.05, 300.0] + rng.normal(size=n)
+    groups = np.repeat(np.arange(12), n // 12)
+    return X, y, groups
+
+
+def test_scaling_is_fitted_inside_each_fold():
+    X, y, groups = _data()
+    table = evaluate_models(X, y, groups=groups, n_jobs=1)
+    # Escala das features não muda nada: o StandardScaler faz parte do modelo
+    rescaled = evaluate_models(X * 1000 + 7, y, groups=groups, n_jobs=1)
+    linear = ~table['modelo'].eq('gradient_boosting')
+    pd.testing.assert_frame_equal(table[linear].reset_index(drop=True),
+                                  rescaled[linear].reset_index(drop=True),
+                                  check_exact=False, rtol=1e-6)
+
+
+def test_parallel_matches_serial_and_ranks_by_rmse():
+    X, y, groups = _data()
+    serial = evaluate_models(X, y, groups=groups, n_jobs=1)
+    parallel = evaluate_models(X, y, groups=groups, n_jobs=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    for _, rows in serial.groupby('esquema'):
+        assert rows['rmse_mean'].is_monotonic_increasing
+        assert rows['posicao'].iloc[0] == 1
+    assert set(comparison_report(serial)) == {'kfold', 'group_kfold'}
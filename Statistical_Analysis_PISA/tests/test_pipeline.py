@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from pipeline import MODEL_FEATURES, PISAFeaturePipeline, normalize_column
+
+DATA_PATH = Path(__file__).resolve().parent.parent / 'data' / 'economics_and_education_dataset_CSV.csv'
+
+
+@pytest.fixture
+def raw():
+    return pd.read_csv(DATA_PATH)
+
+
+def test_normalize_column():
+    assert normalize_column(' expenditure_on _education_pct_gdp') == 'expenditure_on_education_pct_gdp'
+    assert normalize_column('urban  population') == 'urban_population'
+
+
+def test_model_matrix_matches_standard_scaler(raw):
+    pipeline = PISAFeaturePipeline()
+    prepared = pipeline.fit_transform(raw)
+    X, y = pipeline.model_matrix(prepared)
+
+    rows = prepared.dropna(subset=MODEL_FEATURES + ['rating'])
+    np.testing.assert_allclose(X, StandardScaler().fit_transform(rows[MODEL_FEATURES]))
+    pd.testing.assert_series_equal(y, rows['rating'])
+    assert set(prepared['development_level']) == {'High_Income', 'Low_Income'}
+    np.testing.assert_allclose(
+        prepared['education_gdp_ratio'],
+        prepared['expenditure_on_education_pct_gdp'] / prepared['gdp_per_capita_ppp'])
+
+
+def test_save_load_round_trip(raw, tmp_path):
+    pipeline = PISAFeaturePipeline().fit(raw.iloc[:400])
+    pipeline.save(tmp_path / 'pipeline.json')
+    loaded = PISAFeaturePipeline.load(tmp_path / 'pipeline.json')
+    assert loaded.to_dict() == pipeline.to_dict()
+
+    # Batch scoring: linhas novas transformadas com os parâmetros do fit
+    new_rows = raw.iloc[400:]
+    expected = pipeline.transform(new_rows)
+    pd.testing.assert_frame_equal(loaded.transform(new_rows), expected)
+    X_new, _ = loaded.model_matrix(expected, require_target=False)
+    np.testing.assert_allclose(X_new, pipeline.model_matrix(expected, require_target=False)[0])
+
+
+def test_unfitted_and_unknown_version(raw):
+    with pytest.raises(ValueError):
+        PISAFeaturePipeline().transform(raw)
+    state = PISAFeaturePipeline().fit(raw).to_dict()
+    state['version'] = 0
+    with pytest.raises(ValueError):
+        PISAFeaturePipeline.from_dict(state)
@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis_utils import PISAAnalysis
+from resampling import (_block_permutations, _bootstrap_weights, coefficient_inference,
+                        correlation_inference)
+
+DATA_PATH = Path(__file__).resolve().parent.parent / 'data' / 'economics_and_education_dataset_CSV.csv'
+
+
+def _data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 2))
+    y = 5 * X[:, 0] + rng.normal(size=n)
+    return X, y
+
+
+def test_coefficients_match_least_squares():
+    X, y = _data()
+    table = coefficient_inference(X, y, ['forte', 'nulo'], n_resamples=200)
+    expected = np.linalg.lstsq(np.column_stack([np.ones(len(X)), X]), y, rcond=None)[0]
+    np.testing.assert_allclose(table['coeficiente'], expected)
+    assert (table['ic_inferior'] <= table['coeficiente']).all()
+    assert (table['coeficiente'] <= table['ic_superior']).all()
+
+
+def test_permutation_tests_each_coefficient():
+    # Uma feature forte não torna significativa a feature sem efeito
+    p_values = []
+    for seed in range(20):
+        X, y = _data(seed=seed)
+        table = coefficient_inference(X, y, ['forte', 'nulo'], n_resamples=200, seed=seed)
+        assert np.isnan(table.loc['intercept', 'p_valor_permutacao'])
+        assert table.loc['forte', 'p_valor_permutacao'] < 0.01
+        p_values.append(table.loc['nulo', 'p_valor_permutacao'])
+    assert np.mean(p_values) > 0.25
+    assert np.mean(np.array(p_values) < 0.05) <= 0.2
+
+
+def test_small_effect_is_detected_next_to_a_strong_one():
+    # Sob a hipótese nula global (nota permutada) o efeito pequeno se perde
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(200, 2))
+    y = 5 * X[:, 0] + 0.3 * X[:, 1] + rng.normal(size=200)
+    table = coefficient_inference(X, y, ['forte', 'pequeno'], n_resamples=500)
+    assert table.loc['pequeno', 'p_valor_permutacao'] < 0.01
+
+
+def test_results_do_not_depend_on_processes():
+    X, y = _data()
+    options = {'n_resamples': 600, 'seed': 7, 'chunk_size': 200}
+    serial = coefficient_inference(X, y, ['a', 'b'], processes=1, **options)
+    parallel = coefficient_inference(X, y, ['a', 'b'], processes=2, **options)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+    data = pd.DataFrame({'a': X[:, 0], 'b': X[:, 1], 'rating': y})
+    data.loc[::7, 'b'] = np.nan
+    serial = correlation_inference(data, ['a', 'b'], processes=1, **options)
+    parallel = correlation_inference(data, ['a', 'b'], processes=2, **options)
+    pd.testing.assert_frame_equal(serial, parallel)
+    np.testing.assert_allclose(serial['correlacao'],
+                               [data['a'].corr(data['rating']), data['b'].corr(data['rating'])])
+
+
+def test_grouped_resampling_keeps_clusters_together():
+    rng = np.random.default_rng(1)
+    codes = np.repeat([0, 1, 2, 3, 4, 5], [3, 3, 3, 2, 2, 1])
+    rng.shuffle(codes)
+    permutations = _block_permutations(rng, codes, 50)
+    for permutation in permutations:
+        assert sorted(permutation) == list(range(len(codes)))
+        for group in range(6):
+            rows = np.flatnonzero(codes == group)
+            moved = permutation[rows]
+            # Um grupo inteiro vai para um único grupo de mesmo tamanho, na mesma ordem
+            assert len(set(codes[moved])) == 1
+            assert (codes == codes[moved[0]]).sum() == len(rows)
+            assert (np.diff(moved) > 0).all()
+
+    weights = _bootstrap_weights(rng, codes, 50)
+    first_rows = [np.argmax(codes == group) for group in range(6)]
+    for group, first in enumerate(first_rows):
+        assert (weights[:, codes == group] == weights[:, [first]]).all()
+    # Seis grupos sorteados por reamostragem
+    assert (weights[:, first_rows].sum(axis=1) == 6).all()
+
+
+def test_duplicated_rows_widen_grouped_intervals():
+    # Cada observação repetida três vezes (como TOT/BOY/GIRL): reamostrar
+    # linhas subestima o erro padrão; reamostrar grupos não
+    X, y = _data(n=60, seed=4)
+    X, y = np.repeat(X, 3, axis=0), np.repeat(y, 3)
+    groups = np.repeat(np.arange(60), 3)
+    options = {'n_resamples': 2000, 'seed': 1}
+    rows = coefficient_inference(X, y, ['forte', 'nulo'], **options)
+    grouped = coefficient_inference(X, y, ['forte', 'nulo'], groups=groups, **options)
+    single = coefficient_inference(X[::3], y[::3], ['forte', 'nulo'], **options)
+
+    ratio = grouped['erro_padrao'] / rows['erro_padrao']
+    assert (ratio > 1.5).all()
+    np.testing.assert_allclose(grouped['erro_padrao'], single['erro_padrao'], rtol=0.15)
+
+    data = pd.DataFrame({'a': X[:, 0], 'b': X[:, 1], 'rating': y})
+    grouped = correlation_inference(data, ['a', 'b'], groups=groups, **options)
+    single = correlation_inference(data.iloc[::3], ['a', 'b'], **options)
+    np.testing.assert_allclose(grouped['erro_padrao'], single['erro_padrao'], rtol=0.15)
+    # Permutando grupos, a feature sem efeito não vira significativa
+    assert grouped.loc['b', 'p_valor_permutacao'] > 0.05
+
+
+def test_report_is_strict_json():
+    analysis = PISAAnalysis(DATA_PATH, use_cache=False)
+    report = analysis.resampling_analysis(n_resamples=200, processes=1)
+    assert report['cluster'] == 'country'
+    assert report['coefficients']['intercept']['p_valor_permutacao'] is None
+    json.loads(json.dumps(report, allow_nan=False))
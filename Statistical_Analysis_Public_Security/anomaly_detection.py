@@ -0,0 +1,86 @@
+"""
+Varredura de anomalias nas séries mensais por UF x tipo de crime
+
+Todas as séries ficam na matriz do SeriesMatrix e são avaliadas de uma vez:
+
+- z robusto móvel: distância de cada mês à mediana dos `window` meses
+  anteriores, em unidades de MAD (desvio absoluto mediano);
+- z robusto sazonal: o mesmo cálculo sobre a série sem o componente sazonal.
+
+Os meses com |z| acima do limiar em qualquer dos dois critérios formam a
+tabela de anomalias, ordenada pela pontuação (maior |z|). Picos recorrentes
+(ex.: todo dezembro) aparecem só pelo z móvel, com z sazonal baixo; picos
+fora do padrão sazonal têm os dois altos.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from time_series import SeriesMatrix
+
+# Limiar usual para o z robusto (Iglewicz e Hoaglin)
+THRESHOLD = 3.5
+
+# Constantes de consistência com o desvio padrão na distribuição normal
+MAD_SCALE = 1.4826
+MEAN_AD_SCALE = 1.2533
+
+
+def rolling_robust_z(values, window=12, min_periods=None, count_floor=True):
+    """
+    z robusto de cada coluna em relação aos `window` meses anteriores.
+    Quando o MAD é zero usa o desvio absoluto médio. Com `count_floor`, a
+    escala nunca fica abaixo do desvio de uma contagem de Poisson com a
+    mesma mediana (evita pontuações enormes em séries quase sempre zero).
+    """
+    min_periods = window // 2 if min_periods is None else min_periods
+    padded = np.pad(values, ((0, 0), (window, 0)), constant_values=np.nan)
+    # history[:, t] = os `window` meses anteriores a t
+    history = sliding_window_view(padded, window, axis=1)[:, :values.shape[1]]
+
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median = np.nanmedian(history, axis=2)
+        deviation = np.abs(history - median[..., None])
+        scale = MAD_SCALE * np.nanmedian(deviation, axis=2)
+        scale = np.where(scale > 0, scale, MEAN_AD_SCALE * np.nanmean(deviation, axis=2))
+        if count_floor:
+            scale = np.fmax(scale, np.sqrt(np.fmax(np.abs(median), 1)))
+        z = (values - median) / np.where(scale > 0, scale, np.nan)
+
+    enough = (~np.isnan(history)).sum(axis=2) >= min_periods
+    return np.where(enough, z, np.nan), np.where(enough, median, np.nan)
+
+
+def scan_anomalies(series, window=12, threshold=THRESHOLD):
+    """
+    Tabela de anomalias de um SeriesMatrix: uma linha por (série, mês) com
+    |z| acima de `threshold`, ordenada pela pontuação.
+    """
+    _, seasonal, _ = series.seasonal_decomposition()
+    z_movel, esperado = rolling_robust_z(series.values, window)
+    z_sazonal, _ = rolling_robust_z(series.values - np.nan_to_num(seasonal), window)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        score = np.fmax(np.abs(z_movel), np.abs(z_sazonal))
+    rows, cols = np.nonzero(score > threshold)
+
+    labels = series.labels[rows].to_frame(index=False)
+    table = pd.concat([labels, pd.DataFrame({
+        'Data': series.periods[cols],
+        'valor': series.values[rows, cols],
+        'esperado': esperado[rows, cols],
+        'z_movel': z_movel[rows, cols],
+        'z_sazonal': z_sazonal[rows, cols],
+        'pontuacao': score[rows, cols],
+    })], axis=1)
+    table['direcao'] = np.where(table['valor'] >= table['esperado'], 'alta', 'baixa')
+    return table.sort_values('pontuacao', ascending=False, ignore_index=True)
+
+
+def scan_cube(cube, by_uf=True, window=12, threshold=THRESHOLD):
+    """Varredura direta do CrimeCube (por padrão, UF x tipo de crime)."""
+    return scan_anomalies(SeriesMatrix.from_cube(cube, by_uf=by_uf), window, threshold)
@@ -0,0 +1,214 @@
+"""
+Benchmark do pipeline de segurança pública com dados sintéticos ampliados
+
+Gera versões dos dois CSVs em escala 10x a 1000x com o mesmo esquema e
+formato (latin1, ';'): cada UF é replicada em `escala` "municípios" e os
+valores são sorteados com distribuição de Poisson em torno do valor original.
+Em seguida mede tempo e pico de memória (tracemalloc) de cada etapa do
+SecurityDataAnalyzer e grava o resultado em JSON, com o commit do git, para
+comparação entre versões. Tempo e memória saem de passadas separadas (a
+memória com tudo serial), e os caches de correlação ficam desativados.
+
+Uso:
+    python benchmark.py --scales 10 100
+    python benchmark.py --scales 1000 --compare benchmarks/benchmark_<commit>.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from detailed_analysis import OCORRENCIAS_FILE, VITIMAS_FILE, SecurityDataAnalyzer
+from common.correlation import clear_cache
+
+SYNTHETIC_DIR = Path('data/.cache/benchmark')
+RESULTS_DIR = Path('benchmarks')
+
+# Etapas medidas, na ordem de execução (método do SecurityDataAnalyzer)
+STAGES = [
+    'load_data',
+    'analyze_crime_trends',
+    'analyze_regional_distribution',
+    'analyze_crime_correlation',
+    'analyze_temporal_patterns',
+    'generate_summary_statistics',
+    'analyze_uf_trends',
+    'detect_anomalies',
+    'analyze_lethality',
+    'test_hypotheses',
+]
+
+
+def synthesize(source_path, target_path, value_column, scale, seed=0):
+    """Grava uma versão do CSV com cada UF replicada `scale` vezes."""
+    source = pd.read_csv(source_path, encoding='latin1', sep=';', dtype=str)
+    n_rows = len(source)
+    copy = np.repeat(np.arange(scale), n_rows)
+    row = np.tile(np.arange(n_rows), scale)
+
+    uf = source['UF'].astype('category')
+    if scale > 1:
+        names = [f"{name} {i:04d}" for name in uf.cat.categories for i in range(scale)]
+        codes = uf.cat.codes.to_numpy().astype(np.int64)[row] * scale + copy
+        uf_column = pd.Categorical.from_codes(codes, categories=names)
+    else:
+        uf_column = uf
+
+    values = pd.to_numeric(source[value_column], errors='coerce')
+    rng = np.random.default_rng(seed)
+    sampled = rng.poisson(values.fillna(0).to_numpy()[row]).astype(object)
+    # Mantém os "-" do arquivo original
+    sampled[values.isna().to_numpy()[row]] = '-'
+
+    synthetic = pd.DataFrame({
+        'UF': uf_column,
+        'Tipo Crime': source['Tipo Crime'].to_numpy()[row],
+        'Ano': source['Ano'].to_numpy()[row],
+        'Mês': source['Mês'].to_numpy()[row],
+        value_column: sampled,
+    })
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    synthetic.to_csv(target_path, sep=';', encoding='latin1', index=False)
+    return len(synthetic)
+
+
+def prepare_data(scale, data_dir='data', synthetic_dir=SYNTHETIC_DIR):
+    """Diretório com os CSVs na escala pedida (gerados uma única vez)."""
+    if scale == 1:
+        return Path(data_dir)
+    target_dir = Path(synthetic_dir) / f"escala_{scale}"
+    for filename, value_column in ((OCORRENCIAS_FILE, 'Ocorrências'), (VITIMAS_FILE, 'Vítimas')):
+        if not (target_dir / filename).exists():
+            print(f"Gerando {filename} em escala {scale}x...")
+            synthesize(Path(data_dir) / filename, target_dir / filename, value_column, scale)
+    return target_dir
+
+
+def _run_pass(data_dir, stages, processes, measure_memory):
+    """
+    Executa as etapas uma vez e retorna {etapa: segundos} ou, com
+    `measure_memory`, {etapa: pico de memória em MB}.
+    """
+    # Sem caches de correlação: cada execução mede o cálculo, não a leitura do cache
+    clear_cache()
+    results = {}
+    with tempfile.TemporaryDirectory() as reports_dir:
+        # Figuras adiadas: só são desenhadas na etapa render_reports
+        analyzer = SecurityDataAnalyzer(reports_dir=reports_dir, plot_processes=processes,
+                                        test_processes=processes, cache_dir=None)
+        if measure_memory:
+            tracemalloc.start()
+        try:
+            for stage in stages:
+                method = getattr(analyzer, stage)
+                args = (data_dir,) if stage == 'load_data' else ()
+                if measure_memory:
+                    tracemalloc.reset_peak()
+                start = time.perf_counter()
+                with redirect_stdout(StringIO()):
+                    method(*args)
+                elapsed = time.perf_counter() - start
+                if measure_memory:
+                    results[stage] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+                else:
+                    results[stage] = round(elapsed, 4)
+        finally:
+            if measure_memory:
+                tracemalloc.stop()
+        rows = len(analyzer.df_ocorrencias)
+    clear_cache()
+    return rows, results
+
+
+def run_stages(data_dir, render=False, processes=2):
+    """
+    Tempo (s) e pico de memória (MB) de cada etapa, em duas passadas: o tempo
+    sem tracemalloc (que deixa o código mais lento), com `processes`
+    processos, e a memória com tudo serial (tracemalloc não enxerga a
+    memória dos processos do pool).
+    """
+    stages = STAGES + (['render_reports'] if render else [])
+    rows, seconds = _run_pass(data_dir, stages, processes, measure_memory=False)
+    _, memory = _run_pass(data_dir, stages, 1, measure_memory=True)
+    return rows, {
+        stage: {'segundos': seconds[stage], 'pico_memoria_mb': memory[stage]}
+        for stage in stages
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous):
+    """Razão de tempo (atual / anterior) por escala e etapa."""
+    ratios = {}
+    for scale, run in current['escalas'].items():
+        old = previous.get('escalas', {}).get(scale)
+        if old is None:
+            continue
+        ratios[scale] = {
+            stage: round(stats['segundos'] / old['etapas'][stage]['segundos'], 2)
+            for stage, stats in run['etapas'].items()
+            if old['etapas'].get(stage, {}).get('segundos')
+        }
+    return pd.DataFrame(ratios)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do SecurityDataAnalyzer")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help="fatores de escala dos dados sintéticos")
+    parser.add_argument('--render', action='store_true', help="mede também a geração das figuras")
+    parser.add_argument('--processes', type=int, default=2,
+                        help="processos das figuras e dos testes na medição de tempo")
+    parser.add_argument('--output', type=Path, default=RESULTS_DIR, help="diretório dos JSON")
+    parser.add_argument('--compare', type=Path, help="JSON de uma execução anterior")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'data_execucao': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'escalas': {},
+    }
+    for scale in args.scales:
+        data_dir = prepare_data(scale)
+        rows, stages = run_stages(data_dir, render=args.render, processes=args.processes)
+        report['escalas'][str(scale)] = {'linhas': rows, 'etapas': stages}
+        total = sum(stage['segundos'] for stage in stages.values())
+        print(f"Escala {scale}x ({rows} linhas): {total:.2f}s")
+        print(pd.DataFrame(stages).T.to_string())
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    output_path = args.output / f"benchmark_{commit or 'sem_commit'}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"\nResultados salvos em {output_path}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"\nTempo relativo a {previous.get('commit')} (atual / anterior):")
+        print(compare(report, previous).to_string())
+
+
+if __name__ == "__main__":
+    main()
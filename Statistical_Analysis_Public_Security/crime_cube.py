@@ -0,0 +1,273 @@
+"""
+Cubo denso UF x Tipo Crime x mês com os indicadores de segurança pública
+
+O cubo é montado uma única vez a partir do DataFrame carregado: cada célula
+guarda quantidade de linhas, soma, soma dos quadrados, mínimo e máximo dos
+valores. As análises do SecurityDataAnalyzer viram reduções sobre os eixos,
+com o mesmo resultado dos groupby/pivot_table (observed=True) sobre as linhas.
+
+Linhas sem UF, Tipo Crime ou Data não entram no cubo. Como cada célula guarda
+somas, cubos de períodos diferentes podem ser unidos (merge) sem reler as
+linhas, e o cubo pode ser salvo em disco (.npz).
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+AXES = ('UF', 'Tipo Crime', 'Data')
+
+STATS = ('count', 'mean', 'std', 'min', 'max')
+
+
+class CrimeCube:
+    """Agregados por célula (UF, Tipo Crime, mês) em arrays NumPy."""
+
+    def __init__(self, ufs, crimes, periods, count, total, total_sq, minimum, maximum,
+                 value_column='Ocorrências', value_dtype=np.int64, meses=None):
+        self.ufs = ufs
+        self.crimes = crimes
+        self.periods = periods
+        self.count = count
+        self.total = total
+        self.total_sq = total_sq
+        self.minimum = minimum
+        self.maximum = maximum
+        self.value_column = value_column
+        self.value_dtype = np.dtype(value_dtype)
+        # Categorias da coluna Mês (define a ordem de monthly_mean)
+        self.meses = meses
+
+    @classmethod
+    def from_frame(cls, df, value_column='Ocorrências'):
+        """Monta o cubo a partir de um DataFrame com UF e Tipo Crime categóricos."""
+        uf = df['UF'].astype('category')
+        crime = df['Tipo Crime'].astype('category')
+        months = df['Data'].to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+        valid = (uf.cat.codes.to_numpy() >= 0) & (crime.cat.codes.to_numpy() >= 0) & ~np.isnat(months)
+
+        periods, period_codes = np.unique(months[valid], return_inverse=True)
+        shape = (len(uf.cat.categories), len(crime.cat.categories), len(periods))
+        cell = np.ravel_multi_index(
+            (uf.cat.codes.to_numpy()[valid], crime.cat.codes.to_numpy()[valid], period_codes.ravel()),
+            shape
+        )
+        values = df[value_column].to_numpy()[valid].astype(np.float64)
+        size = int(np.prod(shape))
+
+        count = np.bincount(cell, minlength=size)
+        total = np.bincount(cell, weights=values, minlength=size)
+        total_sq = np.bincount(cell, weights=values * values, minlength=size)
+        minimum = np.full(size, np.inf)
+        maximum = np.full(size, -np.inf)
+        np.minimum.at(minimum, cell, values)
+        np.maximum.at(maximum, cell, values)
+
+        meses = df['Mês'].astype('category').cat.categories if 'Mês' in df.columns else None
+        return cls(
+            uf.cat.categories, crime.cat.categories, periods.astype('datetime64[ns]'),
+            count.reshape(shape), total.reshape(shape), total_sq.reshape(shape),
+            minimum.reshape(shape), maximum.reshape(shape),
+            value_column=value_column, value_dtype=df[value_column].dtype, meses=meses
+        )
+
+    def merge(self, other):
+        """
+        Novo cubo com as células dos dois cubos somadas. UFs, tipos de crime e
+        meses são unidos (em ordem), de modo que o resultado é o mesmo de
+        from_frame sobre as linhas dos dois cubos juntas.
+        """
+        ufs = self.ufs.union(other.ufs)
+        crimes = self.crimes.union(other.crimes)
+        periods = np.union1d(self.periods, other.periods)
+        shape = (len(ufs), len(crimes), len(periods))
+
+        count = np.zeros(shape, dtype=np.int64)
+        total = np.zeros(shape)
+        total_sq = np.zeros(shape)
+        minimum = np.full(shape, np.inf)
+        maximum = np.full(shape, -np.inf)
+        for cube in (self, other):
+            cells = np.ix_(ufs.get_indexer(cube.ufs), crimes.get_indexer(cube.crimes),
+                           np.searchsorted(periods, cube.periods))
+            count[cells] += cube.count
+            total[cells] += cube.total
+            total_sq[cells] += cube.total_sq
+            minimum[cells] = np.minimum(minimum[cells], cube.minimum)
+            maximum[cells] = np.maximum(maximum[cells], cube.maximum)
+
+        meses = self.meses if other.meses is None else other.meses
+        if self.meses is not None and other.meses is not None:
+            meses = self.meses.union(other.meses)
+        return CrimeCube(
+            ufs, crimes, periods, count, total, total_sq, minimum, maximum,
+            value_column=self.value_column,
+            value_dtype=np.promote_types(self.value_dtype, other.value_dtype), meses=meses
+        )
+
+    def cell_lookup(self, df):
+        """
+        Índices (UF, Tipo Crime, mês) no cubo de cada linha de df; -1 onde a
+        UF, o tipo de crime ou o mês não existe no cubo.
+        """
+        months = df['Data'].to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+        months = months.astype('datetime64[ns]')
+        period = np.searchsorted(self.periods, months)
+        found = period < len(self.periods)
+        found[found] = self.periods[period[found]] == months[found]
+        return (self.ufs.get_indexer(df['UF']), self.crimes.get_indexer(df['Tipo Crime']),
+                np.where(found, period, -1))
+
+    def replace(self, other):
+        """
+        Novo cubo em que as células preenchidas de `other` substituem (em vez
+        de somar) as deste cubo; as demais são unidas como em merge().
+        """
+        arrays = [array.copy() for array in
+                  (self.count, self.total, self.total_sq, self.minimum, self.maximum)]
+        uf, crime, period = np.nonzero(other.count)
+        months = other.periods[period]
+        uf = self.ufs.get_indexer(other.ufs[uf])
+        crime = self.crimes.get_indexer(other.crimes[crime])
+        period = np.searchsorted(self.periods, months)
+        inside = (uf >= 0) & (crime >= 0) & (period < len(self.periods))
+        inside[inside] = self.periods[period[inside]] == months[inside]
+        cells = (uf[inside], crime[inside], period[inside])
+        for array, empty in zip(arrays, (0, 0, 0, np.inf, -np.inf)):
+            array[cells] = empty
+        cleared = CrimeCube(self.ufs, self.crimes, self.periods, *arrays,
+                            value_column=self.value_column, value_dtype=self.value_dtype,
+                            meses=self.meses)
+        return cleared.merge(other)
+
+    def save(self, path):
+        """Salva o cubo em um arquivo .npz (escrita atômica)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f, ufs=np.asarray(self.ufs, dtype=str), crimes=np.asarray(self.crimes, dtype=str),
+                periods=self.periods, count=self.count, total=self.total,
+                total_sq=self.total_sq, minimum=self.minimum, maximum=self.maximum,
+                meses=np.asarray([] if self.meses is None else self.meses, dtype=str),
+                value_column=np.array(self.value_column), value_dtype=np.array(str(self.value_dtype))
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Carrega um cubo salvo com save()."""
+        with np.load(path) as data:
+            meses = pd.Index(data['meses'].tolist())
+            return cls(
+                pd.Index(data['ufs'].tolist()), pd.Index(data['crimes'].tolist()), data['periods'],
+                data['count'], data['total'], data['total_sq'], data['minimum'], data['maximum'],
+                value_column=str(data['value_column']), value_dtype=str(data['value_dtype']),
+                meses=meses if len(meses) else None
+            )
+
+    @property
+    def shape(self):
+        return self.count.shape
+
+    def _axis_index(self, axis):
+        if axis == 'UF':
+            return pd.CategoricalIndex(self.ufs, categories=self.ufs, name='UF')
+        if axis == 'Tipo Crime':
+            return pd.CategoricalIndex(self.crimes, categories=self.crimes, name='Tipo Crime')
+        return pd.DatetimeIndex(self.periods, name='Data')
+
+    def _reduce(self, keep):
+        """Contagem, soma, soma dos quadrados, mínimo e máximo nos eixos mantidos."""
+        axes = tuple(i for i, name in enumerate(AXES) if name not in keep)
+        order = [[name for name in AXES if name in keep].index(name) for name in keep]
+        reduced = (
+            self.count.sum(axis=axes), self.total.sum(axis=axes), self.total_sq.sum(axis=axes),
+            self.minimum.min(axis=axes), self.maximum.max(axis=axes)
+        )
+        return [np.transpose(array, order) for array in reduced]
+
+    def _as_values(self, array):
+        if self.value_dtype.kind in 'iu':
+            return array.astype(np.int64)
+        return array
+
+    def rollup(self, keep, stat='sum'):
+        """
+        Agrega o cubo mantendo os eixos `keep` (subconjunto de UF, Tipo Crime e
+        Data, na ordem desejada). Retorna uma Series só com as combinações
+        observadas, como groupby(keep, observed=True)[valor].agg(stat).
+        """
+        keep = list(keep)
+        count, total, total_sq, minimum, maximum = self._reduce(keep)
+        observed = count > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if stat == 'sum':
+                result = self._as_values(total)
+            elif stat == 'count':
+                result = count.astype(np.int64)
+            elif stat == 'mean':
+                result = total / count
+            elif stat == 'std':
+                result = np.sqrt(np.maximum(total_sq - total * total / count, 0) / (count - 1))
+                result[count < 2] = np.nan
+            elif stat == 'min':
+                result = minimum
+            elif stat == 'max':
+                result = maximum
+            else:
+                raise ValueError(f"Estatística não suportada: {stat}")
+
+        if stat in ('min', 'max'):
+            # Células sem linhas têm +-inf e são descartadas abaixo
+            result = np.where(observed, result, 0).astype(self.value_dtype)
+
+        index = pd.MultiIndex.from_product([self._axis_index(axis) for axis in keep])
+        series = pd.Series(result.ravel(), index=index, name=self.value_column)
+        series = series[observed.ravel()]
+        if len(keep) == 1:
+            series.index = series.index.get_level_values(0)
+        return series
+
+    # Visões usadas pelas análises
+
+    def crime_trends(self):
+        """Equivalente a groupby(['Data', 'Tipo Crime'])[valor].sum().reset_index()."""
+        return self.rollup(['Data', 'Tipo Crime']).reset_index()
+
+    def uf_crime_totals(self):
+        """Equivalente a pivot_table(index='UF', columns='Tipo Crime', aggfunc='sum')."""
+        return self.rollup(['UF', 'Tipo Crime']).unstack('Tipo Crime')
+
+    def uf_period_by_crime(self):
+        """Equivalente a pivot_table(index=['UF', 'Data'], columns='Tipo Crime', aggfunc='sum')."""
+        return self.rollup(['UF', 'Data', 'Tipo Crime']).unstack('Tipo Crime')
+
+    def monthly_mean(self, meses_nomes):
+        """
+        Média dos valores por mês do ano (equivalente a groupby('Mês').mean()),
+        na ordem das categorias de Mês. `meses_nomes` lista os nomes de janeiro
+        a dezembro.
+        """
+        count, total, _, _, _ = self._reduce(['Data'])
+        month_of_year = self.periods.astype('datetime64[M]').astype(np.int64) % 12
+        count = np.bincount(month_of_year, weights=count, minlength=12)
+        total = np.bincount(month_of_year, weights=total, minlength=12)
+
+        meses = self.meses if self.meses is not None else pd.Index(meses_nomes)
+        meses = meses[meses.isin(meses_nomes)]
+        position = [meses_nomes.index(m) for m in meses]
+        result = pd.Series(
+            total[position] / count[position],
+            index=pd.CategoricalIndex(meses, categories=meses, name='Mês'),
+            name=self.value_column
+        )
+        return result[count[position] > 0]
+
+    def summary(self, by):
+        """Equivalente a groupby(by).agg({valor: ['count', 'mean', 'std', 'min', 'max']})."""
+        table = pd.concat({stat: self.rollup([by], stat) for stat in STATS}, axis=1)
+        table.columns = pd.MultiIndex.from_product([[self.value_column], STATS])
+        return table
@@ -2,8 +2,13 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+import sys
 from pathlib import Path
 
+# Módulos compartilhados na raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.dtype_optimizer import optimize_dtypes
+
 # Configuração para exibir todas as colunas
 pd.set_option('display.max_columns', None)
 
@@ -16,6 +21,10 @@ def load_and_inspect_data():
     df_ocorrencias = pd.read_csv(ocorrencias_path, encoding='latin1', sep=';')
     df_vitimas = pd.read_csv(vitimas_path, encoding='latin1', sep=';')
     
+    # 'Ocorrências' ainda contém "-" e é tratada como texto até a limpeza
+    df_ocorrencias = optimize_dtypes(df_ocorrencias, exclude=['Ocorrências'], verbose=True)
+    df_vitimas = optimize_dtypes(df_vitimas, verbose=True)
+    
     print("\n=== Análise do DataFrame de Ocorrências ===")
     print("\nPrimeiras linhas:")
     print(df_ocorrencias.head())
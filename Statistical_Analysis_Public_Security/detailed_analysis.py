@@ -2,156 +2,313 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+import argparse
+import os
+import sys
 from pathlib import Path
 
+# Módulos compartilhados na raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.correlation import correlation_matrix
+from common.dtype_optimizer import optimize_dtypes
+from common.report_renderer import ReportRenderer
+from anomaly_detection import scan_cube
+from crime_cube import CrimeCube
+from hypothesis_testing import hypothesis_tests
+from incremental import DEFAULT_STATE_DIR, update_cube
+from security_store import SecurityStore
+from time_series import SeriesMatrix
+
+
+MESES = ['janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
+         'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro']
+
+OCORRENCIAS_FILE = 'indicadoressegurancapublica_ocorrecia.CSV'
+VITIMAS_FILE = 'indicadoressegurancapublica_vitimas.CSV'
+
+
+def read_indicadores(path, value_column):
+    """
+    Lê um CSV de indicadores (latin1, separado por ';') com tipos explícitos.
+    "-" é lido como ausente e vira 0; a coluna Data é calculada a partir dos
+    códigos de ano e mês, sem conversão de strings.
+    """
+    df = pd.read_csv(
+        path, encoding='latin1', sep=';',
+        dtype={'UF': 'category', 'Tipo Crime': 'category', 'Ano': 'int16',
+               'Mês': 'category', value_column: 'float64'},
+        na_values={value_column: ['-']}
+    )
+    df[value_column] = df[value_column].fillna(0).astype('int64')
+    
+    # Número do mês de cada categoria (categorias desconhecidas viram NaT)
+    month_of_category = np.array(
+        [MESES.index(m) if m in MESES else -1 for m in df['Mês'].cat.categories] + [-1]
+    )
+    month = month_of_category[df['Mês'].cat.codes.to_numpy()]
+    months_since_epoch = (df['Ano'].to_numpy(dtype=np.int64) - 1970) * 12 + month
+    data = months_since_epoch.astype('datetime64[M]').astype('datetime64[ns]')
+    data[month < 0] = np.datetime64('NaT')
+    df['Data'] = data
+    return df
+
+
+def plot_crime_trends(trends, path):
+    """Um gráfico por tipo de crime: série mensal e média móvel de 12 meses."""
+    monthly, rolling = trends
+    n_crimes = len(monthly)
+    n_cols = 2
+    n_rows = (n_crimes + n_cols - 1) // n_cols
+    
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 4*n_rows))
+    axes = axes.flatten()
+    
+    for idx, crime in enumerate(monthly.index):
+        axes[idx].plot(monthly.columns, monthly.loc[crime], label='Mensal')
+        axes[idx].plot(rolling.columns, rolling.loc[crime], label='Média móvel (12 meses)')
+        axes[idx].set_title(crime)
+        axes[idx].set_xlabel('Data')
+        axes[idx].set_ylabel('Número de Ocorrências')
+        axes[idx].tick_params(axis='x', rotation=45)
+        axes[idx].legend()
+    
+    # Remover subplots vazios
+    for idx in range(n_crimes, len(axes)):
+        fig.delaxes(axes[idx])
+    
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_regional_distribution(ocorrencias_uf_crime, path):
+    """Heatmap de ocorrências por UF e tipo de crime."""
+    plt.figure(figsize=(15, 10))
+    sns.heatmap(ocorrencias_uf_crime, annot=True, fmt='.0f', cmap='YlOrRd')
+    plt.title('Distribuição de Ocorrências por UF e Tipo de Crime')
+    plt.xlabel('Tipo de Crime')
+    plt.ylabel('UF')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_crime_correlation(corr_matrix, path):
+    """Heatmap da matriz de correlação entre tipos de crime."""
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, fmt='.2f')
+    plt.title('Correlação entre Tipos de Crime')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_temporal_patterns(monthly_avg, path):
+    """Média de ocorrências por mês."""
+    plt.figure(figsize=(12, 6))
+    monthly_avg.plot(kind='bar')
+    plt.title('Média de Ocorrências por Mês')
+    plt.xlabel('Mês')
+    plt.ylabel('Média de Ocorrências')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
 class SecurityDataAnalyzer:
-    def __init__(self):
+    def __init__(self, reports_dir='reports', plot_processes=None, test_processes=None,
+                 cache_dir=DEFAULT_STATE_DIR):
         self.df_ocorrencias = None
         self.df_vitimas = None
+        self.cube = None
+        self.store = None
+        self.reports_dir = Path(reports_dir)
+        # Com plot_processes as figuras são acumuladas e geradas em render_reports()
+        self.renderer = ReportRenderer(self.reports_dir, processes=plot_processes,
+                                       defer=bool(plot_processes))
+        # Processos dos testes de hipóteses (None: serial)
+        self.test_processes = test_processes
+        # Cache em disco das matrizes de correlação (None: desativado)
+        self.cache_dir = cache_dir
         
-    def load_data(self):
+    def load_data(self, data_dir='data'):
         """Carrega e prepara os dados para análise."""
-        # Carregar dados
-        self.df_ocorrencias = pd.read_csv('data/indicadoressegurancapublica_ocorrecia.CSV', 
-                                        encoding='latin1', sep=';')
-        self.df_vitimas = pd.read_csv('data/indicadoressegurancapublica_vitimas.CSV', 
-                                    encoding='latin1', sep=';')
+        data_dir = Path(data_dir)
+        self.df_ocorrencias = read_indicadores(data_dir / OCORRENCIAS_FILE, 'Ocorrências')
+        self.df_vitimas = read_indicadores(data_dir / VITIMAS_FILE, 'Vítimas')
         
-        # Substituir "-" por 0 e converter 'Ocorrências' para numérico
-        self.df_ocorrencias['Ocorrências'] = self.df_ocorrencias['Ocorrências'].replace('-', '0')
-        self.df_ocorrencias['Ocorrências'] = pd.to_numeric(self.df_ocorrencias['Ocorrências'])
+        # Inteiros reduzidos ao menor tipo suficiente
+        self.df_ocorrencias = optimize_dtypes(self.df_ocorrencias, verbose=True)
+        self.df_vitimas = optimize_dtypes(self.df_vitimas, verbose=True)
         
-        # Criar coluna de data
-        meses = {'janeiro': 1, 'fevereiro': 2, 'março': 3, 'abril': 4, 'maio': 5, 'junho': 6,
-                'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12}
+        # Agregados UF x Tipo Crime x mês usados por todas as análises
+        self.cube = CrimeCube.from_frame(self.df_ocorrencias)
         
-        for df in [self.df_ocorrencias, self.df_vitimas]:
-            df['Data'] = pd.to_datetime(df['Ano'].astype(str) + '-' + 
-                                      df['Mês'].map(meses).astype(str) + '-01')
+        # Ocorrências e vítimas unidas por (UF, Tipo Crime, Data)
+        self.store = SecurityStore.from_frames(self.df_ocorrencias, self.df_vitimas)
+    
+    def load_cube(self, data_dir='data', state_dir=DEFAULT_STATE_DIR, rebuild=False):
+        """
+        Modo incremental: carrega o cubo salvo e agrega apenas as células
+        (UF, tipo de crime, mês) novas ou alteradas do CSV de ocorrências.
+        Retorna os meses atualizados.
+        """
+        self.cube, added = update_cube(Path(data_dir) / OCORRENCIAS_FILE, read_indicadores,
+                                       state_dir=state_dir, rebuild=rebuild)
+        return added
+    
+    def _save_csv(self, frame, filename, **kwargs):
+        """Grava o CSV apenas se o conteúdo mudou."""
+        path = self.reports_dir / filename
+        content = frame.to_csv(**kwargs)
+        if path.exists() and path.read_text(encoding='utf-8') == content:
+            return False
+        path.write_text(content, encoding='utf-8')
+        return True
     
     def analyze_crime_trends(self):
         """Analisa tendências temporais dos crimes."""
-        # Análise por tipo de crime ao longo do tempo
-        crimes_tempo = self.df_ocorrencias.groupby(['Data', 'Tipo Crime'])['Ocorrências'].sum().reset_index()
-        
-        # Criar subplots para diferentes categorias de crime
-        unique_crimes = crimes_tempo['Tipo Crime'].unique()
-        n_crimes = len(unique_crimes)
-        n_cols = 2
-        n_rows = (n_crimes + n_cols - 1) // n_cols
-        
-        fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 4*n_rows))
-        axes = axes.flatten()
-        
-        for idx, crime in enumerate(unique_crimes):
-            data = crimes_tempo[crimes_tempo['Tipo Crime'] == crime]
-            axes[idx].plot(data['Data'], data['Ocorrências'])
-            axes[idx].set_title(crime)
-            axes[idx].set_xlabel('Data')
-            axes[idx].set_ylabel('Número de Ocorrências')
-            axes[idx].tick_params(axis='x', rotation=45)
-        
-        # Remover subplots vazios
-        for idx in range(n_crimes, len(axes)):
-            fig.delaxes(axes[idx])
-        
-        plt.tight_layout()
-        plt.savefig('reports/crime_trends.png')
-        plt.close()
+        # Matriz tipo de crime x mês, montada uma única vez
+        series = SeriesMatrix.from_cube(self.cube)
+        
+        trends = (series.to_frame(), series.to_frame(series.rolling_mean()))
+        self.renderer.add('crime_trends.png', plot_crime_trends, trends)
+        
+        # Tendência, variação anual e sazonalidade de cada tipo de crime
+        trend_summary = series.summary().round(3)
+        self._save_csv(trend_summary, 'crime_trend_summary.csv')
+        return trend_summary
+    
+    def analyze_uf_trends(self):
+        """Tendência, variação anual e sazonalidade de cada par UF x tipo de crime."""
+        uf_trends = SeriesMatrix.from_cube(self.cube, by_uf=True).summary().round(3)
+        self._save_csv(uf_trends, 'uf_crime_trends.csv')
+        return uf_trends
         
     def analyze_regional_distribution(self):
         """Analisa a distribuição regional dos crimes."""
         # Total de ocorrências por UF e tipo de crime
-        ocorrencias_uf_crime = self.df_ocorrencias.pivot_table(
-            values='Ocorrências',
-            index='UF',
-            columns='Tipo Crime',
-            aggfunc='sum'
-        )
+        ocorrencias_uf_crime = self.cube.uf_crime_totals()
         
         # Plotar heatmap
-        plt.figure(figsize=(15, 10))
-        sns.heatmap(ocorrencias_uf_crime, annot=True, fmt='.0f', cmap='YlOrRd')
-        plt.title('Distribuição de Ocorrências por UF e Tipo de Crime')
-        plt.xlabel('Tipo de Crime')
-        plt.ylabel('UF')
-        plt.tight_layout()
-        plt.savefig('reports/regional_distribution.png')
-        plt.close()
+        self.renderer.add('regional_distribution.png', plot_regional_distribution,
+                          ocorrencias_uf_crime)
         
     def analyze_crime_correlation(self):
         """Analisa correlações entre diferentes tipos de crimes."""
-        # Pivot table para análise de correlação
-        crime_pivot = self.df_ocorrencias.pivot_table(
-            index=['UF', 'Data'],
-            columns='Tipo Crime',
-            values='Ocorrências',
-            aggfunc='sum'
-        ).reset_index()
-        
-        # Matriz de correlação
-        corr_matrix = crime_pivot.select_dtypes(include=[np.number]).corr()
-        
-        plt.figure(figsize=(12, 10))
-        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, fmt='.2f')
-        plt.title('Correlação entre Tipos de Crime')
-        plt.tight_layout()
-        plt.savefig('reports/crime_correlation.png')
-        plt.close()
+        # Ocorrências por (UF, mês) com uma coluna por tipo de crime
+        crime_pivot = self.cube.uf_period_by_crime().reset_index()
+        
+        # Matriz de correlação (em cache enquanto os dados não mudarem)
+        corr_matrix = correlation_matrix(crime_pivot.select_dtypes(include=[np.number]),
+                                         cache_dir=self.cache_dir)
+        
+        self.renderer.add('crime_correlation.png', plot_crime_correlation, corr_matrix)
         
     def analyze_temporal_patterns(self):
         """Analisa padrões temporais nos crimes."""
         # Média de ocorrências por mês
-        monthly_avg = self.df_ocorrencias.groupby('Mês')['Ocorrências'].mean()
-        
-        plt.figure(figsize=(12, 6))
-        monthly_avg.plot(kind='bar')
-        plt.title('Média de Ocorrências por Mês')
-        plt.xlabel('Mês')
-        plt.ylabel('Média de Ocorrências')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('reports/temporal_patterns.png')
-        plt.close()
+        monthly_avg = self.cube.monthly_mean(MESES)
+        
+        self.renderer.add('temporal_patterns.png', plot_temporal_patterns, monthly_avg)
+    
+    def analyze_lethality(self):
+        """Calcula vítimas por ocorrência por UF (crimes presentes nas duas bases)."""
+        lethality = self.store.lethality_by_uf().round(3)
+        self._save_csv(lethality, 'lethality_by_uf.csv')
+        return lethality
+    
+    def detect_anomalies(self, window=12, threshold=3.5):
+        """Meses atípicos em cada série UF x tipo de crime, do mais ao menos extremo."""
+        anomalies = scan_cube(self.cube, window=window, threshold=threshold).round(3)
+        self._save_csv(anomalies, 'anomalies.csv', index=False)
+        return anomalies
+    
+    def test_hypotheses(self, groupings=('UF', 'Mês', 'Ano')):
+        """
+        Testa, para cada tipo de crime, se ocorrências e vítimas diferem entre
+        UFs, meses e anos (ANOVA, Welch e Kruskal-Wallis, com correção FDR).
+        """
+        processes = self.test_processes
+        results = pd.concat([
+            hypothesis_tests(self.df_ocorrencias, ['Ocorrências'], groupings, processes=processes),
+            hypothesis_tests(self.df_vitimas, ['Vítimas'], groupings, processes=processes),
+        ], ignore_index=True)
+        self._save_csv(results, 'hypothesis_tests.csv', index=False)
+        return results
+    
+    def render_reports(self):
+        """Gera as figuras acumuladas que mudaram desde a última execução."""
+        return self.renderer.render()
         
     def generate_summary_statistics(self):
         """Gera estatísticas resumidas dos dados."""
         # Estatísticas por tipo de crime
-        crime_stats = self.df_ocorrencias.groupby('Tipo Crime').agg({
-            'Ocorrências': ['count', 'mean', 'std', 'min', 'max']
-        }).round(2)
+        crime_stats = self.cube.summary('Tipo Crime').round(2)
         
         # Estatísticas por UF
-        uf_stats = self.df_ocorrencias.groupby('UF').agg({
-            'Ocorrências': ['count', 'mean', 'std', 'min', 'max']
-        }).round(2)
+        uf_stats = self.cube.summary('UF').round(2)
         
         # Salvar estatísticas em CSV
-        crime_stats.to_csv('reports/crime_statistics.csv')
-        uf_stats.to_csv('reports/uf_statistics.csv')
+        self._save_csv(crime_stats, 'crime_statistics.csv')
+        self._save_csv(uf_stats, 'uf_statistics.csv')
         
         return crime_stats, uf_stats
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análise dos indicadores de segurança pública")
+    parser.add_argument('--incremental', action='store_true',
+                        help="usa o cubo salvo em data/.cache e agrega só os meses novos")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="reconstrói o cubo salvo a partir do CSV completo")
+    args = parser.parse_args(argv)
+    
     # Criar diretório de reports se não existir
     Path('reports').mkdir(exist_ok=True)
     
     # Inicializar e executar análises
-    analyzer = SecurityDataAnalyzer()
-    analyzer.load_data()
+    analyzer = SecurityDataAnalyzer(plot_processes=os.cpu_count(),
+                                    test_processes=os.cpu_count())
+    if args.incremental:
+        added = analyzer.load_cube(rebuild=args.rebuild)
+        if added:
+            print(f"Meses atualizados no cubo: {len(added)} ({added[0]} a {added[-1]})")
+        else:
+            print("Nenhuma célula nova ou alterada; usando o cubo salvo.")
+    else:
+        analyzer.load_data()
     
     print("Gerando análises...")
-    analyzer.analyze_crime_trends()
+    trend_summary = analyzer.analyze_crime_trends()
     analyzer.analyze_regional_distribution()
     analyzer.analyze_crime_correlation()
     analyzer.analyze_temporal_patterns()
+    status = analyzer.render_reports()
+    print(f"Figuras: {status}")
     
     crime_stats, uf_stats = analyzer.generate_summary_statistics()
+    analyzer.analyze_uf_trends()
+    anomalies = analyzer.detect_anomalies()
     
     print("\nEstatísticas por Tipo de Crime:")
     print(crime_stats)
     print("\nEstatísticas por UF:")
     print(uf_stats)
+    print("\nTendência por Tipo de Crime:")
+    print(trend_summary)
+    print(f"\nAnomalias detectadas: {len(anomalies)} (maiores pontuações):")
+    print(anomalies.head(10))
+    
+    # Letalidade e testes de hipóteses precisam das linhas completas
+    if not args.incremental:
+        lethality = analyzer.analyze_lethality()
+        hypotheses = analyzer.test_hypotheses()
+        print("\nVítimas por Ocorrência por UF:")
+        print(lethality)
+        print("\nTestes de Hipóteses (hipóteses nulas rejeitadas por teste e agrupamento):")
+        print(hypotheses.pivot_table(index='agrupamento', columns='teste',
+                                     values='rejeita_h0', aggfunc='sum'))
     
     print("\nAnálise concluída! Os resultados foram salvos na pasta 'reports'.")
 
@@ -0,0 +1,167 @@
+"""
+Testes de hipóteses em lote para os indicadores de segurança pública
+
+Para cada combinação (variável, agrupamento) é feito um único groupby por
+(estrato, grupo), que fornece contagem, soma, soma dos quadrados e soma dos
+postos de cada grupo. A partir desses momentos são calculados, para todos os
+estratos (por padrão, cada tipo de crime) de uma vez:
+
+- ANOVA de um fator (`anova`);
+- ANOVA de Welch para variâncias desiguais (`welch`; com dois grupos equivale
+  ao teste t de Welch);
+- Kruskal-Wallis com correção de empates (`kruskal`).
+
+As combinações são distribuídas em um pool de processos e os p-valores de
+cada teste são corrigidos para comparações múltiplas.
+"""
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+TESTS = ('anova', 'welch', 'kruskal')
+
+RESULT_COLUMNS = ['grupos', 'n', 'estatistica', 'gl_num', 'gl_den', 'p_valor']
+
+
+def _group_moments(work):
+    """Momentos por (estrato, grupo), com valores centrados na média do estrato."""
+    by_stratum = work.groupby('estrato', observed=True)['valor']
+    centered = work['valor'] - by_stratum.transform('mean')
+    work = work.assign(centrado=centered, quadrado=centered * centered,
+                       posto=by_stratum.rank())
+    moments = work.groupby(['estrato', 'grupo'], observed=True).agg(
+        n=('centrado', 'size'), soma=('centrado', 'sum'),
+        soma_quadrados=('quadrado', 'sum'), soma_postos=('posto', 'sum')
+    )
+    # Σ(t³ - t) dos empates de cada estrato (correção do Kruskal-Wallis)
+    ties = work.groupby(['estrato', 'valor'], observed=True).size().astype(np.float64)
+    ties = (ties ** 3 - ties).groupby(level=0, observed=True).sum()
+    return moments, ties
+
+
+def _per_stratum(values):
+    return values.groupby(level=0, observed=True).sum()
+
+
+def _anova(moments):
+    n_total = _per_stratum(moments['n'])
+    k = moments.groupby(level=0, observed=True).size()
+    total = _per_stratum(moments['soma'])
+    between_raw = _per_stratum(moments['soma'] ** 2 / moments['n'])
+    ss_between = between_raw - total ** 2 / n_total
+    ss_within = _per_stratum(moments['soma_quadrados']) - between_raw
+    df_num, df_den = k - 1, n_total - k
+    statistic = (ss_between / df_num) / (ss_within / df_den)
+    return pd.DataFrame({
+        'grupos': k, 'n': n_total, 'estatistica': statistic,
+        'gl_num': df_num, 'gl_den': df_den,
+        'p_valor': stats.f.sf(statistic, df_num, df_den),
+    })
+
+
+def _welch(moments):
+    # Grupos com uma única observação não têm variância
+    moments = moments[moments['n'] >= 2]
+    n = moments['n']
+    mean = moments['soma'] / n
+    variance = (moments['soma_quadrados'] - moments['soma'] * mean) / (n - 1)
+    weight = n / variance
+    k = moments.groupby(level=0, observed=True).size()
+    # Totais do estrato repetidos em cada grupo
+    weight_total = weight.groupby(level=0, observed=True).transform('sum')
+    weighted_mean = (weight * mean).groupby(level=0, observed=True).transform('sum') / weight_total
+
+    deviation = mean - weighted_mean
+    a = _per_stratum(weight * deviation ** 2) / (k - 1)
+    share = weight / weight_total
+    tmp = _per_stratum((1 - share) ** 2 / (n - 1))
+    b = 1 + 2 * (k - 2) / (k ** 2 - 1) * tmp
+    statistic = a / b
+    df_num, df_den = k - 1, (k ** 2 - 1) / (3 * tmp)
+    return pd.DataFrame({
+        'grupos': k, 'n': _per_stratum(n), 'estatistica': statistic,
+        'gl_num': df_num, 'gl_den': df_den,
+        'p_valor': stats.f.sf(statistic, df_num, df_den),
+    })
+
+
+def _kruskal(moments, ties):
+    n_total = _per_stratum(moments['n']).astype(np.float64)
+    k = moments.groupby(level=0, observed=True).size()
+    rank_term = _per_stratum(moments['soma_postos'] ** 2 / moments['n'])
+    statistic = 12 / (n_total * (n_total + 1)) * rank_term - 3 * (n_total + 1)
+    statistic = statistic / (1 - ties.reindex(statistic.index) / (n_total ** 3 - n_total))
+    df_num = k - 1
+    return pd.DataFrame({
+        'grupos': k, 'n': n_total.astype(np.int64), 'estatistica': statistic,
+        'gl_num': df_num, 'gl_den': np.nan,
+        'p_valor': stats.chi2.sf(statistic, df_num),
+    })
+
+
+def _run_job(job):
+    work, variable, grouping, tests = job
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        moments, ties = _group_moments(work)
+        results = {}
+        if 'anova' in tests:
+            results['anova'] = _anova(moments)
+        if 'welch' in tests:
+            results['welch'] = _welch(moments)
+        if 'kruskal' in tests:
+            results['kruskal'] = _kruskal(moments, ties)
+
+    table = pd.concat(results, names=['teste', 'estrato'])[RESULT_COLUMNS].reset_index()
+    table.insert(0, 'agrupamento', grouping)
+    table.insert(0, 'variavel', variable)
+    return table
+
+
+def hypothesis_tests(df, variables, groupings, strata_column='Tipo Crime',
+                     tests=TESTS, processes=None, alpha=0.05, correction='fdr_bh'):
+    """
+    Testa, para cada variável e agrupamento, se a variável difere entre os
+    grupos, separadamente em cada estrato (`strata_column`; None testa o
+    conjunto inteiro). Retorna uma tabela com uma linha por (variável,
+    agrupamento, estrato, teste), com p-valores corrigidos pelo método
+    `correction` do statsmodels dentro de cada teste.
+    """
+    unknown = set(tests) - set(TESTS)
+    if unknown:
+        raise ValueError(f"Testes não suportados: {', '.join(sorted(unknown))}")
+
+    jobs = []
+    for variable, grouping in product(variables, groupings):
+        work = pd.DataFrame({
+            'estrato': df[strata_column] if strata_column else 'todos',
+            'grupo': df[grouping],
+            'valor': df[variable].astype(np.float64),
+        }).dropna(subset=['valor'])
+        jobs.append((work, variable, grouping, tuple(tests)))
+
+    if processes and processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(jobs))) as executor:
+            tables = list(executor.map(_run_job, jobs))
+    else:
+        tables = [_run_job(job) for job in jobs]
+
+    results = pd.concat(tables, ignore_index=True)
+    results = results.rename(columns={'estrato': strata_column or 'estrato'})
+
+    # Correção de comparações múltiplas dentro de cada teste
+    results['p_ajustado'] = np.nan
+    for _, rows in results.groupby('teste').groups.items():
+        p_values = results.loc[rows, 'p_valor']
+        valid = p_values.notna()
+        if valid.any():
+            results.loc[p_values[valid].index, 'p_ajustado'] = multipletests(
+                p_values[valid], alpha=alpha, method=correction
+            )[1]
+    results['rejeita_h0'] = results['p_ajustado'] < alpha
+    return results
@@ -0,0 +1,114 @@
+"""
+Atualização incremental do cubo de ocorrências a cada divulgação mensal
+
+O cubo UF x Tipo Crime x mês fica salvo em data/.cache junto com a impressão
+digital (tamanho e mtime) do CSV de origem. A cada execução:
+
+- CSV inalterado: o cubo salvo é usado sem ler o CSV;
+- CSV alterado: as linhas são comparadas com o cubo por célula (UF, Tipo
+  Crime, mês). Só as células novas ou cuja quantidade de linhas, soma ou
+  soma dos quadrados mudou (meses novos, UFs que divulgam com atraso,
+  revisões) são agregadas de novo e substituem as células do cubo, que é
+  salvo.
+
+Células que deixaram de existir no CSV continuam no cubo; nesse caso é
+preciso reconstruí-lo (`rebuild=True`).
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from crime_cube import CrimeCube
+
+DEFAULT_STATE_DIR = Path('data/.cache')
+CUBE_FILE = 'crime_cube.npz'
+META_FILE = 'crime_cube.json'
+STATE_VERSION = 1
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _read_meta(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(path, meta):
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _differs(csv_values, cube_values):
+    """Comparação exata; NaN só é igual quando os dois lados são NaN."""
+    both_nan = np.isnan(csv_values) & np.isnan(cube_values)
+    return (csv_values != cube_values) & ~both_nan
+
+
+def changed_cells(df, cube):
+    """
+    Linhas de df das células (UF, Tipo Crime, mês) ausentes do cubo ou com
+    quantidade de linhas, soma ou soma dos quadrados diferentes das do cubo.
+    As somas de inteiros são exatas em float64, então a comparação é exata:
+    qualquer revisão, mesmo pequena em uma célula grande, é detectada.
+    """
+    df = df[df['UF'].notna() & df['Tipo Crime'].notna() & df['Data'].notna()]
+    uf, crime, period = cube.cell_lookup(df)
+    present = (uf >= 0) & (crime >= 0) & (period >= 0)
+    cells = (uf[present], crime[present], period[present])
+    cube_stats = np.zeros((3, len(df)))
+    for row, array in enumerate((cube.count, cube.total, cube.total_sq)):
+        cube_stats[row, present] = array[cells]
+
+    months = df['Data'].to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+    values = df[cube.value_column].astype('float64')
+    keys = [df['UF'], df['Tipo Crime'], months]
+    cell_values = values.groupby(keys, observed=True, sort=False)
+    csv_stats = np.vstack([
+        cell_values.transform('size').to_numpy(dtype=np.float64),
+        cell_values.transform('sum').to_numpy(),
+        (values * values).groupby(keys, observed=True, sort=False).transform('sum').to_numpy(),
+    ])
+    return df[_differs(csv_stats, cube_stats).any(axis=0)]
+
+
+def update_cube(csv_path, read_function, value_column='Ocorrências',
+                state_dir=DEFAULT_STATE_DIR, rebuild=False):
+    """
+    Retorna (cubo atualizado, meses com células novas ou alteradas).
+    `read_function(path, value_column)` lê o CSV completo quando ele mudou.
+    """
+    state_dir = Path(state_dir)
+    cube_path = state_dir / CUBE_FILE
+    meta_path = state_dir / META_FILE
+    fingerprint = _fingerprint(csv_path)
+
+    meta = _read_meta(meta_path)
+    cube = None
+    if not rebuild and meta.get('version') == STATE_VERSION and cube_path.exists():
+        cube = CrimeCube.load(cube_path)
+        if meta.get('fingerprint') == fingerprint:
+            return cube, []
+
+    df = read_function(csv_path, value_column)
+    if cube is None:
+        cube = CrimeCube.from_frame(df, value_column=value_column)
+        added = cube.periods
+    else:
+        rows = changed_cells(df, cube)
+        added = np.unique(rows['Data'].to_numpy(dtype='datetime64[ns]').astype('datetime64[M]'))
+        if len(rows):
+            cube = cube.replace(CrimeCube.from_frame(rows, value_column=value_column))
+
+    cube.save(cube_path)
+    _write_meta(meta_path, {'version': STATE_VERSION, 'fingerprint': fingerprint})
+    return cube, [str(np.datetime_as_string(p, unit='M')) for p in added]
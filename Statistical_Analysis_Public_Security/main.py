@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+import sys
 from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -8,6 +9,12 @@ from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
 import statsmodels.api as sm
 
+# Módulos compartilhados na raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.correlation import correlation_matrix
+from common.dtype_optimizer import optimize_dtypes
+from hypothesis_testing import hypothesis_tests
+
 class SecurityDataAnalyzer:
     def __init__(self, data_path):
         """Inicializa o analisador com o caminho para os dados."""
@@ -17,7 +24,7 @@ class SecurityDataAnalyzer:
     def load_data(self):
         """Carrega os dados do arquivo CSV."""
         try:
-            self.data = pd.read_csv(self.data_path)
+            self.data = optimize_dtypes(pd.read_csv(self.data_path))
             print("Dados carregados com sucesso!")
             return True
         except Exception as e:
@@ -31,7 +38,7 @@ class SecurityDataAnalyzer:
             return
             
         stats = self.data.describe()
-        correlations = self.data.corr()
+        correlations = correlation_matrix(self.data)
         
         return stats, correlations
         
@@ -40,10 +47,10 @@ class SecurityDataAnalyzer:
         if self.data is None:
             return None
             
-        groups = [group for _, group in self.data.groupby(group_by)[variable]]
-        f_stat, p_value = stats.f_oneway(*groups)
+        result = hypothesis_tests(self.data, [variable], [group_by],
+                                  strata_column=None, tests=('anova',)).iloc[0]
         
-        return {'f_statistic': f_stat, 'p_value': p_value}
+        return {'f_statistic': result['estatistica'], 'p_value': result['p_valor']}
         
     def build_regression_model(self, target, features):
         """Constrói modelo de regressão."""
@@ -79,9 +86,9 @@ def main():
         return
         
     # Análise descritiva
-    stats, corr = analyzer.perform_descriptive_analysis()
+    descriptive_stats, corr = analyzer.perform_descriptive_analysis()
     print("\nEstatísticas Descritivas:")
-    print(stats)
+    print(descriptive_stats)
     
     # Resultados serão expandidos quando os dados estiverem disponíveis
     
@@ -0,0 +1,89 @@
+"""
+Base combinada de ocorrências e vítimas indexada por (UF, Tipo Crime, Data)
+
+As duas tabelas são agregadas pela mesma chave e unidas uma única vez em um
+DataFrame com MultiIndex ordenado. Um índice auxiliar (UF, Tipo Crime) ->
+faixa de linhas permite obter as séries alinhadas de um par por fatiamento
+posicional, sem novos merges a cada consulta.
+"""
+import numpy as np
+import pandas as pd
+
+KEY = ['UF', 'Tipo Crime', 'Data']
+OCORRENCIAS = 'Ocorrências'
+VITIMAS = 'Vítimas'
+
+
+def _union_categories(*columns):
+    return sorted(set().union(*(pd.unique(column.dropna()) for column in columns)))
+
+
+def _aggregate(df, value_column, ufs, crimes):
+    keys = pd.DataFrame({
+        'UF': pd.Categorical(df['UF'], categories=ufs),
+        'Tipo Crime': pd.Categorical(df['Tipo Crime'], categories=crimes),
+        'Data': df['Data'],
+        value_column: df[value_column].astype('int64'),
+    })
+    return keys.groupby(KEY, observed=True)[value_column].sum()
+
+
+class SecurityStore:
+    """Ocorrências e vítimas lado a lado, com consultas por UF, crime e período."""
+
+    def __init__(self, frame):
+        self.frame = frame.sort_index()
+        # (UF, Tipo Crime) -> (início, fim) das linhas no frame ordenado
+        self._ranges = {
+            key: (int(positions[0]), int(positions[-1]) + 1)
+            for key, positions in self.frame.groupby(level=[0, 1], observed=True).indices.items()
+        }
+
+    @classmethod
+    def from_frames(cls, df_ocorrencias, df_vitimas):
+        """Agrega e une as duas tabelas (junção externa pela chave)."""
+        ufs = _union_categories(df_ocorrencias['UF'], df_vitimas['UF'])
+        crimes = _union_categories(df_ocorrencias['Tipo Crime'], df_vitimas['Tipo Crime'])
+        frame = pd.concat([
+            _aggregate(df_ocorrencias, OCORRENCIAS, ufs, crimes),
+            _aggregate(df_vitimas, VITIMAS, ufs, crimes),
+        ], axis=1).astype('Int64')
+        return cls(frame)
+
+    def query(self, uf=None, crime=None, start=None, end=None):
+        """Linhas filtradas por UF, tipo de crime e intervalo de datas (inclusivo)."""
+        selector = (
+            slice(None) if uf is None else uf,
+            slice(None) if crime is None else crime,
+            slice(start, end),
+        )
+        return self.frame.loc[selector, :]
+
+    def series(self, uf, crime, complete=False):
+        """
+        Ocorrências e vítimas de um par (UF, Tipo Crime) indexadas por Data.
+        Com `complete`, inclui os meses sem registro no intervalo.
+        """
+        start, stop = self._ranges.get((uf, crime), (0, 0))
+        result = self.frame.iloc[start:stop].droplevel([0, 1])
+        if complete and len(result):
+            months = pd.date_range(result.index.min(), result.index.max(), freq='MS', name='Data')
+            result = result.reindex(months)
+        return result
+
+    def victims_per_occurrence(self, by=('UF', 'Tipo Crime')):
+        """
+        Vítimas por ocorrência agregadas nos níveis `by`, considerando apenas
+        as linhas presentes nas duas tabelas.
+        """
+        both = self.frame.dropna(subset=[OCORRENCIAS, VITIMAS])
+        totals = both.groupby(level=list(by), observed=True)[[OCORRENCIAS, VITIMAS]].sum()
+        ocorrencias = totals[OCORRENCIAS].astype('float64').replace(0, np.nan)
+        totals['vitimas_por_ocorrencia'] = totals[VITIMAS].astype('float64') / ocorrencias
+        return totals
+
+    def lethality_by_uf(self):
+        """Painel de letalidade por UF: totais e vítimas por ocorrência."""
+        return self.victims_per_occurrence(by=['UF']).sort_values(
+            'vitimas_por_ocorrencia', ascending=False
+        )
@@ -0,0 +1,185 @@
+"""
+Backend SQL embarcado (SQLite) para os indicadores de segurança pública
+
+Os dois CSVs são ingeridos uma única vez em um banco SQLite em disco, com
+tipos explícitos e índices por (tipo de crime, data) e (UF, tipo de crime,
+data). As análises de tendência, distribuição regional e estatísticas
+resumidas são calculadas pelo próprio banco; apenas o resultado agregado
+chega ao pandas. A ingestão é refeita só quando um CSV muda.
+
+Uso em linha de comando:
+    python sql_backend.py "SELECT uf, SUM(quantidade) FROM ocorrencias GROUP BY uf"
+"""
+import argparse
+import csv
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_DB_PATH = Path('data/.cache/seguranca_publica.sqlite')
+
+# Tabela -> arquivo CSV de origem
+SOURCES = {
+    'ocorrencias': 'indicadoressegurancapublica_ocorrecia.CSV',
+    'vitimas': 'indicadoressegurancapublica_vitimas.CSV',
+}
+
+MESES = {'janeiro': 1, 'fevereiro': 2, 'março': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+         'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12}
+
+TABLE_SCHEMA = [
+    """
+    CREATE TABLE {table} (
+        uf TEXT NOT NULL,
+        tipo_crime TEXT NOT NULL,
+        ano INTEGER NOT NULL,
+        mes INTEGER NOT NULL,
+        data TEXT NOT NULL,
+        quantidade INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX {table}_crime_data ON {table} (tipo_crime, data)",
+    "CREATE INDEX {table}_uf_crime_data ON {table} (uf, tipo_crime, data)",
+]
+
+
+def file_fingerprint(path):
+    """Tamanho, mtime e hash blake2b do arquivo."""
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+            digest.update(block)
+    return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+
+def read_rows(path):
+    """Linhas do CSV (latin1, ';') já convertidas; "-" vira 0."""
+    with open(path, encoding='latin1', newline='') as f:
+        reader = csv.reader(f, delimiter=';')
+        next(reader)
+        for uf, tipo_crime, ano, mes, quantidade in reader:
+            ano, mes = int(ano), MESES[mes.strip().lower()]
+            quantidade = 0 if quantidade.strip() in ('', '-') else int(quantidade)
+            yield uf, tipo_crime, ano, mes, f"{ano:04d}-{mes:02d}-01", quantidade
+
+
+class SecuritySQLBackend:
+    """Consultas SQL sobre as tabelas `ocorrencias` e `vitimas`."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, data_dir='data'):
+        self.db_path = Path(db_path)
+        self.data_dir = Path(data_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta "
+            "(tabela TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT)"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _is_current(self, table, path):
+        row = self.connection.execute(
+            "SELECT size, mtime_ns, hash FROM meta WHERE tabela = ?", (table,)
+        ).fetchone()
+        if row is None:
+            return False
+        stat = os.stat(path)
+        if (stat.st_size, stat.st_mtime_ns) == row[:2]:
+            return True
+        return stat.st_size == row[0] and file_fingerprint(path)[2] == row[2]
+
+    def ingest(self, force=False):
+        """Carrega os CSVs que mudaram desde a última ingestão."""
+        loaded = []
+        for table, filename in SOURCES.items():
+            path = self.data_dir / filename
+            if not force and self._is_current(table, path):
+                continue
+            fingerprint = file_fingerprint(path)
+            # Meta, DROP/CREATE e dados em uma única transação (o DELETE abre a
+            # transação e o DDL do SQLite é transacional): uma ingestão
+            # interrompida é desfeita por inteiro e refeita na próxima execução
+            with self.connection:
+                self.connection.execute("DELETE FROM meta WHERE tabela = ?", (table,))
+                self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+                for statement in TABLE_SCHEMA:
+                    self.connection.execute(statement.format(table=table))
+                self.connection.executemany(
+                    f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?)", read_rows(path)
+                )
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?)", (table,) + fingerprint
+                )
+            loaded.append(table)
+        if loaded:
+            self.connection.execute("ANALYZE")
+        return loaded
+
+    def query(self, sql, params=()):
+        """Executa uma consulta SQL e retorna o resultado como DataFrame."""
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    # Análises calculadas no banco
+
+    def crime_trends(self, table='ocorrencias'):
+        """Total mensal por tipo de crime."""
+        df = self.query(
+            f"SELECT data AS Data, tipo_crime AS \"Tipo Crime\", SUM(quantidade) AS total "
+            f"FROM {table} GROUP BY data, tipo_crime ORDER BY data, tipo_crime"
+        )
+        df['Data'] = pd.to_datetime(df['Data'])
+        return df
+
+    def regional_distribution(self, table='ocorrencias'):
+        """Total por UF e tipo de crime (UF nas linhas, crimes nas colunas)."""
+        df = self.query(
+            f"SELECT uf AS UF, tipo_crime AS \"Tipo Crime\", SUM(quantidade) AS total "
+            f"FROM {table} GROUP BY uf, tipo_crime"
+        )
+        return df.pivot(index='UF', columns='Tipo Crime', values='total')
+
+    def summary_statistics(self, by='tipo_crime', table='ocorrencias'):
+        """Quantidade, média, desvio padrão amostral, mínimo e máximo por grupo."""
+        if by not in ('tipo_crime', 'uf', 'ano', 'mes'):
+            raise ValueError(f"Agrupamento não suportado: {by}")
+        df = self.query(
+            f"SELECT {by}, COUNT(*) AS count, AVG(quantidade) AS mean, "
+            f"SUM(quantidade * quantidade) AS soma_quadrados, SUM(quantidade) AS soma, "
+            f"MIN(quantidade) AS min, MAX(quantidade) AS max "
+            f"FROM {table} GROUP BY {by} ORDER BY {by}"
+        )
+        n = df['count'].astype('float64')
+        variance = (df['soma_quadrados'] - df['soma'] ** 2 / n) / (n - 1)
+        df['std'] = variance.clip(lower=0) ** 0.5
+        return df.set_index(by)[['count', 'mean', 'std', 'min', 'max']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas SQL sobre os indicadores de segurança")
+    parser.add_argument('sql', nargs='?', help="consulta SQL (tabelas: ocorrencias, vitimas)")
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB_PATH, help="arquivo do banco SQLite")
+    parser.add_argument('--force', action='store_true', help="refaz a ingestão dos CSVs")
+    args = parser.parse_args(argv)
+
+    with SecuritySQLBackend(args.db) as backend:
+        loaded = backend.ingest(force=args.force)
+        if loaded:
+            print(f"Tabelas carregadas: {', '.join(loaded)}")
+        if args.sql:
+            print(backend.query(args.sql).to_string())
+
+
+if __name__ == "__main__":
+    main()
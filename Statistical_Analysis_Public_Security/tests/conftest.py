@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Módulos do projeto e compartilhados na raiz do repositório
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR.parent))
+sys.path.insert(0, str(PROJECT_DIR))
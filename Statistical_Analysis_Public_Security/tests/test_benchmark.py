@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import benchmark
+from common import correlation
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+def test_run_stages_without_caches_and_serial_memory_pass(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    options = []
+
+    class RecordingAnalyzer(benchmark.SecurityDataAnalyzer):
+        def __init__(self, **kwargs):
+            options.append(kwargs)
+            super().__init__(**kwargs)
+
+    monkeypatch.setattr(benchmark, 'SecurityDataAnalyzer', RecordingAnalyzer)
+    stages = ['load_data', 'analyze_crime_correlation', 'analyze_crime_correlation']
+    monkeypatch.setattr(benchmark, 'STAGES', stages)
+    calls = []
+    compute = correlation._pearson
+    monkeypatch.setattr(correlation, '_pearson', lambda *args: calls.append(1) or compute(*args))
+
+    rows, results = benchmark.run_stages(DATA_DIR, processes=3)
+
+    assert rows > 0
+    assert set(results['analyze_crime_correlation']) == {'segundos', 'pico_memoria_mb'}
+    # Passada de tempo com processos, de memória serial; sem cache em disco
+    assert [(o['plot_processes'], o['test_processes'], o['cache_dir']) for o in options] == [
+        (3, 3, None), (1, 1, None)]
+    assert not list(tmp_path.rglob('corr_*.pkl'))
+    # Cache em memória limpo a cada passada: a primeira chamada de cada uma calcula
+    assert len(calls) == 2
+    assert not correlation._cache
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from crime_cube import STATS, CrimeCube
+from detailed_analysis import MESES
+
+
+@pytest.fixture
+def indicadores():
+    """Linhas sintéticas com células repetidas, UF ausente e combinações faltando."""
+    rng = np.random.default_rng(12)
+    n = 2000
+    ufs = np.array(['Acre', 'Bahia', 'Ceará', 'Goiás'])
+    crimes = np.array(['Roubo', 'Furto', 'Homicídio'])
+    ano = rng.integers(2018, 2021, n)
+    mes = rng.integers(0, 12, n)
+    df = pd.DataFrame({
+        'UF': pd.Categorical(ufs[rng.integers(0, 4, n)]),
+        'Tipo Crime': pd.Categorical(crimes[rng.integers(0, 3, n)]),
+        'Ano': ano.astype('int16'),
+        'Mês': pd.Categorical(np.array(MESES)[mes]),
+        'Ocorrências': rng.integers(0, 500, n).astype('int64'),
+    })
+    df['Data'] = pd.to_datetime({'year': ano, 'month': mes + 1, 'day': 1})
+    df.loc[3, 'UF'] = np.nan
+    # Goiás sem Homicídio
+    return df[~((df['UF'] == 'Goiás') & (df['Tipo Crime'] == 'Homicídio'))].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('keep', [['UF'], ['Tipo Crime'], ['Data', 'Tipo Crime'],
+                                  ['UF', 'Data', 'Tipo Crime']])
+@pytest.mark.parametrize('stat', STATS + ('sum',))
+def test_rollup_equals_groupby(indicadores, keep, stat):
+    cube = CrimeCube.from_frame(indicadores)
+    # Linhas sem UF não entram no cubo
+    valid = indicadores.dropna(subset=['UF'])
+    expected = valid.groupby(keep, observed=True)['Ocorrências'].agg(stat)
+
+    result = cube.rollup(keep, stat)
+    assert result.index.tolist() == expected.index.tolist()
+    np.testing.assert_allclose(result.to_numpy(dtype=np.float64),
+                               expected.to_numpy(dtype=np.float64), rtol=1e-10)
+
+
+def test_views_equal_pivot_tables(indicadores):
+    cube = CrimeCube.from_frame(indicadores)
+    valid = indicadores.dropna(subset=['UF'])
+
+    expected = valid.pivot_table(index='UF', columns='Tipo Crime', values='Ocorrências',
+                                 aggfunc='sum', observed=True)
+    pd.testing.assert_frame_equal(cube.uf_crime_totals(), expected, check_dtype=False,
+                                  check_names=False, check_categorical=False)
+
+    expected = valid.groupby('Mês', observed=True)['Ocorrências'].mean()
+    monthly = cube.monthly_mean(MESES)
+    assert monthly.index.tolist() == expected.index.tolist()
+    np.testing.assert_allclose(monthly, expected)
+
+
+def test_save_load_round_trip(indicadores, tmp_path):
+    cube = CrimeCube.from_frame(indicadores)
+    cube.save(tmp_path / 'cubo.npz')
+    loaded = CrimeCube.load(tmp_path / 'cubo.npz')
+
+    assert loaded.value_dtype == cube.value_dtype
+    for stat in STATS:
+        pd.testing.assert_series_equal(loaded.rollup(['UF', 'Data'], stat),
+                                       cube.rollup(['UF', 'Data'], stat))
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from crime_cube import CrimeCube
+from detailed_analysis import read_indicadores
+from incremental import update_cube
+
+MESES = ['janeiro', 'fevereiro', 'março', 'abril']
+
+
+def _rows(ufs, meses, crimes=('Roubo', 'Furto'), base=10):
+    return [(uf, crime, 2020, mes, base + i * 3 + j)
+            for i, uf in enumerate(ufs) for j, (crime, mes) in
+            enumerate((c, m) for c in crimes for m in meses)]
+
+
+def _write(path, rows):
+    lines = ['UF;Tipo Crime;Ano;Mês;Ocorrências']
+    lines += [';'.join(map(str, row)) for row in rows]
+    path.write_text('\n'.join(lines) + '\n', encoding='latin1')
+    return path
+
+
+def _assert_same_cube(cube, expected):
+    assert list(cube.ufs) == list(expected.ufs)
+    assert list(cube.crimes) == list(expected.crimes)
+    np.testing.assert_array_equal(cube.periods, expected.periods)
+    for name in ('count', 'total', 'total_sq', 'minimum', 'maximum'):
+        np.testing.assert_array_equal(getattr(cube, name), getattr(expected, name))
+
+
+def test_incremental_equals_rebuild_with_late_uf_and_revision(tmp_path):
+    csv_path = tmp_path / 'ocorrencias.csv'
+    state_dir = tmp_path / 'state'
+    _write(csv_path, _rows(['Acre', 'Bahia'], MESES[:2]))
+    update_cube(csv_path, read_indicadores, state_dir=state_dir)
+
+    # Novo mês para todos, Ceará atrasado em meses já presentes e uma revisão
+    rows = _rows(['Acre', 'Bahia'], MESES[:3]) + _rows(['Ceará'], MESES[:3], base=50)
+    rows[0] = rows[0][:4] + (999,)
+    _write(csv_path, rows)
+    cube, updated = update_cube(csv_path, read_indicadores, state_dir=state_dir)
+    assert updated == ['2020-01', '2020-02', '2020-03']
+
+    rebuilt, _ = update_cube(csv_path, read_indicadores, state_dir=tmp_path / 'full',
+                             rebuild=True)
+    _assert_same_cube(cube, rebuilt)
+    # CSV inalterado: cubo salvo sem reler o CSV
+    cube, updated = update_cube(csv_path, read_indicadores, state_dir=state_dir)
+    assert updated == []
+    _assert_same_cube(cube, rebuilt)
+
+
+def test_merge_and_save_round_trip(tmp_path):
+    first = read_indicadores(_write(tmp_path / 'a.csv', _rows(['Acre'], MESES[:2])),
+                             'Ocorrências')
+    second = read_indicadores(_write(tmp_path / 'b.csv', _rows(['Bahia', 'Acre'], MESES[2:])),
+                              'Ocorrências')
+    merged = CrimeCube.from_frame(first).merge(CrimeCube.from_frame(second))
+    _assert_same_cube(merged, CrimeCube.from_frame(pd.concat([first, second],
+                                                             ignore_index=True)))
+
+    merged.save(tmp_path / 'cube.npz')
+    loaded = CrimeCube.load(tmp_path / 'cube.npz')
+    _assert_same_cube(loaded, merged)
+    pd.testing.assert_frame_equal(loaded.uf_crime_totals(), merged.uf_crime_totals())
+
+
+def test_small_revision_to_large_cell_is_detected(tmp_path):
+    csv_path = tmp_path / 'ocorrencias.csv'
+    state_dir = tmp_path / 'state'
+    rows = _rows(['Acre', 'Bahia'], MESES[:2], base=1_000_000)
+    _write(csv_path, rows)
+    update_cube(csv_path, read_indicadores, state_dir=state_dir)
+
+    # +5 sobre 10^6: dentro da tolerância relativa de np.isclose
+    rows[3] = rows[3][:4] + (rows[3][4] + 5,)
+    _write(csv_path, rows)
+    cube, updated = update_cube(csv_path, read_indicadores, state_dir=state_dir)
+    assert updated == ['2020-02']
+
+    rebuilt, _ = update_cube(csv_path, read_indicadores, state_dir=tmp_path / 'full',
+                             rebuild=True)
+    _assert_same_cube(cube, rebuilt)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from statsmodels.stats.oneway import anova_oneway
+
+import detailed_analysis
+from hypothesis_testing import hypothesis_tests
+
+
+@pytest.fixture
+def indicadores():
+    rng = np.random.default_rng(21)
+    n = 600
+    df = pd.DataFrame({
+        'Tipo Crime': pd.Categorical(rng.choice(['Roubo', 'Furto', 'Homicídio'], n)),
+        'Região': rng.choice(['Norte', 'Sul', 'Leste', 'Oeste'], n),
+        'Semestre': rng.choice(['1º', '2º'], n),
+        'Ocorrências': rng.poisson(30, n).astype(np.float64),
+    })
+    df['Vítimas'] = df['Ocorrências'] * rng.uniform(0.5, 2.0, n)
+    df.loc[df['Região'] == 'Sul', 'Vítimas'] *= 1.3
+    df.loc[::13, 'Vítimas'] = np.nan
+    return df
+
+
+def _groups(df, crime, variable, grouping):
+    rows = df[(df['Tipo Crime'] == crime)].dropna(subset=[variable])
+    return [values.to_numpy() for _, values in rows.groupby(grouping)[variable]]
+
+
+def test_matches_scipy(indicadores):
+    results = hypothesis_tests(indicadores, ['Ocorrências', 'Vítimas'], ['Região', 'Semestre'])
+    assert len(results) == 2 * 2 * 3 * 3
+
+    for row in results.rename(columns={'Tipo Crime': 'crime'}).itertuples():
+        groups = _groups(indicadores, row.crime, row.variavel, row.agrupamento)
+        if row.teste == 'anova':
+            expected = stats.f_oneway(*groups)
+        elif row.teste == 'kruskal':
+            expected = stats.kruskal(*groups)
+        else:
+            expected = anova_oneway(groups, use_var='unequal')
+            if len(groups) == 2:
+                welch_t = stats.ttest_ind(*groups, equal_var=False)
+                assert row.p_valor == pytest.approx(welch_t.pvalue, rel=1e-8)
+        assert row.estatistica == pytest.approx(expected.statistic, rel=1e-8)
+        assert row.p_valor == pytest.approx(expected.pvalue, rel=1e-6, abs=1e-12)
+        assert row.n == sum(map(len, groups))
+
+
+def test_parallel_and_correction(indicadores):
+    serial = hypothesis_tests(indicadores, ['Ocorrências', 'Vítimas'], ['Região', 'Semestre'])
+    parallel = hypothesis_tests(indicadores, ['Ocorrências', 'Vítimas'], ['Região', 'Semestre'],
+                                processes=2)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+    anova = serial[serial['teste'] == 'anova']
+    expected = stats.false_discovery_control(anova['p_valor'])
+    np.testing.assert_allclose(anova['p_ajustado'], expected)
+
+
+def test_unknown_test_rejected(indicadores):
+    with pytest.raises(ValueError):
+        hypothesis_tests(indicadores, ['Ocorrências'], ['Região'], tests=('anova', 'chi2'))
+
+
+def test_analyzer_workers_independent_of_plotting(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_tests(df, variables, groupings, processes=None):
+        calls.append(processes)
+        return pd.DataFrame()
+
+    monkeypatch.setattr(detailed_analysis, 'hypothesis_tests', fake_tests)
+    analyzer = detailed_analysis.SecurityDataAnalyzer(reports_dir=tmp_path, plot_processes=4)
+    analyzer.test_hypotheses()
+    detailed_analysis.SecurityDataAnalyzer(reports_dir=tmp_path, test_processes=3).test_hypotheses()
+    assert calls == [None, None, 3, 3]
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from detailed_analysis import MESES, read_indicadores
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+def _reference(path, value_column):
+    """Leitura original: texto, '-' -> 0 e Data por to_datetime de strings."""
+    df = pd.read_csv(path, encoding='latin1', sep=';')
+    df[value_column] = pd.to_numeric(df[value_column].replace('-', '0'))
+    meses = {mes: i + 1 for i, mes in enumerate(MESES)}
+    df['Data'] = pd.to_datetime(df['Ano'].astype(str) + '-' +
+                                df['Mês'].map(meses).astype(str) + '-01')
+    return df
+
+
+def test_matches_string_loader_on_real_file():
+    path = DATA_DIR / 'indicadoressegurancapublica_ocorrecia.CSV'
+    df = read_indicadores(path, 'Ocorrências')
+    expected = _reference(path, 'Ocorrências')
+
+    assert list(df.columns) == list(expected.columns)
+    for column in ('UF', 'Tipo Crime', 'Mês'):
+        assert df[column].astype(str).tolist() == expected[column].astype(str).tolist()
+    np.testing.assert_array_equal(df['Ano'], expected['Ano'])
+    np.testing.assert_array_equal(df['Ocorrências'], expected['Ocorrências'])
+    pd.testing.assert_series_equal(df['Data'], expected['Data'])
+
+
+def test_missing_values_and_unknown_month(tmp_path):
+    path = tmp_path / 'indicadores.csv'
+    path.write_text('UF;Tipo Crime;Ano;Mês;Vítimas\n'
+                    'Acre;Roubo;2019;dezembro;-\n'
+                    'Bahia;Furto;2020;janeiro;7\n'
+                    'Bahia;Furto;2020;desconhecido;3\n', encoding='latin1')
+    df = read_indicadores(path, 'Vítimas')
+
+    assert df['Vítimas'].tolist() == [0, 7, 3]
+    assert df['Vítimas'].dtype == 'int64'
+    assert df['Data'].iloc[:2].tolist() == [pd.Timestamp('2019-12-01'), pd.Timestamp('2020-01-01')]
+    assert pd.isna(df['Data'].iloc[2])
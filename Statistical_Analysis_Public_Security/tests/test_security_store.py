@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from security_store import SecurityStore
+
+
+def _frame(rows, value_column):
+    df = pd.DataFrame(rows, columns=['UF', 'Tipo Crime', 'Data', value_column])
+    df['Data'] = pd.to_datetime(df['Data'])
+    return df.astype({'UF': 'category', 'Tipo Crime': 'category'})
+
+
+@pytest.fixture
+def store():
+    ocorrencias = _frame([
+        ('Bahia', 'Roubo', '2020-01-01', 10), ('Acre', 'Roubo', '2020-01-01', 4),
+        ('Acre', 'Roubo', '2020-03-01', 6), ('Acre', 'Roubo', '2020-03-01', 1),
+        ('Acre', 'Furto', '2020-02-01', 0),
+    ], 'Ocorrências')
+    vitimas = _frame([
+        ('Acre', 'Roubo', '2020-01-01', 5), ('Acre', 'Roubo', '2020-03-01', 9),
+        ('Acre', 'Furto', '2020-02-01', 2), ('Ceará', 'Homicídio', '2020-01-01', 3),
+    ], 'Vítimas')
+    return SecurityStore.from_frames(ocorrencias, vitimas), ocorrencias, vitimas
+
+
+def test_frame_equals_outer_merge(store):
+    store, ocorrencias, vitimas = store
+    keys = ['UF', 'Tipo Crime', 'Data']
+    expected = pd.merge(
+        ocorrencias.astype({'UF': str, 'Tipo Crime': str}).groupby(keys)['Ocorrências'].sum(),
+        vitimas.astype({'UF': str, 'Tipo Crime': str}).groupby(keys)['Vítimas'].sum(),
+        left_index=True, right_index=True, how='outer')
+
+    frame = store.frame.reset_index().astype({'UF': str, 'Tipo Crime': str}).set_index(keys)
+    pd.testing.assert_frame_equal(frame, expected.astype('Int64'))
+
+
+def test_series_and_query(store):
+    store, _, _ = store
+    series = store.series('Acre', 'Roubo')
+    assert series['Ocorrências'].tolist() == [4, 7]
+    assert series['Vítimas'].tolist() == [5, 9]
+
+    complete = store.series('Acre', 'Roubo', complete=True)
+    assert len(complete) == 3 and complete.loc['2020-02-01'].isna().all()
+    assert store.series('Ceará', 'Roubo').empty
+
+    january = store.query(start='2020-01-01', end='2020-01-31')
+    assert len(january) == 3
+    assert len(store.query(uf='Acre')) == 3
+
+
+def test_victims_per_occurrence(store):
+    store, _, _ = store
+    table = store.lethality_by_uf()
+    # Só linhas presentes nas duas tabelas; ocorrência zero não divide
+    assert table.index.tolist() == ['Acre']
+    assert table.loc['Acre', 'Ocorrências'] == 11
+    assert table.loc['Acre', 'Vítimas'] == 16
+    by_crime = store.victims_per_occurrence()
+    assert np.isnan(by_crime.loc[('Acre', 'Furto'), 'vitimas_por_ocorrencia'])
+    assert by_crime.loc[('Acre', 'Roubo'), 'vitimas_por_ocorrencia'] == pytest.approx(14 / 11)
@@ -0,0 +1,46 @@
+import pytest
+
+import sql_backend
+from sql_backend import SOURCES, SecuritySQLBackend
+
+
+def _write_sources(data_dir, quantidade):
+    data_dir.mkdir(exist_ok=True)
+    for table, filename in SOURCES.items():
+        lines = ['UF;Tipo Crime;Ano;Mês;Quantidade']
+        lines += [f'Acre;Roubo;2020;{mes};{quantidade}' for mes in ('janeiro', 'fevereiro', 'março')]
+        (data_dir / filename).write_text('\n'.join(lines) + '\n', encoding='latin1')
+
+
+def _total(backend):
+    return backend.query("SELECT SUM(quantidade) AS total FROM ocorrencias")['total'][0]
+
+
+def test_ingest_only_when_source_changes(tmp_path):
+    _write_sources(tmp_path / 'data', 5)
+    with SecuritySQLBackend(tmp_path / 'db.sqlite', tmp_path / 'data') as backend:
+        assert backend.ingest() == ['ocorrencias', 'vitimas']
+        assert backend.ingest() == []
+        assert _total(backend) == 15
+
+
+def test_interrupted_force_ingest_keeps_previous_table(tmp_path, monkeypatch):
+    _write_sources(tmp_path / 'data', 5)
+    db_path = tmp_path / 'db.sqlite'
+    with SecuritySQLBackend(db_path, tmp_path / 'data') as backend:
+        backend.ingest()
+
+    def failing_rows(path):
+        yield 'Acre', 'Roubo', 2020, 1, '2020-01-01', 1
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(sql_backend, 'read_rows', failing_rows)
+    with SecuritySQLBackend(db_path, tmp_path / 'data') as backend:
+        with pytest.raises(KeyboardInterrupt):
+            backend.ingest(force=True)
+
+    monkeypatch.undo()
+    with SecuritySQLBackend(db_path, tmp_path / 'data') as backend:
+        # Tabela e meta anteriores intactas e coerentes entre si
+        assert backend.ingest() == []
+        assert _total(backend) == 15
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.seasonal import seasonal_decompose
+
+from time_series import SeriesMatrix
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(5)
+    periods = pd.date_range('2017-03-01', periods=50, freq='MS', name='Data')
+    t = np.arange(50)
+    values = np.vstack([
+        100 + 2 * t + 10 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 3, 50),
+        rng.poisson(40, 50).astype(np.float64),
+        rng.poisson(5, 50).astype(np.float64),
+    ])
+    values[2, [0, 7, 8, 30]] = np.nan
+    values[1, 20] = 0.0
+    return SeriesMatrix(pd.Index(['Roubo', 'Furto', 'Homicídio'], name='Tipo Crime'),
+                        periods, values)
+
+
+def test_rolling_and_year_over_year_equal_pandas(series):
+    frame = series.to_frame().T
+    np.testing.assert_allclose(series.rolling_mean(), frame.rolling(12).mean().T.to_numpy())
+    np.testing.assert_allclose(series.rolling_mean(6, min_periods=3),
+                               frame.rolling(6, min_periods=3).mean().T.to_numpy())
+
+    expected = frame.pct_change(12, fill_method=None).T.to_numpy()
+    # Divisão por zero vira NaN (pandas retorna inf)
+    expected[~np.isfinite(expected)] = np.nan
+    np.testing.assert_allclose(series.year_over_year(), expected)
+
+
+def test_decomposition_equals_statsmodels(series):
+    trend, seasonal, residual = series.seasonal_decomposition()
+    for i in range(2):
+        expected = seasonal_decompose(series.to_frame().iloc[i], model='additive', period=12)
+        np.testing.assert_allclose(trend[i], expected.trend, atol=1e-9)
+        np.testing.assert_allclose(seasonal[i], expected.seasonal, atol=1e-9)
+        np.testing.assert_allclose(residual[i], expected.resid, atol=1e-9)
+
+
+def test_trend_slopes_equal_polyfit(series):
+    slopes = series.trend_slopes()
+    x = np.arange(series.values.shape[1])
+    for i, values in enumerate(series.values):
+        valid = ~np.isnan(values)
+        assert slopes[i] == pytest.approx(np.polyfit(x[valid], values[valid], 1)[0])
+    assert list(series.summary().index) == list(series.labels)
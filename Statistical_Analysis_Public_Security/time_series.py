@@ -0,0 +1,133 @@
+"""
+Análise vetorizada de séries temporais mensais dos indicadores
+
+Todas as séries (uma por tipo de crime, ou uma por UF x tipo de crime) ficam
+em uma única matriz séries x meses, montada uma vez a partir do CrimeCube.
+Médias móveis, variação anual, decomposição sazonal aditiva e inclinação da
+tendência são calculadas para todas as séries de uma vez com NumPy. Meses
+sem registro ficam como NaN.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Meses por ciclo sazonal
+PERIOD = 12
+
+
+def _rolling_mean(values, window, min_periods):
+    valid = ~np.isnan(values)
+    # `window` zeros à esquerda: as primeiras janelas ficam parciais, como no pandas
+    padding = ((0, 0), (window, 0))
+    sums = np.cumsum(np.pad(np.where(valid, values, 0.0), padding), axis=1)
+    counts = np.cumsum(np.pad(valid.astype(np.int64), padding), axis=1)
+    window_sums = sums[:, window:] - sums[:, :-window]
+    window_counts = counts[:, window:] - counts[:, :-window]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_counts >= max(min_periods, 1),
+                        window_sums / window_counts, np.nan)
+
+
+def _centered_moving_average(values, period):
+    """Média móvel centrada 2 x período (filtro da decomposição clássica)."""
+    if period % 2 == 0:
+        weights = np.r_[0.5, np.ones(period - 1), 0.5] / period
+    else:
+        weights = np.ones(period) / period
+    half = len(weights) // 2
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] >= len(weights):
+        result[:, half:values.shape[1] - half] = sliding_window_view(
+            values, len(weights), axis=1
+        ) @ weights
+    return result
+
+
+class SeriesMatrix:
+    """Matriz de séries mensais (linhas = séries, colunas = meses contínuos)."""
+
+    def __init__(self, labels, periods, values):
+        self.labels = labels
+        self.periods = periods
+        self.values = values
+
+    @classmethod
+    def from_cube(cls, cube, by_uf=False):
+        """
+        Soma do cubo por (tipo de crime, mês) ou, com `by_uf`, por
+        (UF, tipo de crime, mês). Combinações sem registro viram NaN.
+        """
+        keep = ['UF', 'Tipo Crime', 'Data'] if by_uf else ['Tipo Crime', 'Data']
+        totals = cube.rollup(keep).astype('float64')
+        periods = pd.date_range(cube.periods.min(), cube.periods.max(), freq='MS', name='Data')
+        matrix = totals.unstack('Data').reindex(columns=periods)
+        return cls(matrix.index, periods, matrix.to_numpy(dtype=np.float64))
+
+    def to_frame(self, values=None):
+        """DataFrame séries x meses (por padrão, os valores originais)."""
+        return pd.DataFrame(self.values if values is None else values,
+                            index=self.labels, columns=self.periods)
+
+    def rolling_mean(self, window=PERIOD, min_periods=None):
+        """Média móvel de `window` meses (exige `min_periods` meses válidos)."""
+        return _rolling_mean(self.values, window, window if min_periods is None else min_periods)
+
+    def year_over_year(self):
+        """Variação relativa em relação ao mesmo mês do ano anterior."""
+        result = np.full(self.values.shape, np.nan)
+        previous = self.values[:, :-PERIOD]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[:, PERIOD:] = np.where(previous != 0,
+                                          self.values[:, PERIOD:] / previous - 1, np.nan)
+        return result
+
+    def seasonal_decomposition(self, period=PERIOD):
+        """
+        Decomposição aditiva clássica: retorna (tendência, sazonalidade,
+        resíduo), cada um com o formato da matriz.
+        """
+        trend = _centered_moving_average(self.values, period)
+        detrended = self.values - trend
+        valid = ~np.isnan(detrended)
+
+        # Índice sazonal: média do componente sem tendência em cada posição do ciclo
+        position = (self.periods.year * 12 + self.periods.month - 1).to_numpy() % period
+        one_hot = np.eye(period)[position]
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            # Séries curtas demais para a tendência ficam inteiramente NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            seasonal_index = (np.where(valid, detrended, 0.0) @ one_hot) / (valid @ one_hot)
+            seasonal_index -= np.nanmean(seasonal_index, axis=1, keepdims=True)
+
+        seasonal = seasonal_index[:, position]
+        residual = self.values - trend - seasonal
+        return trend, seasonal, residual
+
+    def trend_slopes(self):
+        """Inclinação da reta de mínimos quadrados de cada série (por mês)."""
+        valid = ~np.isnan(self.values)
+        x = np.arange(self.values.shape[1], dtype=np.float64)
+        n = valid.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_mean = (valid * x).sum(axis=1) / n
+            y_mean = np.where(valid, self.values, 0.0).sum(axis=1) / n
+            dx = np.where(valid, x - x_mean[:, None], 0.0)
+            dy = np.where(valid, self.values - y_mean[:, None], 0.0)
+            return (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+    def summary(self):
+        """Tabela por série: tendência anual, última variação anual e amplitude sazonal."""
+        _, seasonal, _ = self.seasonal_decomposition()
+        yoy = self.year_over_year()
+        last_yoy = pd.DataFrame(yoy).ffill(axis=1).iloc[:, -1].to_numpy()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return pd.DataFrame({
+                'media_mensal': np.nanmean(self.values, axis=1),
+                'tendencia_por_ano': self.trend_slopes() * PERIOD,
+                'variacao_anual_recente': last_yoy,
+                'amplitude_sazonal': np.nanmax(seasonal, axis=1) - np.nanmin(seasonal, axis=1),
+            }, index=self.labels)
@@ -0,0 +1,3 @@
+"""
+Utilitários compartilhados pelos projetos de análise do repositório
+"""
@@ -0,0 +1,186 @@
+"""
+Matrizes de correlação (Pearson e Spearman) por produto de matrizes
+
+As colunas numéricas são centradas e a matriz inteira sai de um único produto
+matricial (BLAS), em vez de um laço por par de colunas. Com valores ausentes,
+cada par usa só as linhas em que as duas colunas têm valor (pairwise
+complete): contagens, somas e somas dos quadrados por par também são
+produtos matriciais com a máscara de valores válidos.
+
+Spearman é o Pearson dos postos. Sem valores ausentes os postos de cada
+coluna são calculados uma vez; pares com ausentes são re-ranqueados só nas
+linhas em comum, como no `df.corr('spearman')` do pandas.
+
+Os resultados ficam em cache (memória e, opcionalmente, disco) pela impressão
+digital dos dados, colunas, método e `min_periods`. O cache em disco mantém
+no máximo DISK_CACHE_SIZE arquivos (os usados há mais tempo são removidos).
+"""
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+METHODS = ('pearson', 'spearman')
+
+# Resultados mantidos em memória
+CACHE_SIZE = 32
+
+# Arquivos corr_*.pkl mantidos no diretório de cache em disco
+DISK_CACHE_SIZE = 64
+
+_cache = OrderedDict()
+
+
+def _as_matrix(df):
+    numeric = df.select_dtypes(include=[np.number, 'bool'])
+    return numeric.columns, numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _rank(values):
+    """Postos médios por coluna (ausentes continuam NaN)."""
+    return pd.DataFrame(values).rank().to_numpy(dtype=np.float64)
+
+
+def fingerprint(values, columns, method, min_periods):
+    """Hash dos valores, nomes das colunas e parâmetros do cálculo."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((list(map(str, columns)), values.shape, method, min_periods)).encode('utf-8'))
+    digest.update(np.ascontiguousarray(values).view(np.uint8))
+    return digest.hexdigest()
+
+
+def _pearson(values, min_periods):
+    valid = ~np.isnan(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if valid.all():
+            centered = values - values.mean(axis=0)
+            counts = np.full((values.shape[1],) * 2, values.shape[0], dtype=np.float64)
+            cov = centered.T @ centered
+            std = np.sqrt(np.diag(cov))
+            corr = cov / np.outer(std, std)
+        else:
+            # Centrar pela média da coluna reduz o cancelamento numérico
+            centered = np.where(valid, values - np.nanmean(values, axis=0), 0.0)
+            mask = valid.astype(np.float64)
+            counts = mask.T @ mask
+            # sums[i, j] = soma da coluna i nas linhas válidas para i e j
+            sums = centered.T @ mask
+            squares = (centered * centered).T @ mask
+            cov = centered.T @ centered - sums * sums.T / counts
+            var_i = squares - sums * sums / counts
+            corr = cov / np.sqrt(var_i * var_i.T)
+    corr = np.clip(corr, -1.0, 1.0)
+    corr[counts < max(min_periods, 2)] = np.nan
+    diagonal = np.diag_indices_from(corr)
+    corr[diagonal] = np.where(np.isnan(np.diag(corr)), np.nan, 1.0)
+    return corr, counts
+
+
+def _spearman(values, min_periods):
+    corr, counts = _pearson(_rank(values), min_periods)
+    valid = ~np.isnan(values)
+    incomplete = np.flatnonzero(~valid.all(axis=0))
+    for i in incomplete:
+        for j in range(values.shape[1]):
+            if j == i or (j < i and j in incomplete):
+                continue
+            rows = valid[:, i] & valid[:, j]
+            if rows.sum() < max(min_periods, 2):
+                continue
+            # Postos recalculados só nas linhas em comum do par
+            pair, _ = _pearson(_rank(values[rows][:, [i, j]]), min_periods)
+            corr[i, j] = corr[j, i] = pair[0, 1]
+    return corr, counts
+
+
+def pvalues(corr, counts):
+    """p-valores bicaudais (distribuição t com n - 2 graus de liberdade)."""
+    df = counts - 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = corr * np.sqrt(df / ((1 - corr) * (1 + corr)))
+        result = 2 * stats.t.sf(np.abs(t), df)
+    result[np.abs(corr) == 1] = 0.0
+    result[df <= 0] = np.nan
+    return result
+
+
+def _read_disk(path):
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _write_disk(path, result):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(result, f, protocol=4)
+    os.replace(tmp_path, path)
+    _evict_disk(path.parent)
+
+
+def _evict_disk(cache_dir):
+    """Remove os arquivos de correlação usados há mais tempo além de DISK_CACHE_SIZE."""
+    entries = []
+    for path in Path(cache_dir).glob('corr_*.pkl'):
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    for _, path in entries[DISK_CACHE_SIZE:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def clear_cache():
+    """Esvazia o cache em memória (o cache em disco não é alterado)."""
+    _cache.clear()
+
+
+def correlation_matrix(df, method='pearson', min_periods=1, with_pvalues=False,
+                       cache_dir=None):
+    """
+    Matriz de correlação das colunas numéricas de `df`, equivalente a
+    df.corr(method, min_periods) (inclusive Spearman com valores ausentes).
+    Com `with_pvalues`, retorna também a matriz de p-valores. Com
+    `cache_dir`, o resultado é guardado em disco.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método não suportado: {method}")
+
+    columns, values = _as_matrix(df)
+    key = fingerprint(values, columns, method, min_periods)
+    result = _cache.get(key)
+    disk_path = Path(cache_dir) / f"corr_{key}.pkl" if cache_dir else None
+    if result is None and disk_path is not None:
+        result = _read_disk(disk_path)
+        if result is not None:
+            # Marca o uso (ordem da remoção dos mais antigos)
+            os.utime(disk_path)
+    if result is None:
+        compute = _spearman if method == 'spearman' else _pearson
+        corr, counts = compute(values, min_periods)
+        result = (
+            pd.DataFrame(corr, index=columns, columns=columns),
+            pd.DataFrame(pvalues(corr, counts), index=columns, columns=columns),
+        )
+        if disk_path is not None:
+            _write_disk(disk_path, result)
+
+    _cache[key] = result
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+    corr, p = (frame.copy() for frame in result)
+    return (corr, p) if with_pvalues else corr
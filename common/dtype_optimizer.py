@@ -0,0 +1,83 @@
+"""
+Otimização de tipos dos DataFrames carregados pelos projetos
+
+Inteiros são reduzidos ao menor tipo que comporta os valores, colunas de texto
+com poucos valores distintos viram categóricas e, opcionalmente, floats passam
+para float32. Colunas com valores não hashable (JSON aninhado: dicts, listas)
+ficam como `object`. A economia de memória é informada por coluna.
+
+Após a conversão, use `observed=True` nos groupby/pivot_table por colunas
+categóricas para manter o mesmo resultado das colunas de texto.
+"""
+import pandas as pd
+from pandas.api import types
+
+# Fração máxima de valores distintos para converter texto em categoria
+CATEGORICAL_THRESHOLD = 0.5
+
+# Linhas usadas para descartar rapidamente colunas de texto livre
+SAMPLE_SIZE = 10000
+
+
+def _is_low_cardinality(series, threshold):
+    sample = series.iloc[:SAMPLE_SIZE]
+    if len(sample) and sample.nunique() > threshold * len(sample):
+        return False
+    return series.nunique() <= threshold * max(len(series), 1)
+
+
+def _optimize_column(series, categorical_threshold, downcast_floats):
+    dtype = series.dtype
+    if types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if types.is_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast='integer')
+    if types.is_float_dtype(dtype):
+        return pd.to_numeric(series, downcast='float') if downcast_floats else series
+    if types.is_object_dtype(dtype) or types.is_string_dtype(dtype):
+        try:
+            if _is_low_cardinality(series, categorical_threshold):
+                return series.astype('category')
+        except TypeError:
+            # Valores não hashable (dicts/listas de JSON aninhado)
+            return series
+    return series
+
+
+def memory_report(before, after):
+    """Tabela com a memória (bytes) por coluna antes e depois da otimização."""
+    report = pd.DataFrame({
+        'antes': before.memory_usage(index=False, deep=True),
+        'depois': after.memory_usage(index=False, deep=True),
+        'tipo_antes': before.dtypes.astype(str),
+        'tipo_depois': after.dtypes.astype(str),
+    })
+    report.loc['TOTAL'] = [report['antes'].sum(), report['depois'].sum(), '', '']
+    report = report.astype({'antes': 'int64', 'depois': 'int64'})
+    report['economia'] = report['antes'] - report['depois']
+    return report
+
+
+def optimize_dtypes(df, categorical_threshold=CATEGORICAL_THRESHOLD, exclude=(),
+                    downcast_floats=False, verbose=False):
+    """
+    Retorna uma cópia do DataFrame com tipos de menor consumo de memória.
+
+    Colunas em `exclude` não são alteradas. Com `verbose`, imprime a memória
+    economizada por coluna.
+    """
+    optimized = df.copy(deep=False)
+    for column in df.columns:
+        if column in exclude:
+            continue
+        optimized[column] = _optimize_column(df[column], categorical_threshold, downcast_floats)
+
+    if verbose:
+        report = memory_report(df, optimized)
+        total = report.loc['TOTAL']
+        print("\nOtimização de tipos (bytes por coluna):")
+        print(report)
+        if total['antes']:
+            print(f"Memória: {total['antes'] / 1e6:.1f} MB -> {total['depois'] / 1e6:.1f} MB "
+                  f"({total['antes'] / max(total['depois'], 1):.1f}x menor)")
+    return optimized
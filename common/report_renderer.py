@@ -0,0 +1,141 @@
+"""
+Renderização paralela e em cache das figuras dos relatórios
+
+Cada figura é descrita por uma função de plotagem de nível de módulo e pelos
+dados já agregados que ela recebe. As figuras são desenhadas com o backend Agg
+em um pool de processos, e uma figura é pulada quando o hash da função e dos
+seus dados coincide com o registrado no manifesto e o PNG ainda existe.
+
+A função de plotagem recebe `(dados, caminho, **opções)` e deve salvar a
+figura no caminho informado. O backend do processo que chama render() não é
+alterado: só os processos do pool usam `matplotlib.use('Agg')`, e no modo
+serial são fechadas apenas as figuras criadas pela própria plotagem.
+"""
+import hashlib
+import json
+import os
+import pickle
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+
+MANIFEST_NAME = '.render_manifest.json'
+
+# Parâmetros que não são repassados aos processos do pool
+WORKER_RC_EXCLUDE = frozenset({'backend', 'backend_fallback', 'interactive'})
+
+
+def _code_digest(code, digest):
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _code_digest(const, digest)
+        else:
+            digest.update(repr(const).encode('utf-8'))
+
+
+def figure_key(plot_function, data, options=None):
+    """Hash da função de plotagem (nome e bytecode) e dos dados de entrada."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{plot_function.__module__}.{plot_function.__qualname__}".encode('utf-8'))
+    _code_digest(plot_function.__code__, digest)
+    digest.update(pickle.dumps((data, sorted((options or {}).items())), protocol=4))
+    return digest.hexdigest()
+
+
+def _init_worker(rc_params):
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        plt.rcParams.update(rc_params)
+
+
+def _render(job):
+    plot_function, data, path, options = job
+    import matplotlib.pyplot as plt
+
+    existing = set(plt.get_fignums())
+    try:
+        plot_function(data, path, **options)
+    finally:
+        for number in set(plt.get_fignums()) - existing:
+            plt.close(number)
+    return path
+
+
+class ReportRenderer:
+    """
+    Fila de figuras de relatório.
+
+    Com `defer=False` cada figura é desenhada assim que adicionada; caso
+    contrário as figuras são acumuladas e desenhadas juntas em render(),
+    usando até `processes` processos.
+    """
+
+    def __init__(self, reports_dir='reports', processes=None, defer=False):
+        self.reports_dir = Path(reports_dir)
+        self.processes = processes
+        self.defer = defer
+        self.jobs = []
+        self.manifest_path = self.reports_dir / MANIFEST_NAME
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def add(self, filename, plot_function, data, **options):
+        """Agenda (ou desenha, se não adiado) uma figura do relatório."""
+        self.jobs.append((filename, plot_function, data, options))
+        if not self.defer:
+            return self.render()
+        return None
+
+    def render(self):
+        """
+        Desenha as figuras pendentes cujo hash mudou ou cujo PNG não existe.
+        Retorna {arquivo: 'gerado' ou 'em cache'}.
+        """
+        jobs, self.jobs = self.jobs, []
+        if not jobs:
+            return {}
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._read_manifest()
+
+        status = {}
+        pending = []
+        for filename, plot_function, data, options in jobs:
+            key = figure_key(plot_function, data, options)
+            path = self.reports_dir / filename
+            if manifest.get(filename) == key and path.exists():
+                status[filename] = 'em cache'
+                continue
+            manifest[filename] = key
+            status[filename] = 'gerado'
+            pending.append((plot_function, data, str(path), options))
+
+        if self.processes and self.processes > 1 and len(pending) > 1:
+            rc_params = {name: value for name, value in matplotlib.rcParams.items()
+                         if name not in WORKER_RC_EXCLUDE}
+            with ProcessPoolExecutor(max_workers=min(self.processes, len(pending)),
+                                     initializer=_init_worker,
+                                     initargs=(rc_params,)) as executor:
+                list(executor.map(_render, pending))
+        else:
+            for job in pending:
+                _render(job)
+
+        self._write_manifest(manifest)
+        return status
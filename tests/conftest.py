@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Módulos compartilhados na raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import common.correlation as correlation
+from common.correlation import correlation_matrix
+
+
+def _frame(seed=0, missing=True):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=300)
+    df = pd.DataFrame({
+        'a': base + rng.normal(size=300),
+        'b': np.exp(base) + rng.normal(size=300),
+        'c': rng.integers(0, 5, size=300),
+        'd': rng.normal(size=300),
+        'texto': ['x'] * 300,
+    })
+    if missing:
+        df.loc[rng.choice(300, 60, replace=False), 'a'] = np.nan
+        df.loc[rng.choice(300, 45, replace=False), 'b'] = np.nan
+        df.loc[rng.choice(300, 30, replace=False), 'd'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman'])
+@pytest.mark.parametrize('missing', [False, True])
+def test_matches_pandas(method, missing):
+    df = _frame(missing=missing)
+    expected = df.drop(columns='texto').corr(method)
+    pd.testing.assert_frame_equal(correlation_matrix(df, method), expected, atol=1e-12)
+
+
+def test_min_periods_matches_pandas():
+    df = _frame()
+    df.loc[:250, 'd'] = np.nan
+    expected = df.drop(columns='texto').corr('spearman', min_periods=60)
+    pd.testing.assert_frame_equal(correlation_matrix(df, 'spearman', min_periods=60), expected,
+                                  atol=1e-12)
+
+
+def test_disk_cache_round_trip_and_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(correlation, 'DISK_CACHE_SIZE', 3)
+    monkeypatch.setattr(correlation, '_cache', correlation.OrderedDict())
+    first = correlation_matrix(_frame(0), cache_dir=tmp_path)
+    correlation._cache.clear()
+    # Relido do disco, sem recalcular
+    monkeypatch.setattr(correlation, '_pearson', None)
+    pd.testing.assert_frame_equal(correlation_matrix(_frame(0), cache_dir=tmp_path), first)
+    monkeypatch.undo()
+
+    monkeypatch.setattr(correlation, 'DISK_CACHE_SIZE', 3)
+    for seed in range(1, 6):
+        correlation_matrix(_frame(seed), cache_dir=tmp_path)
+    assert len(list(tmp_path.glob('corr_*.pkl'))) <= 3
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from common.dtype_optimizer import optimize_dtypes
+
+
+def test_low_cardinality_text_becomes_category():
+    df = pd.DataFrame({'status': ['Resolvida', 'Pendente'] * 50, 'nota': range(100)})
+    optimized = optimize_dtypes(df)
+    assert isinstance(optimized['status'].dtype, pd.CategoricalDtype)
+    assert optimized['nota'].dtype == 'int8'
+    pd.testing.assert_frame_equal(optimized.astype({'status': object, 'nota': 'int64'}), df)
+
+
+def test_nested_json_columns_stay_object():
+    df = pd.DataFrame({
+        'status': ['Resolvida'] * 4,
+        'extra': [{'k': 1}, {'k': 2}, {'k': 1}, {'k': 2}],
+        'tags': [[1, 2], [3], [1, 2], []],
+    })
+    optimized = optimize_dtypes(df, verbose=True)
+    assert optimized['extra'].dtype == object
+    assert optimized['tags'].dtype == object
+    assert optimized['extra'].tolist() == df['extra'].tolist()
+    assert isinstance(optimized['status'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,41 @@
+import matplotlib
+
+matplotlib.use('pdf')
+
+import matplotlib.pyplot as plt
+
+from common.report_renderer import ReportRenderer
+
+
+def plot_line(values, path):
+    plt.figure()
+    plt.plot(values)
+    plt.savefig(path)
+
+
+def test_serial_render_keeps_backend_and_open_figures(tmp_path):
+    user_figure = plt.figure()
+    renderer = ReportRenderer(tmp_path, defer=True)
+    renderer.add('linha.png', plot_line, [1, 3, 2])
+    assert renderer.render() == {'linha.png': 'gerado'}
+
+    assert matplotlib.get_backend() == 'pdf'
+    assert plt.get_fignums() == [user_figure.number]
+    assert (tmp_path / 'linha.png').read_bytes().startswith(b'\x89PNG')
+    plt.close(user_figure)
+
+
+def test_unchanged_figures_are_reused(tmp_path):
+    renderer = ReportRenderer(tmp_path)
+    renderer.add('linha.png', plot_line, [1, 3, 2])
+    assert renderer.add('linha.png', plot_line, [1, 3, 2]) == {'linha.png': 'em cache'}
+    assert renderer.add('linha.png', plot_line, [1, 2, 3]) == {'linha.png': 'gerado'}
+
+
+def test_parallel_render_does_not_change_caller_backend(tmp_path):
+    renderer = ReportRenderer(tmp_path, processes=2, defer=True)
+    renderer.add('a.png', plot_line, [1, 2])
+    renderer.add('b.png', plot_line, [2, 1])
+    assert renderer.render() == {'a.png': 'gerado', 'b.png': 'gerado'}
+    assert matplotlib.get_backend() == 'pdf'
+    assert (tmp_path / 'a.png').exists() and (tmp_path / 'b.png').exists()